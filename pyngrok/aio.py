@@ -0,0 +1,753 @@
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import ssl
+import threading
+import weakref
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlencode, urlsplit
+
+from pyngrok import conf, connection, ngrok, process
+from pyngrok.agent import CapturedRequest, NgrokAgent
+from pyngrok.conf import PyngrokConfig
+from pyngrok.exception import PyngrokError, PyngrokNgrokError, PyngrokNgrokHTTPError, PyngrokNgrokURLError, \
+    PyngrokSecurityError
+from pyngrok.ngrok import NgrokTunnel, TunnelDiff
+from pyngrok.process import NgrokProcess
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 100
+
+_loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+_loop_states_lock = threading.Lock()
+
+
+class _StaleConnectionError(Exception):
+    """
+    Raised when a reused keep-alive connection was closed by the server before a response was read.
+    """
+
+    def __init__(self,
+                 sent: bool) -> None:
+        super().__init__()
+
+        #: ``True`` if the request was fully sent before the connection was found to be closed.
+        self.sent: bool = sent
+
+
+class _AsyncConnectionPool:
+    """
+    A pool of persistent HTTP/1.1 keep-alive connections to a single origin, bound to the event loop on which it
+    was created. At most ``max_connections`` requests to the origin are in flight at once, which keeps thousands
+    of concurrent operations from exhausting file descriptors, and every open connection is retained for reuse
+    until it has been idle for longer than ``idle_timeout`` seconds.
+    """
+
+    def __init__(self,
+                 origin: str,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 idle_timeout: float = connection.DEFAULT_IDLE_TIMEOUT) -> None:
+        parsed = urlsplit(origin)
+        if not parsed.hostname:
+            raise PyngrokSecurityError(f"URL must include a host: {origin}")
+
+        self.origin = origin
+        self.idle_timeout = idle_timeout
+
+        self._host: str = parsed.hostname
+        self._ssl = parsed.scheme == "https"
+        self._port: int = parsed.port or (443 if self._ssl else 80)
+        self._host_header = parsed.netloc
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter, float]] = []
+        self._semaphore = asyncio.Semaphore(max_connections)
+
+    async def _acquire(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        loop = asyncio.get_running_loop()
+        while self._idle:
+            reader, writer, last_used = self._idle.pop()
+            if loop.time() - last_used <= self.idle_timeout and not reader.at_eof():
+                return reader, writer, True
+
+            writer.close()
+
+        ssl_context = ssl.create_default_context() if self._ssl else None
+        reader, writer = await asyncio.open_connection(self._host, self._port, ssl=ssl_context)
+
+        return reader, writer, False
+
+    async def request(self,
+                      method: str,
+                      path: str,
+                      body: Optional[bytes],
+                      headers: Dict[str, str],
+                      timeout: float) -> Tuple[int, str, Dict[str, str], bytes]:
+        """
+        Make a request over a pooled connection, returning the status, reason, headers, and body of the response.
+
+        :param method: The HTTP method.
+        :param path: The request path, including any query string.
+        :param body: The request body.
+        :param headers: The request headers.
+        :param timeout: The request timeout, in seconds.
+        :return: The response.
+        """
+        async with self._semaphore:
+            while True:
+                reader, writer, reused = await asyncio.wait_for(self._acquire(), timeout)
+                try:
+                    status, reason, response_headers, data, keep_alive = \
+                        await asyncio.wait_for(self._exchange(reader, writer, method, path, body, headers), timeout)
+                except _StaleConnectionError as e:
+                    writer.close()
+                    # A request that was fully sent may have been acted on, so is only repeated if that is safe
+                    if reused and (not e.sent or method.upper() in connection.IDEMPOTENT_METHODS):
+                        logger.debug(f"Pooled connection to {self.origin} was closed by the server, reconnecting")
+
+                        continue
+                    raise ConnectionResetError(f"Connection to {self.origin} was closed before a response")
+                except BaseException:
+                    writer.close()
+                    raise
+
+                if keep_alive:
+                    self._idle.append((reader, writer, asyncio.get_running_loop().time()))
+                else:
+                    writer.close()
+
+                return status, reason, response_headers, data
+
+    async def _exchange(self,
+                        reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter,
+                        method: str,
+                        path: str,
+                        body: Optional[bytes],
+                        headers: Dict[str, str]) -> Tuple[int, str, Dict[str, str], bytes, bool]:
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self._host_header}\r\n"
+        for key, value in headers.items():
+            head += f"{key}: {value}\r\n"
+        if body is not None:
+            head += f"Content-Length: {len(body)}\r\n"
+
+        try:
+            writer.write(head.encode("latin-1") + b"\r\n" + (body or b""))
+            await writer.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            raise _StaleConnectionError(sent=False)
+
+        try:
+            status_line = await reader.readline()
+        except ConnectionResetError:
+            raise _StaleConnectionError(sent=True)
+        if not status_line:
+            raise _StaleConnectionError(sent=True)
+
+        version, status, reason = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+        status_code = int(status)
+
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in [b"\r\n", b"\n", b""]:
+                break
+            key, value = line.decode("latin-1").split(":", 1)
+            response_headers[key.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and response_headers.get("connection", "").lower() != "close"
+        if status_code < 200 or status_code in [HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED] or method == "HEAD":
+            data = b""
+        elif "chunked" in response_headers.get("transfer-encoding", "").lower():
+            data = await self._read_chunked(reader)
+        elif "content-length" in response_headers:
+            data = await reader.readexactly(int(response_headers["content-length"]))
+        else:
+            data = await reader.read()
+            keep_alive = False
+
+        return status_code, reason, response_headers, data, keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks: List[bytes] = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip(), 16)
+            if size == 0:
+                # Discard any trailers
+                while (await reader.readline()) not in [b"\r\n", b"\n", b""]:
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for _, writer, _ in idle:
+            writer.close()
+
+
+class _LoopState:
+    """
+    State that must be bound to a single event loop, since ``asyncio`` streams and locks cannot be shared across
+    loops.
+    """
+
+    def __init__(self) -> None:
+        self.pools: Dict[str, _AsyncConnectionPool] = {}
+        self.start_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _get_loop_state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+
+    with _loop_states_lock:
+        state = _loop_states.get(loop)
+        if state is None:
+            state = _LoopState()
+            _loop_states[loop] = state
+
+    return state
+
+
+def _get_pool(url: str) -> _AsyncConnectionPool:
+    origin = connection._origin(url)
+    pools = _get_loop_state().pools
+
+    pool = pools.get(origin)
+    if pool is None:
+        pool = _AsyncConnectionPool(origin)
+        pools[origin] = pool
+
+    return pool
+
+
+def _close_pool(url: str) -> None:
+    pool = _get_loop_state().pools.pop(connection._origin(url), None)
+
+    if pool is not None:
+        pool.close()
+
+
+async def _install_ngrok(pyngrok_config: PyngrokConfig) -> None:
+    if not os.path.exists(pyngrok_config.ngrok_path) or not os.path.exists(conf.get_config_path(pyngrok_config)):
+        await asyncio.get_running_loop().run_in_executor(None, ngrok.install_ngrok, pyngrok_config)
+
+
+async def _healthy(ngrok_process: NgrokProcess) -> bool:
+    if ngrok_process.api_url is None or not ngrok_process._startup_logged():
+        return False
+
+    if not ngrok_process.api_url.lower().startswith("http"):
+        raise PyngrokSecurityError(f"URL must start with \"http\": {ngrok_process.api_url}")
+
+    try:
+        status, _, _, _ = await _get_pool(ngrok_process.api_url).request(
+            "GET", ngrok._tunnels_api_path(ngrok_process.pyngrok_config), None, {},
+            ngrok_process.pyngrok_config.request_timeout)
+    except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return False
+
+    return status == HTTPStatus.OK and ngrok_process.proc.poll() is None
+
+
+async def _wait_for_api(ngrok_process: NgrokProcess,
+                        deadline: float) -> bool:
+    loop = asyncio.get_running_loop()
+    backoff = process.STARTUP_PROBE_INITIAL_BACKOFF
+    for attempt in range(1, process.STARTUP_PROBE_MAX_ATTEMPTS + 1):
+        if await _healthy(ngrok_process):
+            ngrok_process._record_startup_timing("api_ready")
+
+            return True
+
+        remaining = deadline - loop.time()
+        if attempt == process.STARTUP_PROBE_MAX_ATTEMPTS or remaining <= 0 or ngrok_process.proc.poll() is not None:
+            break
+
+        await asyncio.sleep(min(backoff, remaining))
+        backoff = min(backoff * 2, process.STARTUP_PROBE_MAX_BACKOFF)
+
+    return False
+
+
+@contextlib.asynccontextmanager
+async def _start_lock(ngrok_path: str) -> AsyncIterator[None]:
+    # The per-path start lock is shared with process.get_process(), so sync and async callers share one startup. It
+    # must be released by the thread that acquired it, so a thread of its own holds it while the loop starts ngrok.
+    loop = asyncio.get_running_loop()
+    acquired = loop.create_future()
+    release = threading.Event()
+
+    def set_acquired() -> None:
+        if not acquired.done():
+            acquired.set_result(None)
+
+    def hold() -> None:
+        with process._start_lock(ngrok_path):
+            loop.call_soon_threadsafe(set_acquired)
+            release.wait()
+
+    threading.Thread(target=hold, name="pyngrok-aio-start-lock", daemon=True).start()
+
+    try:
+        await acquired
+
+        yield
+    finally:
+        release.set()
+
+
+async def _start_process(pyngrok_config: PyngrokConfig) -> NgrokProcess:
+    # Should only be called while holding _start_lock(), on whose thread process.kill_process() would deadlock
+    loop = asyncio.get_running_loop()
+
+    # Started like any other process, rather than with the loop's subprocess support, so its output is still read
+    # (and it can still be managed with process and ngrok) after the loop is closed
+    ngrok_process = await loop.run_in_executor(None, process._spawn_process, pyngrok_config)
+
+    reader = ngrok_process._stdout_reader()
+    healthy = False
+    timeout = loop.time() + pyngrok_config.startup_timeout
+    while loop.time() < timeout:
+        if reader is None:
+            logger.debug("Output from process is empty, breaking startup loop")
+            break
+
+        line = await loop.run_in_executor(None, reader.readline, max(timeout - loop.time(), 0))
+        if line is None:
+            if reader.eof:
+                break
+
+            continue
+
+        ngrok_process._log_startup_line(line)
+
+        # The web interface is only probed once the logs show startup is complete, not on every line
+        if ngrok_process._startup_logged():
+            healthy = await _wait_for_api(ngrok_process, timeout)
+            break
+
+        if ngrok_process.proc.poll() is not None:
+            break
+
+    if not healthy:
+        # If the process did not come up in a healthy state, clean up the state
+        await loop.run_in_executor(None, _kill_unhealthy_process, ngrok_process)
+
+        if ngrok_process.startup_error is not None:
+            raise PyngrokNgrokError(f"The ngrok process errored on start: {ngrok_process.startup_error}.",
+                                    ngrok_process.logs.snapshot(),
+                                    ngrok_process.startup_error)
+        else:
+            raise PyngrokNgrokError("The ngrok process was unable to start.", ngrok_process.logs.snapshot())
+
+    logger.debug(f"ngrok process has started with API URL: {ngrok_process.api_url}")
+
+    ngrok_process.startup_error = None
+    ngrok_process._started = True
+
+    if pyngrok_config.monitor_thread:
+        ngrok_process.start_monitor_thread()
+
+    return ngrok_process
+
+
+def _kill_unhealthy_process(ngrok_process: NgrokProcess) -> None:
+    ngrok_process.proc.kill()
+    ngrok_process.proc.wait()
+    process._remove_process(ngrok_process.pyngrok_config.ngrok_path, ngrok_process)
+
+
+async def get_ngrok_process(pyngrok_config: Optional[PyngrokConfig] = None) -> NgrokProcess:
+    """
+    Get the current ``ngrok`` process for the given config's ``ngrok_path``. This is the ``async`` equivalent of
+    :func:`~pyngrok.ngrok.get_ngrok_process`.
+
+    If ``ngrok`` is not installed at :class:`~pyngrok.conf.PyngrokConfig`'s ``ngrok_path``, calling this method
+    will first download and install ``ngrok`` (in the loop's default executor).
+
+    If ``ngrok`` is not running, calling this method will first start a process, waiting for it without blocking
+    the loop. Concurrent callers, on any loop or thread (including :func:`~pyngrok.process.get_process`), share a
+    single startup. The process is not tied to the running loop, so its logs are monitored by a thread (or the
+    shared reactor) as usual, and it keeps running, and can still be managed by :mod:`~pyngrok.ngrok`, after the
+    loop is closed. If ``multiprocess`` is set, the process is instead started (or attached to) by
+    :func:`~pyngrok.process.get_process`, in the loop's default executor.
+
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :return: The ``ngrok`` process.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    ngrok_process = process._started_process(pyngrok_config.ngrok_path)
+    if ngrok_process is not None:
+        return ngrok_process
+
+    await _install_ngrok(pyngrok_config)
+
+    if pyngrok_config.multiprocess:
+        # Shared with other Python processes through a lock file, which is waited on with blocking calls
+        return await asyncio.get_running_loop().run_in_executor(None, process.get_process, pyngrok_config)
+
+    start_locks = _get_loop_state().start_locks
+    lock = start_locks.setdefault(pyngrok_config.ngrok_path, asyncio.Lock())
+    async with lock, _start_lock(pyngrok_config.ngrok_path):
+        # Another caller may have started the process while this one waited for the lock
+        ngrok_process = process._running_process(pyngrok_config.ngrok_path)
+        if ngrok_process is not None:
+            return ngrok_process
+
+        return await _start_process(pyngrok_config)
+
+
+async def connect(addr: Optional[str] = None,
+                  proto: Optional[Union[str, int]] = None,
+                  name: Optional[str] = None,
+                  pyngrok_config: Optional[PyngrokConfig] = None,
+                  **options: Any) -> NgrokTunnel:
+    """
+    Establish a new ``ngrok`` tunnel for the given protocol to the given port, returning an object representing
+    the connected tunnel. This is the ``async`` equivalent of :func:`~pyngrok.ngrok.connect`, and accepts the
+    same arguments.
+
+    :param addr: The local port to which the tunnel will forward traffic, or a
+        `local directory or network address <https://ngrok.com/docs/http/#file-serving>`_,
+        defaults to "80".
+    :param proto: A valid tunnel protocol, defaults to "http".
+    :param name: A friendly name for the tunnel, or the name of a definition in ``ngrok``'s config file.
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :param options: Remaining ``kwargs`` are passed as configuration for the ``ngrok`` agent.
+    :return: The created ``ngrok`` tunnel.
+    :raises: :class:`~pyngrok.exception.PyngrokError`: When the tunnel definition is invalid, the requested
+        options are incompatible with the configured ``config_version``, or the response does not contain
+        ``public_url``.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    api_path = ngrok._prepare_tunnel_options(pyngrok_config, options, addr, proto, name)
+
+    logger.info(f"Opening tunnel named: {options.get('name')}")
+
+    api_url = (await get_ngrok_process(pyngrok_config)).api_url
+
+    logger.debug(f"Creating tunnel with options: {options}")
+
+    return ngrok._register_tunnel(await api_request(f"{api_url}{api_path}", method="POST", data=options,
+                                                    timeout=pyngrok_config.request_timeout),
+                                  pyngrok_config, api_url)
+
+
+async def disconnect(public_url: str,
+                     pyngrok_config: Optional[PyngrokConfig] = None) -> None:
+    """
+    Disconnect the ``ngrok`` tunnel for the given URL, if open. This is the ``async`` equivalent of
+    :func:`~pyngrok.ngrok.disconnect`.
+
+    :param public_url: The public URL of the tunnel to disconnect.
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    # If ngrok is not running, there are no tunnels to disconnect
+    if not process.is_process_running(pyngrok_config.ngrok_path):
+        logger.debug(f"\"ngrok_path\" {pyngrok_config.ngrok_path} is not running a process")
+
+        return
+
+    api_url = (await get_ngrok_process(pyngrok_config)).api_url
+
+    registry = ngrok._tunnel_registry(pyngrok_config)
+
+    # Looked up once, since another thread may remove the tunnel between a check and a read
+    tunnel = registry.get(public_url)
+    if tunnel is None:
+        await refresh_tunnels(pyngrok_config)
+
+        # One more check, if the given URL is still not in the list of tunnels, it is not active
+        tunnel = registry.get(public_url)
+        if tunnel is None:
+            return
+
+    logger.info(f"Disconnecting tunnel: {tunnel.public_url}")
+
+    await api_request(f"{api_url}{tunnel.uri}", method="DELETE",
+                      timeout=pyngrok_config.request_timeout)
+
+    registry.pop(public_url, None)
+
+
+async def get_tunnels(pyngrok_config: Optional[PyngrokConfig] = None) -> List[NgrokTunnel]:
+    """
+    Get a list of active ``ngrok`` tunnels for the given config's ``ngrok_path``. This is the ``async``
+    equivalent of :func:`~pyngrok.ngrok.get_tunnels`.
+
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :return: The active ``ngrok`` tunnels.
+    :raises: :class:`~pyngrok.exception.PyngrokError`: When the response was invalid or does not
+        contain ``public_url``.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    api_url = (await get_ngrok_process(pyngrok_config)).api_url
+
+    response = await api_request(f"{api_url}{ngrok._tunnels_api_path(pyngrok_config)}", method="GET",
+                                 timeout=pyngrok_config.request_timeout)
+
+    return ngrok._register_tunnels(response, pyngrok_config, api_url)
+
+
+async def refresh_tunnels(pyngrok_config: Optional[PyngrokConfig] = None) -> TunnelDiff:
+    """
+    Refresh the list of active ``ngrok`` tunnels, applying what changed since they were last listed. This is the
+    ``async`` equivalent of :func:`~pyngrok.ngrok.refresh_tunnels`.
+
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :return: The tunnels that were added, removed, and changed.
+    :raises: :class:`~pyngrok.exception.PyngrokError`: When the response was invalid or does not
+        contain ``public_url``.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    api_url = (await get_ngrok_process(pyngrok_config)).api_url
+
+    response = await api_request(f"{api_url}{ngrok._tunnels_api_path(pyngrok_config)}", method="GET",
+                                 timeout=pyngrok_config.request_timeout)
+
+    return ngrok._sync_tunnels(response, pyngrok_config, api_url)[1]
+
+
+async def get_tunnel(name: Optional[str] = None,
+                     id: Optional[str] = None,
+                     public_url: Optional[str] = None,
+                     upstream: Optional[str] = None,
+                     pyngrok_config: Optional[PyngrokConfig] = None) -> Optional[NgrokTunnel]:
+    """
+    Get an active ``ngrok`` tunnel by its name, ID, public URL, or upstream URL. This is the ``async`` equivalent
+    of :func:`~pyngrok.ngrok.get_tunnel`.
+
+    :param name: The name of the tunnel.
+    :param id: The ID of the tunnel.
+    :param public_url: The public URL of the tunnel.
+    :param upstream: The upstream URL of the tunnel, as reported by ``ngrok``.
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :return: The matching tunnel, or ``None``.
+    :raises: :class:`~pyngrok.exception.PyngrokError`: When no criteria is given, or the response was invalid.
+    """
+    if name is None and id is None and public_url is None and upstream is None:
+        raise PyngrokError("At least one of \"name\", \"id\", \"public_url\", or \"upstream\" must be given.")
+
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    registry = ngrok._tunnel_registry(pyngrok_config)
+
+    tunnel = registry.find(name=name, id=id, public_url=public_url, upstream=upstream)
+    if tunnel is not None:
+        return tunnel
+
+    if not process.is_process_running(pyngrok_config.ngrok_path):
+        logger.debug(f"\"ngrok_path\" {pyngrok_config.ngrok_path} is not running a process")
+
+        return None
+
+    await refresh_tunnels(pyngrok_config)
+
+    return registry.find(name=name, id=id, public_url=public_url, upstream=upstream)
+
+
+async def kill(pyngrok_config: Optional[PyngrokConfig] = None) -> None:
+    """
+    Terminate the ``ngrok`` process, if running, for the given config's ``ngrok_path``. This is the ``async``
+    equivalent of :func:`~pyngrok.ngrok.kill`.
+
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    ngrok_process = process._current_processes.get(pyngrok_config.ngrok_path)
+
+    # Killing a process waits on its start lock, so is done in the loop's default executor
+    await asyncio.get_running_loop().run_in_executor(None, process.kill_process, pyngrok_config.ngrok_path)
+
+    if ngrok_process is not None and ngrok_process.api_url is not None:
+        _close_pool(ngrok_process.api_url)
+
+    ngrok._forget_tunnels(pyngrok_config)
+
+
+async def api_request(url: str,
+                      method: str = "GET",
+                      data: Optional[Dict[str, Any]] = None,
+                      params: Optional[Dict[str, Any]] = None,
+                      timeout: float = 4,
+                      auth: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Invoke an API request to the given URL, returning JSON data from the response. This is the ``async``
+    equivalent of :func:`~pyngrok.ngrok.api_request`, and makes requests over keep-alive connections pooled on
+    the running event loop.
+
+    :param url: The request URL.
+    :param method: The HTTP method.
+    :param data: The request body.
+    :param params: The URL parameters.
+    :param timeout: The request timeout, in seconds.
+    :param auth: Set as Bearer for an Authorization header.
+    :return: The response from the request.
+    :raises: :class:`~pyngrok.exception.PyngrokSecurityError`: When the ``url`` is not supported.
+    :raises: :class:`~pyngrok.exception.PyngrokNgrokHTTPError`: When the request returns an error response.
+    :raises: :class:`~pyngrok.exception.PyngrokNgrokURLError`: When the request times out.
+    """
+    if not url.lower().startswith("http"):
+        raise PyngrokSecurityError(f"URL must start with \"http\": {url}")
+
+    encoded_data = json.dumps(data).encode("utf-8") if data else None
+
+    if params:
+        url += f"?{urlencode([(x, params[x]) for x in params])}"
+
+    headers = {"Content-Type": "application/json"}
+    if auth:
+        headers["Ngrok-Version"] = "2"
+        headers["Authorization"] = f"Bearer {auth}"
+
+    logger.debug(f"Making {method} request to {url} with data: {data}")
+
+    parsed = urlsplit(url)
+    path = parsed.path or "/"
+    if parsed.query:
+        path += f"?{parsed.query}"
+
+    try:
+        status_code, reason, response_headers, body = await _get_pool(url).request(method.upper(), path,
+                                                                                   encoded_data, headers, timeout)
+    except asyncio.TimeoutError:
+        raise PyngrokNgrokURLError("ngrok client exception, URLError: timed out", "timed out")
+    except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+        raise PyngrokNgrokURLError(f"ngrok client exception, URLError: {e}", e)
+
+    response_data = body.decode("utf-8")
+    logger.debug(f"Response {status_code}: {response_data.strip()}")
+
+    if str(status_code)[0] != "2":
+        raise PyngrokNgrokHTTPError(f"ngrok client exception, API returned {status_code}: {response_data}", url,
+                                    status_code, reason, response_headers, response_data)
+    elif status_code == HTTPStatus.NO_CONTENT:
+        return {}
+
+    return json.loads(response_data)  # type: ignore
+
+
+async def get_agent_status(pyngrok_config: Optional[PyngrokConfig] = None) -> NgrokAgent:
+    """
+    Get the ``ngrok`` agent status. This is the ``async`` equivalent of :func:`~pyngrok.agent.get_agent_status`.
+
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :return: The agent status.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    api_url = (await get_ngrok_process(pyngrok_config)).api_url
+
+    return NgrokAgent(await api_request(f"{api_url}/api/status", "GET",
+                                        timeout=pyngrok_config.request_timeout))
+
+
+async def get_requests(tunnel_name: Optional[str] = None,
+                       pyngrok_config: Optional[PyngrokConfig] = None) -> List[CapturedRequest]:
+    """
+    Get the list of requests made to either all tunnels, or the given tunnel name. This is the ``async``
+    equivalent of :func:`~pyngrok.agent.get_requests`.
+
+    :param tunnel_name: The tunnel name to filter by.
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :return: The requests made to the tunnels.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+    params = {"tunnel_name": tunnel_name} if tunnel_name else None
+
+    api_url = (await get_ngrok_process(pyngrok_config)).api_url
+
+    response = await api_request(f"{api_url}/api/requests/http", "GET",
+                                 params=params,
+                                 timeout=pyngrok_config.request_timeout)
+
+    return [CapturedRequest(request) for request in response["requests"]]
+
+
+async def get_request(request_id: str,
+                      pyngrok_config: Optional[PyngrokConfig] = None) -> CapturedRequest:
+    """
+    Get the given request made. This is the ``async`` equivalent of :func:`~pyngrok.agent.get_request`.
+
+    :param request_id: The ID of the request to fetch.
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :return: The request made to the tunnel.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    api_url = (await get_ngrok_process(pyngrok_config)).api_url
+
+    return CapturedRequest(await api_request(f"{api_url}/api/requests/http/{request_id}", "GET",
+                                             timeout=pyngrok_config.request_timeout))
+
+
+async def replay_request(request_id: str,
+                         tunnel_name: Optional[str] = None,
+                         pyngrok_config: Optional[PyngrokConfig] = None) -> None:
+    """
+    Replay a given request through its original tunnel, or through a different given tunnel. This is the
+    ``async`` equivalent of :func:`~pyngrok.agent.replay_request`.
+
+    :param request_id: The request ID.
+    :param tunnel_name: The name of tunnel to replay the request through.
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    api_url = (await get_ngrok_process(pyngrok_config)).api_url
+
+    await api_request(f"{api_url}/api/requests/http", "POST",
+                      data={"id": request_id, "tunnel_name": tunnel_name},
+                      timeout=pyngrok_config.request_timeout)
+
+
+async def delete_requests(pyngrok_config: Optional[PyngrokConfig] = None) -> None:
+    """
+    Delete request history. This is the ``async`` equivalent of :func:`~pyngrok.agent.delete_requests`.
+
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    api_url = (await get_ngrok_process(pyngrok_config)).api_url
+
+    await api_request(f"{api_url}/api/requests/http", "DELETE",
+                      timeout=pyngrok_config.request_timeout)
@@ -2,16 +2,17 @@ __copyright__ = "Copyright (c) 2018-2025 Alex Laird"
 __license__ = "MIT"
 
 import os
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 
 from pyngrok.installer import get_ngrok_bin, get_default_ngrok_dir
 from pyngrok.log import NgrokLog
 
 DEFAULT_CONFIG_PATH: Optional[str] = None
 
-DEFAULT_NGROK_DIR = get_default_ngrok_dir()
-DEFAULT_NGROK_CONFIG_PATH = os.path.join(DEFAULT_NGROK_DIR, "ngrok.yml")
-DEFAULT_NGROK_PATH = os.path.join(DEFAULT_NGROK_DIR, get_ngrok_bin())
+# Derived from the platform, so computed on first access (see __getattr__) rather than when the module is imported
+DEFAULT_NGROK_DIR: str
+DEFAULT_NGROK_CONFIG_PATH: str
+DEFAULT_NGROK_PATH: str
 
 
 class PyngrokConfig:
@@ -52,10 +53,16 @@ class PyngrokConfig:
                  start_new_session: bool = False,
                  ngrok_version: str = "3",
                  api_key: Optional[str] = None,
-                 config_version: str = "2") -> None:
+                 config_version: str = "2",
+                 shared_monitor: bool = False,
+                 log_batch_callback: Optional[Callable[[List[NgrokLog]], None]] = None,
+                 log_queue_size: int = 0,
+                 log_queue_overflow: str = "drop_oldest",
+                 log_batch_size: int = 100,
+                 multiprocess: bool = False) -> None:
         #: The path to the ``ngrok`` binary, defaults to being placed in the same directory as
         #: `ngrok's configs <https://ngrok.com/docs/agent/config/v2>`_.
-        self.ngrok_path: str = DEFAULT_NGROK_PATH if ngrok_path is None else ngrok_path
+        self.ngrok_path: str = _platform_default("DEFAULT_NGROK_PATH") if ngrok_path is None else ngrok_path
         #: The path to the ``ngrok`` config, defaults to ``None`` and ``ngrok`` manages it.
         self.config_path: Optional[str] = DEFAULT_CONFIG_PATH if config_path is None else config_path
         #: A ``ngrok`` authtoken to pass to commands (overrides what is in the config). If a value is not passed, will
@@ -83,9 +90,33 @@ class PyngrokConfig:
         self.api_key: Optional[str] = api_key or os.environ.get("NGROK_API_KEY")
         #: The ``ngrok`` config version.
         self.config_version = config_version
-
-
-_default_pyngrok_config: PyngrokConfig = PyngrokConfig()
+        #: If ``monitor_thread`` is ``True``, monitor ``ngrok`` from the single reactor thread shared by every
+        #: process, rather than from a thread of its own, and invoke ``log_event_callback`` on a bounded pool of
+        #: worker threads. (POSIX only).
+        self.shared_monitor: bool = shared_monitor
+        #: A callback that will be invoked with batches of logs as ``ngrok`` emits them. The function should take
+        #: one argument, a :py:class:`list` of :class:`~pyngrok.log.NgrokLog`. Setting this enables queued
+        #: delivery (see ``log_queue_size``).
+        self.log_batch_callback: Optional[Callable[[List[NgrokLog]], None]] = log_batch_callback
+        #: If greater than ``0``, ``log_event_callback`` and ``log_batch_callback`` are invoked from a dedicated
+        #: thread, fed through a queue of this size, rather than from the thread reading ``ngrok``'s logs, so a slow
+        #: callback does not back up ``ngrok``'s output. If ``log_batch_callback`` is set and this is ``0``, a queue
+        #: of size 1000 is used.
+        self.log_queue_size: int = log_queue_size
+        #: What to do with a log when the queue is full: ``drop_oldest`` to evict the oldest queued log,
+        #: ``drop_newest`` to discard the new log, or ``block`` to wait for room in the queue (which may, in turn,
+        #: back up ``ngrok``'s output).
+        self.log_queue_overflow: str = log_queue_overflow
+        #: The max number of logs passed to ``log_batch_callback`` at once.
+        self.log_batch_size: int = log_batch_size
+        #: Whether the ``ngrok`` process is shared with other Python processes using the same config (for instance,
+        #: pre-fork web server workers). The first to need ``ngrok`` starts it, and records it in a state file next
+        #: to the ``ngrok`` config, and the others attach to it rather than starting their own. The process lives as
+        #: long as the Python process that started it, and the next to need ``ngrok`` then starts a new one.
+        self.multiprocess: bool = multiprocess
+
+
+_default_pyngrok_config: Optional[PyngrokConfig] = None
 
 
 def get_default() -> PyngrokConfig:
@@ -96,8 +127,11 @@ def get_default() -> PyngrokConfig:
 
     :return: The default ``pyngrok_config``.
     """
+    global _default_pyngrok_config
+
+    # Created on first use, so its platform-derived defaults are not computed when the module is imported
     if _default_pyngrok_config is None:
-        set_default(PyngrokConfig())
+        _default_pyngrok_config = PyngrokConfig()
 
     return _default_pyngrok_config
 
@@ -124,4 +158,28 @@ def get_config_path(pyngrok_config: PyngrokConfig) -> str:
     if pyngrok_config.config_path is not None:
         return pyngrok_config.config_path
     else:
-        return DEFAULT_NGROK_CONFIG_PATH
+        return _platform_default("DEFAULT_NGROK_CONFIG_PATH")
+
+
+def _platform_default(name: str) -> str:
+    # A value already set on the module (for instance, overridden by the user) takes precedence
+    if name in globals():
+        value: str = globals()[name]
+        return value
+
+    if name == "DEFAULT_NGROK_DIR":
+        value = get_default_ngrok_dir()
+    elif name == "DEFAULT_NGROK_CONFIG_PATH":
+        value = os.path.join(_platform_default("DEFAULT_NGROK_DIR"), "ngrok.yml")
+    elif name == "DEFAULT_NGROK_PATH":
+        value = os.path.join(_platform_default("DEFAULT_NGROK_DIR"), get_ngrok_bin())
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+
+    return value
+
+
+def __getattr__(name: str) -> str:
+    return _platform_default(name)
@@ -0,0 +1,236 @@
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import logging
+import os
+import threading
+import time
+from http.client import HTTPConnection, HTTPException, HTTPMessage, RemoteDisconnected
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_IDLE_TIMEOUT = 30.0
+#: The HTTP methods that may be retried after the request was sent, since repeating them has no additional effect.
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS"])
+
+_pools: Dict[str, "ConnectionPool"] = {}
+_pools_lock = threading.Lock()
+
+
+class PooledResponse:
+    """
+    An object containing a fully read response from a pooled connection.
+    """
+
+    def __init__(self,
+                 status: int,
+                 reason: str,
+                 headers: HTTPMessage,
+                 body: bytes) -> None:
+        #: The response status code.
+        self.status: int = status
+        #: The response reason phrase.
+        self.reason: str = reason
+        #: The response headers.
+        self.headers: HTTPMessage = headers
+        #: The raw response body.
+        self.body: bytes = body
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of persistent HTTP/1.1 keep-alive connections to a single ``ngrok`` web interface.
+
+    Idle connections are reused in LIFO order, so the most recently used (and therefore most likely still open)
+    connection is handed out first. At most ``max_size`` idle connections are retained, and idle connections
+    older than ``idle_timeout`` seconds are closed rather than reused. Requests made while every retained
+    connection is in use open a new connection, which is retained afterward only if there is room in the pool.
+    """
+
+    def __init__(self,
+                 api_url: str,
+                 max_size: int = DEFAULT_POOL_SIZE,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> None:
+        parsed = urlsplit(api_url)
+        if parsed.scheme != "http" or not parsed.hostname:
+            raise ValueError(f"Connection pooling requires an \"http\" URL: {api_url}")
+
+        #: The API URL for the ``ngrok`` web interface.
+        self.api_url: str = api_url
+        #: The max number of idle connections to retain.
+        self.max_size: int = max_size
+        #: The max time, in seconds, a connection may sit idle before it is discarded.
+        self.idle_timeout: float = idle_timeout
+
+        self._host: str = parsed.hostname
+        self._port: Optional[int] = parsed.port
+        self._idle: List[Tuple[HTTPConnection, float]] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __repr__(self) -> str:
+        return f"<ConnectionPool: \"{self.api_url}\">"
+
+    def _acquire(self, timeout: float) -> Tuple[HTTPConnection, bool]:
+        now = time.monotonic()
+        stale = []
+        conn = None
+        with self._lock:
+            while self._idle:
+                candidate, last_used = self._idle.pop()
+                if now - last_used > self.idle_timeout:
+                    stale.append(candidate)
+                else:
+                    conn = candidate
+                    break
+
+        for s in stale:
+            s.close()
+
+        if conn is None:
+            return HTTPConnection(self._host, self._port, timeout=timeout), False
+
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+
+        return conn, True
+
+    def _release(self, conn: HTTPConnection) -> None:
+        with self._lock:
+            if not self._closed and len(self._idle) < self.max_size:
+                self._idle.append((conn, time.monotonic()))
+                return
+
+        conn.close()
+
+    def request(self,
+                method: str,
+                path: str,
+                body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None,
+                timeout: float = 4) -> PooledResponse:
+        """
+        Make a request over a pooled connection, returning the fully read response.
+
+        If a reused connection turns out to have been closed by the server while it sat idle, the request is
+        retried on a fresh connection, but only if it was not yet fully sent, or its method is one of
+        :attr:`IDEMPOTENT_METHODS`. Otherwise (for instance, a ``POST`` that may already have started a tunnel),
+        the error is raised rather than risk repeating the request.
+
+        :param method: The HTTP method.
+        :param path: The request path, including any query string.
+        :param body: The request body.
+        :param headers: The request headers.
+        :param timeout: The request timeout, in seconds.
+        :return: The response.
+        :raises: :py:class:`OSError`: When the connection fails or times out.
+        :raises: :py:class:`http.client.HTTPException`: When the response is malformed.
+        """
+        if headers is None:
+            headers = {}
+
+        while True:
+            conn, reused = self._acquire(timeout)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                data = response.read()
+            except (RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if reused and (not sent or method.upper() in IDEMPOTENT_METHODS):
+                    logger.debug(f"Pooled connection to {self.api_url} was closed by the server, reconnecting")
+
+                    continue
+                raise
+            except (OSError, HTTPException):
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+
+            return PooledResponse(response.status, response.reason, response.headers, data)
+
+    def close(self) -> None:
+        """
+        Close all idle connections and stop retaining new ones. Requests that are in flight will complete, but
+        their connections will be closed rather than returned to the pool.
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+
+        for conn, _ in idle:
+            conn.close()
+
+
+def _origin(url: str) -> str:
+    parsed = urlsplit(url)
+
+    return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+
+def get_pool(url: str) -> Optional[ConnectionPool]:
+    """
+    Get the connection pool, if one exists, for the ``ngrok`` web interface that serves the given URL.
+
+    :param url: The API URL, or any URL on the same origin.
+    :return: The connection pool, or ``None`` if one does not exist.
+    """
+    with _pools_lock:
+        return _pools.get(_origin(url))
+
+
+def get_or_create_pool(url: str) -> ConnectionPool:
+    """
+    Get the connection pool for the ``ngrok`` web interface that serves the given URL, creating it if it does
+    not already exist.
+
+    :param url: The API URL, or any URL on the same origin.
+    :return: The connection pool.
+    """
+    origin = _origin(url)
+
+    with _pools_lock:
+        pool = _pools.get(origin)
+        if pool is None:
+            pool = ConnectionPool(origin)
+            _pools[origin] = pool
+
+    return pool
+
+
+def close_pool(url: str) -> None:
+    """
+    Close and discard the connection pool, if one exists, for the ``ngrok`` web interface that serves the
+    given URL.
+
+    :param url: The API URL, or any URL on the same origin.
+    """
+    with _pools_lock:
+        pool = _pools.pop(_origin(url), None)
+
+    if pool is not None:
+        logger.debug(f"Closing connection pool for {pool.api_url}")
+
+        pool.close()
+
+
+def _reset_after_fork() -> None:
+    global _pools, _pools_lock
+
+    # Pooled connections are sockets shared with the parent, so the child must not reuse them
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -27,6 +27,13 @@ class PyngrokNgrokInstallError(PyngrokError):
     pass
 
 
+class PyngrokNgrokChecksumError(PyngrokNgrokInstallError):
+    """
+    Raised when a downloaded ``ngrok`` archive is incomplete, or does not match its expected SHA-256 digest.
+    """
+    pass
+
+
 class PyngrokNgrokError(PyngrokError):
     """
     Raised when an error occurs interacting directly with the ``ngrok`` binary.
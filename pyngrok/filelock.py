@@ -0,0 +1,127 @@
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import logging
+import os
+import sys
+import time
+from types import TracebackType
+from typing import IO, Optional, Type
+
+from pyngrok.exception import PyngrokError
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+#: The delay, in seconds, between attempts to acquire a lock held by another process.
+POLL_INTERVAL = 0.05
+
+
+class FileLock:
+    """
+    An inter-process lock backed by a lock file, so that only one process at a time (for instance, one of many
+    pre-fork web server workers) holds it. The lock is held on the open file, so the OS releases it if the process
+    holding it exits. It also excludes other threads in the same process, but is not reentrant.
+
+    .. code-block:: python
+
+        from pyngrok.filelock import FileLock
+
+        with FileLock("/tmp/ngrok.yml.lock", timeout=10):
+            ...
+    """
+
+    def __init__(self,
+                 path: str,
+                 timeout: Optional[float] = None) -> None:
+        #: The path to the lock file.
+        self.path: str = path
+        #: The max time, in seconds, to wait to acquire the lock. Waits indefinitely if ``None``.
+        self.timeout: Optional[float] = timeout
+
+        self._file: Optional[IO[bytes]] = None
+
+    def __repr__(self) -> str:
+        return f"<FileLock: \"{self.path}\" locked={self.locked}>"
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+
+        return self
+
+    def __exit__(self,
+                 exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.release()
+
+    @property
+    def locked(self) -> bool:
+        """
+        Whether this lock is currently held.
+        """
+        return self._file is not None
+
+    def acquire(self) -> None:
+        """
+        Acquire the lock, waiting for another process to release it if necessary.
+
+        :raises: :class:`~pyngrok.exception.PyngrokError`: When the lock could not be acquired before the timeout.
+        """
+        lock_dir = os.path.dirname(self.path)
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        lock_file = open(self.path, "a+b")
+        while True:
+            try:
+                _lock(lock_file)
+                break
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    lock_file.close()
+
+                    raise PyngrokError(f"Timed out after {self.timeout} seconds waiting for the lock: {self.path}")
+
+                time.sleep(POLL_INTERVAL)
+
+        logger.debug(f"Acquired lock: {self.path}")
+
+        self._file = lock_file
+
+    def release(self) -> None:
+        """
+        Release the lock, if it is held.
+        """
+        if self._file is None:
+            return
+
+        try:
+            _unlock(self._file)
+        finally:
+            self._file.close()
+            self._file = None
+
+        logger.debug(f"Released lock: {self.path}")
+
+
+def _lock(lock_file: IO[bytes]) -> None:
+    if sys.platform == "win32":
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _unlock(lock_file: IO[bytes]) -> None:
+    if sys.platform == "win32":
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -2,24 +2,27 @@ __copyright__ = "Copyright (c) 2018-2025 Alex Laird"
 __license__ = "MIT"
 
 import copy
+import hashlib
+import json
 import logging
 import os
 import platform
+import shutil
 import socket
 import sys
-import tempfile
 import threading
 import time
-import tarfile
-import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from http import HTTPStatus
-from typing import Any, Dict, Optional
+from http.client import HTTPException
+from typing import IO, Any, Callable, Dict, Iterator, Optional, Set, Tuple
 from urllib.error import URLError
-from urllib.request import urlopen
+from urllib.request import Request, urlopen
 
-import yaml
-
-from pyngrok.exception import PyngrokError, PyngrokNgrokInstallError, PyngrokSecurityError
+from pyngrok.exception import PyngrokError, PyngrokNgrokChecksumError, PyngrokNgrokInstallError, \
+    PyngrokSecurityError
+from pyngrok.filelock import FileLock
 
 logger = logging.getLogger(__name__)
 
@@ -41,17 +44,97 @@ PLATFORMS = {
     "freebsd_x86_64": CDN_URL_PREFIX + "ngrok-v3-stable-freebsd-amd64.tgz",
     "freebsd_i386_arm": CDN_URL_PREFIX + "ngrok-v3-stable-freebsd-arm.tgz"
 }
+#: SHA-256 digests of the archives at ``PLATFORMS`` URLs, against which downloads are verified. The stable
+#: archives are replaced with each ``ngrok`` release (and no digest is published alongside them), so none are pinned
+#: by default, and downloads are then only checked to be complete. Pin them (or pass ``sha256`` to
+#: :func:`install_ngrok`) to verify installs against a vetted release.
+PLATFORM_CHECKSUMS: Dict[str, str] = {}
 UNIX_BINARIES = ["darwin", "linux", "freebsd"]
+NGROK_BINARIES = ["ngrok", "ngrok.exe"]
 SUPPORTED_NGROK_VERSIONS = ["3"]
 DEFAULT_DOWNLOAD_TIMEOUT = 6
 DEFAULT_RETRY_COUNT = 0
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DEFAULT_DOWNLOAD_CONCURRENCY = 4
+DEFAULT_CHUNK_RETRY_COUNT = 3
+DEFAULT_CHUNK_RETRY_BACKOFF = 0.5
+DEFAULT_CHECKSUM_RETRY_COUNT = 1
+DEFAULT_CACHE_MAX_SIZE = 256 * 1024 * 1024
+DEFAULT_INSTALL_LOCK_TIMEOUT = 600
+DEFAULT_CONFIG_LOCK_TIMEOUT = 30
 
 config_file_lock = threading.RLock()
 
-_config_cache: Dict[str, Dict[str, Any]] = {}
+_config_file_locks: Dict[Tuple[str, int], Tuple[FileLock, int]] = {}
+_config_file_locks_lock = threading.Lock()
+
 _print_progress_enabled = True
 
 
+class _TunnelDefinition:
+    """
+    A tunnel definition from the ``ngrok`` config, compiled to what is needed to merge it with a tunnel's options.
+    """
+    __slots__ = ("api_name", "options", "addr", "proto")
+
+    def __init__(self,
+                 name: str,
+                 definition: Dict[str, Any]) -> None:
+        #: The name of tunnels started from this definition through the API.
+        self.api_name: str = f"{name}-api"
+        #: The definition's options, less its ``name``, which are overridden by the tunnel's options.
+        self.options: Dict[str, Any] = {k: v for k, v in definition.items() if k != "name"}
+        self.addr: Optional[Any] = definition.get("addr")
+        self.proto: Optional[Any] = definition.get("proto")
+
+
+class _ConfigEntry:
+    """
+    A loaded ``ngrok`` config, with its tunnel definitions compiled and indexed by name, and the modification time
+    and size of the file it was read from, so it is only read again when the file changes.
+    """
+    __slots__ = ("config", "stat_key", "tunnel_definitions", "endpoint_definitions", "_v3_definitions")
+
+    def __init__(self,
+                 config: Dict[str, Any],
+                 stat_key: Optional[Tuple[int, int]] = None) -> None:
+        self.config = config
+        self.stat_key = stat_key
+
+        # Definitions that are empty (for instance, "tunnels: {foo: }") are not matched
+        self.tunnel_definitions: Dict[str, _TunnelDefinition] = {
+            name: _TunnelDefinition(name, definition)
+            for name, definition in (config.get("tunnels") or {}).items()
+            if definition and isinstance(definition, dict)
+        }
+
+        # v3 represents `endpoints` as a list of objects (each with a `name` field), and the first one with a name wins
+        self.endpoint_definitions: Dict[str, _TunnelDefinition] = {}
+        for definition in config.get("endpoints") or []:
+            if not definition or not isinstance(definition, dict):
+                continue
+
+            name = definition.get("name")
+            if name is not None and name not in self.endpoint_definitions:
+                self.endpoint_definitions[name] = _TunnelDefinition(name, definition)
+
+        # `tunnels` is the v2 block, but ngrok also allows it in v3 configs, where `endpoints` take precedence
+        self._v3_definitions = {**self.tunnel_definitions, **self.endpoint_definitions}
+
+    def definitions(self,
+                    config_version: Optional[str]) -> Dict[str, _TunnelDefinition]:
+        """
+        Get the tunnel definitions that apply to the given ``ngrok`` config version, by name.
+
+        :param config_version: The ``ngrok`` config version.
+        :return: The tunnel definitions.
+        """
+        return self._v3_definitions if config_version == "3" else self.tunnel_definitions
+
+
+_config_cache: Dict[str, _ConfigEntry] = {}
+
+
 def get_default_ngrok_dir() -> str:
     """
     Get the default ``ngrok`` directory for the current system.
@@ -68,6 +151,28 @@ def get_default_ngrok_dir() -> str:
         return os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.join(user_home, ".config")), "ngrok")
 
 
+def get_cache_dir() -> str:
+    """
+    Get the directory in which downloaded ``ngrok`` binaries are cached for the current system, so installing
+    ``ngrok`` to another ``ngrok_path`` does not download it again. This can be overridden with the
+    ``PYNGROK_CACHE_DIR`` environment variable.
+
+    :return: The ``ngrok`` cache directory.
+    """
+    cache_dir = os.environ.get("PYNGROK_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+
+    system = get_system()
+    user_home = os.path.expanduser("~")
+    if system == "darwin":
+        return os.path.join(user_home, "Library", "Caches", "pyngrok")
+    elif system == "windows":
+        return os.path.join(user_home, "AppData", "Local", "pyngrok", "Cache")
+    else:
+        return os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(user_home, ".cache")), "pyngrok")
+
+
 def get_system() -> str:
     """
     Parse the name of the OS from the system and return a friendly name.
@@ -150,15 +255,27 @@ def get_ngrok_cdn_url(ngrok_version: Optional[str]) -> str:
 
 def install_ngrok(ngrok_path: str,
                   ngrok_version: Optional[str] = "3",
+                  overwrite: bool = True,
+                  sha256: Optional[str] = None,
                   **kwargs: Any) -> None:
     """
     Download and install the latest ``ngrok`` for the current system, overwriting any existing contents
     at the given path.
 
+    Installs are coordinated across processes with lock files, so concurrent installs to the same path wait for
+    each other, and concurrent downloads of the same archive (even for different paths) wait for the first to
+    finish, then install from the cache rather than downloading it again.
+
     :param ngrok_path: The path to where the ``ngrok`` binary will be downloaded.
     :param ngrok_version: The major version of ``ngrok`` to be installed.
+    :param overwrite: If ``False``, ``ngrok`` is not installed if it already exists at the path once other installs
+        to it have finished (for instance, when another process installed it first). If ``True``, a binary is only
+        installed from the cache if another process downloaded it during this install, so ``ngrok`` is updated to
+        the latest release.
+    :param sha256: The expected SHA-256 digest of the ``ngrok`` archive, overriding ``PLATFORM_CHECKSUMS``.
     :param kwargs: Remaining ``kwargs`` will be passed to :func:`_download_file`.
     :raises: :class:`~pyngrok.exception.PyngrokError`: When the ``ngrok_version`` is not supported.
+    :raises: :class:`~pyngrok.exception.PyngrokNgrokChecksumError`: When the downloaded archive fails verification.
     :raises: :class:`~pyngrok.exception.PyngrokNgrokInstallError`: When an error occurs installing ``ngrok``.
     """
     if ngrok_version:
@@ -177,11 +294,34 @@ def install_ngrok(ngrok_path: str,
         os.makedirs(ngrok_dir)
 
     url = get_ngrok_cdn_url(ngrok_version)
+    sha256 = sha256 or PLATFORM_CHECKSUMS.get(url)
+    # The archives at stable URLs are replaced with each release, so overwriting ngrok only installs a binary from
+    # the cache if it was downloaded by another process during this install
+    downloaded_since = time.time() if overwrite else None
 
     try:
-        download_path = _download_file(url, **kwargs)
-
-        _install_ngrok_archive(ngrok_path, download_path)
+        with FileLock(f"{ngrok_path}.lock", timeout=DEFAULT_INSTALL_LOCK_TIMEOUT):
+            if not overwrite and os.path.exists(ngrok_path):
+                logger.debug(f"ngrok was installed to {ngrok_path} by another process")
+
+                return
+
+            if not _install_from_cache(url, ngrok_path, sha256, downloaded_since):
+                with _url_lock(url):
+                    # Another process may have downloaded the archive while this one waited
+                    if not _install_from_cache(url, ngrok_path, sha256, downloaded_since):
+                        download = _download_file(url, install_to=ngrok_path, sha256=sha256, locked=True, **kwargs)
+
+                        try:
+                            if not download.installed:
+                                _install_ngrok_archive(ngrok_path, download.download_path)
+
+                            _add_to_cache(url, ngrok_path, download.sha256)
+                        finally:
+                            if os.path.exists(download.download_path):
+                                os.remove(download.download_path)
+    except PyngrokNgrokChecksumError as e:
+        raise e
     except Exception as e:
         raise PyngrokNgrokInstallError(f"An error occurred while downloading ngrok from {url}: {e}")
 
@@ -189,31 +329,99 @@ def install_ngrok(ngrok_path: str,
 def _install_ngrok_archive(ngrok_path: str,
                            archive_path: str) -> None:
     """
-    Extract the ``ngrok`` archive to the given path. Supports both ``.zip`` and ``.tgz`` archives.
+    Extract the ``ngrok`` binary from the archive to the given path. Supports both ``.zip`` and ``.tgz`` archives.
 
     :param ngrok_path: The path where ``ngrok`` will be installed.
     :param archive_path: The path to the ``ngrok`` archive file to be extracted.
     """
     _print_progress("Installing ngrok ... ")
 
-    ngrok_dir = os.path.dirname(ngrok_path)
-
     logger.debug(f"Extracting ngrok binary from {archive_path} to {ngrok_path} ...")
 
     if archive_path.endswith(".zip"):
+        import zipfile
+
         with zipfile.ZipFile(archive_path, "r") as zip_ref:
-            zip_ref.extractall(ngrok_dir)
+            names = [name for name in zip_ref.namelist() if os.path.basename(name) in NGROK_BINARIES]
+            if not names:
+                raise PyngrokNgrokInstallError(f"ngrok binary not found in archive: {archive_path}")
+
+            with zip_ref.open(names[0]) as binary:
+                _install_ngrok_binary(ngrok_path, binary)
     elif archive_path.endswith(".tgz") or archive_path.endswith(".tar.gz"):
-        with tarfile.open(archive_path, "r:gz") as tar_ref:
-            tar_ref.extractall(ngrok_dir)
+        with open(archive_path, "rb") as archive:
+            _install_ngrok_tgz(ngrok_path, archive)
     else:
         raise PyngrokNgrokInstallError(f"Unsupported archive format: {archive_path}")
 
-    os.chmod(ngrok_path, int("700", 8))
-
     _clear_progress()
 
 
+def _install_ngrok_tgz(ngrok_path: str,
+                       archive: IO[bytes],
+                       verify: Optional[Callable[[], None]] = None) -> None:
+    """
+    Extract the ``ngrok`` binary from a ``.tgz`` archive to the given path. The archive is decompressed and read in a
+    single pass, so it can be streamed (for instance, straight from the download's response).
+
+    :param ngrok_path: The path where ``ngrok`` will be installed.
+    :param archive: The ``.tgz`` archive to read.
+    :param verify: Called once the rest of the archive has been read, before ``ngrok`` is moved into place, to
+        verify the archive.
+    """
+    import tarfile
+
+    def finish() -> None:
+        # Read to the end, so the whole archive is verified
+        while archive.read(1024 * 1024):
+            pass
+
+        if verify is not None:
+            verify()
+
+    with tarfile.open(fileobj=archive, mode="r|gz") as tar_ref:
+        for member in tar_ref:
+            if member.isfile() and os.path.basename(member.name) in NGROK_BINARIES:
+                binary = tar_ref.extractfile(member)
+                if binary is not None:
+                    _install_ngrok_binary(ngrok_path, binary, finish)
+
+                    return
+
+    raise PyngrokNgrokInstallError("ngrok binary not found in archive")
+
+
+def _install_ngrok_binary(ngrok_path: str,
+                          binary: IO[bytes],
+                          verify: Optional[Callable[[], None]] = None) -> None:
+    """
+    Write the ``ngrok`` binary to a temporary file alongside the given path, then atomically move it into place, so
+    a process starting ``ngrok`` never sees it half-written, and an existing binary (which may be running, or hard
+    linked from the cache) is replaced rather than written over.
+
+    :param ngrok_path: The path where ``ngrok`` will be installed.
+    :param binary: The ``ngrok`` binary to read.
+    :param verify: Called before ``ngrok`` is moved into place, to verify it.
+    """
+    import tempfile
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(ngrok_path), prefix=".ngrok-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            shutil.copyfileobj(binary, f, 1024 * 1024)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if verify is not None:
+            verify()
+
+        os.chmod(tmp_path, int("700", 8))
+        os.replace(tmp_path, ngrok_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
 def get_ngrok_config(config_path: str,
                      use_cache: bool = True,
                      ngrok_version: Optional[str] = "3",
@@ -222,24 +430,45 @@ def get_ngrok_config(config_path: str,
     Get the ``ngrok`` config from the given path.
 
     :param config_path: The ``ngrok`` config path to read.
-    :param use_cache: Use the cached version of the config (if populated).
+    :param use_cache: Use the cached version of the config (if populated), unless the file's modification time or
+        size has changed since it was read.
     :param ngrok_version: The major version of ``ngrok`` installed.
     :param config_version: The ``ngrok`` config version.
     :return: The ``ngrok`` config.
     """
+    return _load_config_entry(config_path, use_cache, ngrok_version, config_version).config
+
+
+def _load_config_entry(config_path: str,
+                       use_cache: bool = True,
+                       ngrok_version: Optional[str] = "3",
+                       config_version: Optional[str] = "2") -> _ConfigEntry:
+    # Rarely needed modules (YAML, archive handling) are imported on first use, so importing pyngrok stays fast
+    import yaml
+
     if ngrok_version:
         ngrok_version = ngrok_version.removeprefix("v")
 
     with config_file_lock:
-        if config_path not in _config_cache or not use_cache:
-            with open(config_path, "r") as config_file:
-                config = yaml.safe_load(config_file)
-                if config is None:
-                    config = get_default_config(ngrok_version, config_version)
+        entry = _config_cache.get(config_path)
+        if use_cache and entry is not None:
+            try:
+                if _stat_key(os.stat(config_path)) == entry.stat_key:
+                    return entry
+            except OSError:
+                # Let opening the file below raise the error
+                pass
+
+        with open(config_path, "r") as config_file:
+            stat_key = _stat_key(os.fstat(config_file.fileno()))
+            config = yaml.safe_load(config_file)
+            if config is None:
+                config = get_default_config(ngrok_version, config_version)
 
-            _config_cache[config_path] = config
+        entry = _ConfigEntry(config, stat_key)
+        _config_cache[config_path] = entry
 
-    return _config_cache[config_path]
+    return entry
 
 
 def get_default_config(ngrok_version: Optional[str],
@@ -277,10 +506,12 @@ def install_default_config(config_path: str,
     :param ngrok_version: The major version of ``ngrok`` installed.
     :param config_version: The ``ngrok`` config version.
     """
+    import yaml
+
     if ngrok_version:
         ngrok_version = ngrok_version.removeprefix("v")
 
-    with config_file_lock:
+    with _config_lock(config_path):
         if data is None:
             data = {}
         else:
@@ -295,19 +526,27 @@ def install_default_config(config_path: str,
         if not os.path.exists(config_path):
             open(config_path, "w").close()
 
-        config = get_ngrok_config(config_path,
-                                  use_cache=False,
-                                  ngrok_version=ngrok_version,
-                                  config_version=config_version)
+        with config_file_lock:
+            # Copied, so the cached config is not changed if the new data fails validation
+            config = copy.copy(get_ngrok_config(config_path,
+                                                use_cache=False,
+                                                ngrok_version=ngrok_version,
+                                                config_version=config_version))
+
+            config.update(data)
 
-        config.update(data)
+            validate_config(config)
 
-        validate_config(config)
+            # Written alongside, then moved into place, so another process never reads a partially written config
+            tmp_path = f"{config_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as config_file:
+                logger.debug(f"Installing default ngrok config to {config_path} ...")
 
-        with open(config_path, "w") as config_file:
-            logger.debug(f"Installing default ngrok config to {config_path} ...")
+                yaml.dump(config, config_file)
+            os.replace(tmp_path, config_path)
 
-            yaml.dump(config, config_file)
+            # The config was just written, so there is no need to read it again
+            _config_cache[config_path] = _ConfigEntry(config, _stat_key(os.stat(config_path)))
 
 
 def validate_config(data: Dict[str, Any]) -> None:
@@ -332,17 +571,62 @@ def _validate_config_values(values: Dict[str, Any]) -> None:
         raise PyngrokError("\"log_level\" must be \"info\" to be compatible with pyngrok")
 
 
+def _url_lock(url: str) -> FileLock:
+    """
+    Get the lock, in the cache directory, that serializes downloads of the given URL across processes.
+
+    :param url: The URL to download.
+    :return: The lock.
+    """
+    url_digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    return FileLock(os.path.join(get_cache_dir(), "locks", f"{url_digest}.lock"), timeout=DEFAULT_INSTALL_LOCK_TIMEOUT)
+
+
+def _download_path(url: str) -> str:
+    """
+    Get the path to which the given URL is downloaded. It is in the cache directory, next to the URL's lock, so the
+    partial download (and its resume state) is only ever written by the holder of that lock.
+
+    :param url: The URL to download.
+    :return: The download path.
+    """
+    url_digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    return os.path.join(get_cache_dir(), "downloads", f"{url_digest[:16]}-{url.split('/')[-1]}")
+
+
 def _download_file(url: str,
                    retries: int = 0,
-                   **kwargs: Any) -> str:
+                   install_to: Optional[str] = None,
+                   sha256: Optional[str] = None,
+                   locked: bool = False,
+                   **kwargs: Any) -> "_Download":
     """
-    Download a file to a temporary path and emit a status to stdout (if possible) as the download progresses.
+    Download a file to a path in the cache directory and emit a status to stdout (if possible) as the download
+    progresses. Downloads of the same URL are serialized across processes by :func:`_url_lock`.
+
+    If the server supports HTTP ``Range`` requests, the file is fetched in chunks of ``DEFAULT_DOWNLOAD_CHUNK_SIZE``
+    bytes over ``DEFAULT_DOWNLOAD_CONCURRENCY`` connections, and each chunk is retried with a backoff up to
+    ``DEFAULT_CHUNK_RETRY_COUNT`` times. Completed chunks are kept in a ``.part`` file, so a download that fails is
+    resumed, rather than started over, by the next attempt.
+
+    Otherwise, if ``install_to`` is given and the file is a ``.tgz`` archive, the ``ngrok`` binary is extracted to
+    that path as the archive is streamed, rather than saving the archive first.
+
+    The file is hashed as it is downloaded, and verified to be complete and, if ``sha256`` is given, to match it.
+    A download that fails verification is discarded and retried up to ``DEFAULT_CHECKSUM_RETRY_COUNT`` times.
 
     :param url: The URL to download.
     :param retries: The retry attempt index, if download fails.
+    :param install_to: The path where ``ngrok`` will be installed, if the archive can be extracted as it is streamed.
+    :param sha256: The expected SHA-256 digest of the file.
+    :param locked: Whether the caller already holds the URL's lock.
     :param kwargs: Remaining ``kwargs`` will be passed to :py:func:`urllib.request.urlopen`.
-    :return: The path to the downloaded temporary file.
+    :return: The download, with the path to the downloaded temporary file (unless ``ngrok`` was installed as it was
+        streamed) and the file's SHA-256 digest.
     :raises: :class:`~pyngrok.exception.PyngrokSecurityError`: When the ``url`` is not supported.
+    :raises: :class:`~pyngrok.exception.PyngrokNgrokChecksumError`: When the file fails verification.
     :raises: :class:`~pyngrok.exception.PyngrokNgrokInstallError`: When an error occurs downloading ``ngrok``.
     """
     kwargs["timeout"] = kwargs.get("timeout", DEFAULT_DOWNLOAD_TIMEOUT)
@@ -350,55 +634,521 @@ def _download_file(url: str,
     if not url.lower().startswith("http"):
         raise PyngrokSecurityError(f"URL must start with \"http\": {url}")
 
+    if not locked:
+        with _url_lock(url):
+            return _download_file(url, retries, install_to, sha256, True, **kwargs)
+
+    # The same for every attempt, so a failed download is resumed
+    download_path = _download_path(url)
+    os.makedirs(os.path.dirname(download_path), exist_ok=True)
+    download = _Download(url, download_path, kwargs, install_to, sha256)
+
     try:
         _print_progress("Downloading ngrok ...")
 
         logger.debug(f"Download ngrok from {url} ...")
 
-        local_filename = url.split("/")[-1]
-        response = urlopen(url, **kwargs)
+        download.run()
+
+        _clear_progress()
+
+        return download
+    except PyngrokNgrokChecksumError as e:
+        # What was downloaded is bad, so it must not be resumed
+        download.discard()
+
+        if retries < DEFAULT_CHECKSUM_RETRY_COUNT:
+            logger.warning(f"ngrok download failed verification, retrying: {e}")
+
+            return _download_file(url, retries + 1, install_to, sha256, True, **kwargs)
+        else:
+            raise e
+    except (socket.timeout, URLError) as e:
+        if retries < DEFAULT_RETRY_COUNT:
+            logger.warning("ngrok download failed, retrying in 0.5 seconds ...")
+            time.sleep(0.5)
+
+            return _download_file(url, retries + 1, install_to, sha256, True, **kwargs)
+        else:
+            raise e
+
+
+class _Download:
+    """
+    A download of a file to the given path, by parallel ``Range`` requests when the server supports them. Progress
+    is written to a ``.part`` file, and the chunks completed are recorded in a ``.part.json`` file next to it. The
+    file is hashed as it is downloaded, in order, so verifying it does not take another pass over it.
+    """
+
+    def __init__(self,
+                 url: str,
+                 download_path: str,
+                 urlopen_kwargs: Dict[str, Any],
+                 install_to: Optional[str] = None,
+                 expected_sha256: Optional[str] = None) -> None:
+        self.url = url
+        self.download_path = download_path
+        self.install_to = install_to
+        self.installed = False
+        self.expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+        self.sha256: Optional[str] = None
+        self.verified = False
+        self.part_path = f"{download_path}.part"
+        self.state_path = f"{self.part_path}.json"
+        self.urlopen_kwargs = urlopen_kwargs
+        self.chunk_size = DEFAULT_DOWNLOAD_CHUNK_SIZE
+        self.length = 0
+        self.validator: Optional[str] = None
+        self.completed: Set[int] = set()
+
+        self._lock = threading.Lock()
+        self._bytes_done = 0
+        self._bytes_fetched = 0
+        self._started = time.monotonic()
+        self._hash = hashlib.sha256()
+        self._bytes_hashed = 0
+        self._chunks_hashed = 0
+        self._unhashed: Dict[int, bytes] = {}
+
+    def run(self) -> None:
+        response = urlopen(Request(self.url, headers={"Range": f"bytes=0-{self.chunk_size - 1}"}),
+                           **self.urlopen_kwargs)
 
         status_code = response.getcode()
+        length = _content_range_length(response.getheader("Content-Range"))
 
-        if status_code != HTTPStatus.OK:
+        if status_code == HTTPStatus.PARTIAL_CONTENT and length is not None:
+            self._run_ranged(response, length)
+        elif status_code == HTTPStatus.OK:
+            self._run_streamed(response)
+        else:
             logger.debug(f"Response status code: {status_code}")
+            response.close()
 
             raise PyngrokNgrokInstallError(f"Download failed, status code: {status_code}")
 
+        if not self.installed:
+            os.replace(self.part_path, self.download_path)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+        elapsed = time.monotonic() - self._started
+        logger.debug(f"Downloaded {self._bytes_done} bytes ({self._bytes_fetched} fetched) in {elapsed:.2f} "
+                     f"seconds, {_format_rate(self._bytes_fetched, elapsed)}")
+
+    def _run_ranged(self,
+                    response: Any,
+                    length: int) -> None:
+        self.length = length
+        self.validator = response.getheader("ETag") or response.getheader("Last-Modified")
+        chunk_count = -(-length // self.chunk_size)
+
+        self._resume()
+
+        with response:
+            if 0 not in self.completed:
+                self._write_chunk(0, self._read_chunk(response, 0))
+            else:
+                logger.debug(f"Resuming download of {self.url}, {len(self.completed)}/{chunk_count} chunks completed")
+
+        pending = [i for i in range(chunk_count) if i not in self.completed]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(DEFAULT_DOWNLOAD_CONCURRENCY, len(pending))) as executor:
+                # Iterated so the first chunk to fail raises, once the others have finished
+                for _ in executor.map(self._fetch_chunk, pending):
+                    pass
+
+        with self._lock:
+            self._hash_completed_chunks()
+
+        self.verify()
+
+    def _run_streamed(self,
+                      response: Any) -> None:
+        # The server does not support Range requests, so the file is streamed over one connection
         length = response.getheader("Content-Length")
-        if length:
-            length = int(length)
-            chunk_size = max(4096, length // 100)
-        else:
-            chunk_size = 64 * 1024
+        self.length = int(length) if length else 0
+        read_size = max(4096, self.length // 100) if self.length else 64 * 1024
+
+        if self.install_to is not None and self.url.endswith((".tgz", ".tar.gz")):
+            logger.debug(f"Extracting ngrok binary to {self.install_to} as it is downloaded ...")
 
-        download_path = os.path.join(tempfile.gettempdir(), local_filename)
-        with open(download_path, "wb") as f:
-            size = 0
+            with response:
+                _install_ngrok_tgz(self.install_to, _ProgressReader(response, self), self.verify)  # type: ignore
+            self.installed = True
+
+            return
+
+        with response, open(self.part_path, "wb") as f:
             while True:
-                buffer = response.read(chunk_size)
+                buffer = response.read(read_size)
 
                 if not buffer:
                     break
 
                 f.write(buffer)
-                size += len(buffer)
+                self._update_hash(buffer)
+                self._record_progress(len(buffer))
+
+        self.verify()
+
+    def verify(self) -> None:
+        """
+        Verify that the whole file was downloaded and, if a digest is expected, that it matches. The download is
+        only marked ``verified`` if it matched a digest. If neither a digest nor the file's length is known, nothing
+        can be checked, so a warning is logged.
+
+        :raises: :class:`~pyngrok.exception.PyngrokNgrokChecksumError`: When the file fails verification.
+        """
+        self.sha256 = self._hash.hexdigest()
+
+        if self.length and self._bytes_hashed != self.length:
+            raise PyngrokNgrokChecksumError(f"Download of {self.url} was incomplete, received {self._bytes_hashed} of "
+                                            f"{self.length} bytes")
+        if self.expected_sha256 and self.sha256 != self.expected_sha256:
+            raise PyngrokNgrokChecksumError(f"Download of {self.url} does not match its SHA-256 digest, expected "
+                                            f"{self.expected_sha256} but was {self.sha256}")
+
+        if self.expected_sha256:
+            self.verified = True
+
+            logger.debug(f"Verified download of {self.url}, SHA-256 digest: {self.sha256}")
+        elif self.length:
+            logger.debug(f"Download of {self.url} is complete, but no SHA-256 digest was given to verify it against, "
+                         f"SHA-256 digest: {self.sha256}")
+        else:
+            logger.warning(f"Download of {self.url} could not be verified, since neither its length nor a SHA-256 "
+                           f"digest is known, SHA-256 digest: {self.sha256}")
+
+    def discard(self) -> None:
+        """
+        Remove the partially downloaded file and its progress, so the next attempt starts over.
+        """
+        for path in [self.part_path, self.state_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _update_hash(self,
+                     data: bytes) -> None:
+        self._hash.update(data)
+        self._bytes_hashed += len(data)
+
+    def _hash_completed_chunks(self) -> None:
+        # Chunks complete out of order, so each is held until those before it are hashed. Chunks completed by a
+        # previous attempt are read back from the .part file.
+        while self._chunks_hashed in self.completed:
+            data = self._unhashed.pop(self._chunks_hashed, None)
+            if data is None:
+                with open(self.part_path, "rb") as f:
+                    f.seek(self._chunks_hashed * self.chunk_size)
+                    data = f.read(self._chunk_length(self._chunks_hashed))
+
+            self._update_hash(data)
+            self._chunks_hashed += 1
+
+    def _resume(self) -> None:
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+
+        if (os.path.exists(self.part_path)
+                and os.path.getsize(self.part_path) == self.length
+                and state.get("url") == self.url
+                and state.get("length") == self.length
+                and state.get("chunk_size") == self.chunk_size
+                and state.get("validator") == self.validator):
+            self.completed = set(state.get("completed", []))
+            self._bytes_done = sum(self._chunk_length(i) for i in self.completed)
+        else:
+            self.completed = set()
+            with open(self.part_path, "wb") as f:
+                f.truncate(self.length)
+
+        self._save_state()
+
+    def _save_state(self) -> None:
+        with open(self.state_path, "w") as f:
+            json.dump({"url": self.url,
+                       "length": self.length,
+                       "chunk_size": self.chunk_size,
+                       "validator": self.validator,
+                       "completed": sorted(self.completed)}, f)
+
+    def _chunk_length(self,
+                      index: int) -> int:
+        return min(self.chunk_size, self.length - index * self.chunk_size)
+
+    def _fetch_chunk(self,
+                     index: int) -> None:
+        start = index * self.chunk_size
+        end = start + self._chunk_length(index) - 1
+
+        attempt = 0
+        while True:
+            try:
+                response = urlopen(Request(self.url, headers={"Range": f"bytes={start}-{end}"}),
+                                   **self.urlopen_kwargs)
+                with response:
+                    if response.getcode() != HTTPStatus.PARTIAL_CONTENT:
+                        raise PyngrokNgrokInstallError(f"Download of bytes {start}-{end} failed, "
+                                                       f"status code: {response.getcode()}")
+
+                    data = self._read_chunk(response, index)
+                break
+            except (OSError, HTTPException, PyngrokNgrokInstallError) as e:
+                if attempt >= DEFAULT_CHUNK_RETRY_COUNT:
+                    raise
+
+                delay = DEFAULT_CHUNK_RETRY_BACKOFF * 2 ** attempt
+                logger.warning(f"Download of bytes {start}-{end} failed, retrying in {delay} seconds: {e}")
+                time.sleep(delay)
+
+                attempt += 1
+
+        self._write_chunk(index, data)
+
+    def _read_chunk(self,
+                    response: Any,
+                    index: int) -> bytes:
+        data: bytes = response.read()
+
+        if len(data) != self._chunk_length(index):
+            raise PyngrokNgrokInstallError(f"Download of chunk {index} was incomplete, received {len(data)} of "
+                                           f"{self._chunk_length(index)} bytes")
+
+        return data
+
+    def _write_chunk(self,
+                     index: int,
+                     data: bytes) -> None:
+        # Chunks don't overlap, so each can be written through its own file handle
+        with open(self.part_path, "r+b") as f:
+            f.seek(index * self.chunk_size)
+            f.write(data)
+
+        with self._lock:
+            self.completed.add(index)
+            self._save_state()
+
+            self._unhashed[index] = data
+            self._hash_completed_chunks()
+
+            self._record_progress(len(data))
+
+    def _record_progress(self,
+                         size: int) -> None:
+        self._bytes_done += size
+        self._bytes_fetched += size
+
+        if self.length:
+            percent_done = int((float(self._bytes_done) / float(self.length)) * 100)
+            rate = _format_rate(self._bytes_fetched, time.monotonic() - self._started)
+            _print_progress(f"Downloading ngrok: {percent_done}% ({rate})")
+
+
+class _ProgressReader:
+    """
+    Wraps a download's response, so progress is recorded as it is read by something else (for instance, an archive
+    being extracted as it is streamed).
+    """
 
-                if length:
-                    percent_done = int((float(size) / float(length)) * 100)
-                    _print_progress(f"Downloading ngrok: {percent_done}%")
+    def __init__(self,
+                 response: Any,
+                 download: _Download) -> None:
+        self.response = response
+        self.download = download
 
-        _clear_progress()
+    def read(self,
+             size: int = -1) -> bytes:
+        data: bytes = self.response.read(size)
+        if data:
+            self.download._update_hash(data)
+            self.download._record_progress(len(data))
 
-        return download_path
-    except (socket.timeout, URLError) as e:
-        if retries < DEFAULT_RETRY_COUNT:
-            logger.warning("ngrok download failed, retrying in 0.5 seconds ...")
-            time.sleep(0.5)
+        return data
 
-            return _download_file(url, retries + 1, **kwargs)
-        else:
-            raise e
+
+def _content_range_length(content_range: Optional[str]) -> Optional[int]:
+    # For instance, "bytes 0-1048575/10485760"
+    if not content_range or "/" not in content_range:
+        return None
+
+    length = content_range.rsplit("/", 1)[1].strip()
+
+    return int(length) if length.isdigit() else None
+
+
+def _format_rate(size: int,
+                 elapsed: float) -> str:
+    return f"{size / max(elapsed, 1e-6) / (1024 * 1024):.2f} MB/s"
+
+
+def _install_from_cache(url: str,
+                        ngrok_path: str,
+                        sha256: Optional[str] = None,
+                        downloaded_since: Optional[float] = None) -> bool:
+    """
+    Install the ``ngrok`` binary previously downloaded from the given URL, if it is in the cache, by hard linking
+    (or, if that is not possible, copying) it to the given path. The archive's digest was recorded when it was
+    verified, so the binary is not hashed again.
+
+    :param url: The URL from which the binary's archive is downloaded.
+    :param ngrok_path: The path where ``ngrok`` will be installed.
+    :param sha256: The expected SHA-256 digest of the archive, if it is known.
+    :param downloaded_since: If given, the binary is only installed if it was downloaded at or after this time.
+    :return: ``True`` if ``ngrok`` was installed from the cache.
+    """
+    cache_dir = get_cache_dir()
+
+    entry = _read_cache_index(cache_dir).get(url)
+    if entry is None:
+        return False
+    if downloaded_since is not None and entry.get("downloaded_at", 0) < downloaded_since:
+        logger.debug(f"Cached ngrok binary was downloaded before this install, ignoring it: {url}")
+
+        return False
+    if sha256 and entry.get("archive_sha256") != sha256.lower():
+        logger.debug(f"Cached ngrok binary was not downloaded from the expected archive, ignoring it: {url}")
+
+        return False
+
+    blob_path = os.path.join(cache_dir, "blobs", entry["sha256"])
+    try:
+        if os.path.getsize(blob_path) != entry["size"]:
+            logger.debug(f"Cached ngrok binary is not the expected size, ignoring it: {blob_path}")
+
+            return False
+
+        _link_or_copy(blob_path, ngrok_path)
+
+        # The modification time of a blob is when it was last used, for eviction
+        os.utime(blob_path)
+    except OSError as e:
+        logger.debug(f"Cached ngrok binary could not be installed, ignoring it: {e}")
+
+        return False
+
+    logger.debug(f"Installed ngrok from the cache: {blob_path}")
+
+    return True
+
+
+def _add_to_cache(url: str,
+                  ngrok_path: str,
+                  archive_sha256: Optional[str] = None) -> None:
+    """
+    Add the ``ngrok`` binary installed at the given path to the cache, addressed by its SHA-256 digest and indexed by
+    the URL its archive was downloaded from, then evict the least recently used binaries beyond
+    ``DEFAULT_CACHE_MAX_SIZE``. The cache is an optimization, so failing to update it is logged rather than raised.
+
+    :param url: The URL from which the binary's archive was downloaded.
+    :param ngrok_path: The path where ``ngrok`` was installed.
+    :param archive_sha256: The SHA-256 digest of the archive.
+    """
+    cache_dir = get_cache_dir()
+
+    try:
+        digest, size = _file_sha256(ngrok_path)
+
+        blob_path = os.path.join(cache_dir, "blobs", digest)
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+
+            # Copied, rather than linked, so the blob does not change if ngrok is later reinstalled to this path
+            _link_or_copy(ngrok_path, blob_path, link=False)
+
+        with FileLock(os.path.join(cache_dir, "locks", "index.lock"), timeout=DEFAULT_CONFIG_LOCK_TIMEOUT):
+            index = _read_cache_index(cache_dir)
+            index[url] = {"sha256": digest, "size": size, "archive_sha256": archive_sha256,
+                          "downloaded_at": time.time()}
+
+            _evict_from_cache(cache_dir, index, digest)
+            _write_cache_index(cache_dir, index)
+    except (OSError, PyngrokError) as e:
+        logger.warning(f"ngrok could not be added to the cache: {e}")
+
+
+def _evict_from_cache(cache_dir: str,
+                      index: Dict[str, Dict[str, Any]],
+                      keep: str) -> None:
+    blobs_dir = os.path.join(cache_dir, "blobs")
+
+    blobs = []
+    for digest in os.listdir(blobs_dir):
+        stat_result = os.stat(os.path.join(blobs_dir, digest))
+        blobs.append((stat_result.st_mtime, stat_result.st_size, digest))
+
+    total_size = sum(size for _, size, _ in blobs)
+    for _, size, digest in sorted(blobs):
+        if total_size <= DEFAULT_CACHE_MAX_SIZE:
+            break
+        if digest == keep:
+            continue
+
+        logger.debug(f"Evicting ngrok binary from the cache: {digest}")
+
+        os.remove(os.path.join(blobs_dir, digest))
+        total_size -= size
+
+    cached = set(os.listdir(blobs_dir))
+    for url in [url for url, entry in index.items() if entry["sha256"] not in cached]:
+        del index[url]
+
+
+def _read_cache_index(cache_dir: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(os.path.join(cache_dir, "index.json"), "r") as f:
+            index: Dict[str, Dict[str, Any]] = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    return index
+
+
+def _write_cache_index(cache_dir: str,
+                       index: Dict[str, Dict[str, Any]]) -> None:
+    index_path = os.path.join(cache_dir, "index.json")
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+
+def _link_or_copy(src: str,
+                  dst: str,
+                  link: bool = True) -> None:
+    # Linked or copied alongside the destination, then moved into place, so the destination is never partial
+    tmp_path = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        linked = False
+        if link:
+            try:
+                os.link(src, tmp_path)
+                linked = True
+            except OSError:
+                # For instance, across file systems, or where hard links are not supported
+                pass
+        if not linked:
+            shutil.copy2(src, tmp_path)
+
+        os.replace(tmp_path, dst)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _file_sha256(path: str) -> Tuple[str, int]:
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(block)
+            size += len(block)
+
+    return sha256.hexdigest(), size
 
 
 def _print_progress(line: str) -> None:
@@ -411,3 +1161,53 @@ def _clear_progress(spaces: int = 100) -> None:
     if _print_progress_enabled:
         sys.stdout.write((" " * spaces) + "\r")
         sys.stdout.flush()
+
+
+@contextmanager
+def _config_lock(config_path: str) -> Iterator[None]:
+    """
+    Hold the lock for writing the ``ngrok`` config at the given path, both within this process (reentrantly within
+    a thread) and across processes, through a lock file next to the config. This does not hold ``config_file_lock``,
+    which callers take only around reading and replacing the config.
+
+    :param config_path: The path to the ``ngrok`` config.
+    """
+    # Held per thread, since the lock file itself excludes other threads, and never while holding
+    # config_file_lock, so waiting on it does not stall config operations on other paths
+    key = (config_path, threading.get_ident())
+    with _config_file_locks_lock:
+        file_lock, depth = _config_file_locks.get(key, (None, 0))
+    if file_lock is None:
+        file_lock = FileLock(f"{config_path}.lock", timeout=DEFAULT_CONFIG_LOCK_TIMEOUT)
+        file_lock.acquire()
+    with _config_file_locks_lock:
+        _config_file_locks[key] = (file_lock, depth + 1)
+
+    try:
+        yield
+    finally:
+        with _config_file_locks_lock:
+            if depth == 0:
+                del _config_file_locks[key]
+            else:
+                _config_file_locks[key] = (file_lock, depth)
+        if depth == 0:
+            file_lock.release()
+
+
+def _stat_key(stat_result: os.stat_result) -> Tuple[int, int]:
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _reset_after_fork() -> None:
+    global config_file_lock, _config_file_locks_lock
+
+    # The locks may have been held by another thread when the fork happened
+    config_file_lock = threading.RLock()
+    _config_file_locks_lock = threading.Lock()
+    # Lock files held by the parent are still held through its open files, but not by this process
+    _config_file_locks.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -2,66 +2,281 @@ __copyright__ = "Copyright (c) 2018-2024 Alex Laird"
 __license__ = "MIT"
 
 import logging
-import shlex
-from typing import Optional
+import re
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterator, List, Optional, Tuple, Union, overload
+
+# A single key=value pair in a logfmt line, where the value is either double-quoted (and may contain escaped
+# characters) or a bare run of non-whitespace characters
+_LOGFMT_PAIR = re.compile(r'(?:^|(?<=\s))([^\s="]+)=(?:"((?:[^"\\]|\\.)*)"(?=\s|$)|(\S*))')
+# The escape sequences that are unescaped inside a double-quoted logfmt value
+_LOGFMT_ESCAPE = re.compile(r'\\(["\\$`])')
+
+_LEVEL_ALIASES = {
+    "CRIT": "CRITICAL",
+    "ERR": "ERROR",
+    "EROR": "ERROR",
+    "WARN": "WARNING",
+}
+
+
+def _iter_logfmt(line: str) -> Iterator[Tuple[str, str]]:
+    for match in _LOGFMT_PAIR.finditer(line):
+        key, quoted, bare = match.groups()
+        if quoted is None:
+            yield key, bare
+        elif "\\" in quoted:
+            yield key, _LOGFMT_ESCAPE.sub(r"\1", quoted)
+        else:
+            yield key, quoted
+
+
+def parse_logfmt(line: str) -> Dict[str, str]:
+    """
+    Parse the ``key=value`` pairs from a logfmt line, as emitted by ``ngrok``, in a single pass. Double-quoted
+    values have their quotes removed and escaped characters unescaped. Tokens without a ``=`` are ignored.
+
+    :param line: The line to parse.
+    :return: The parsed pairs.
+    """
+    return dict(_iter_logfmt(line))
+
+
+def _normalize_level(value: str) -> str:
+    value = _LEVEL_ALIASES.get(value.upper(), value.upper())
+
+    return sys.intern(value) if value and hasattr(logging, value) else "NOTSET"
 
 
 class NgrokLog:
     """
     An object containing a parsed log from the ``ngrok`` process.
+
+    Only the raw line is stored when a log is created. The level is decoded on its own the first time it is
+    accessed, so logs that are only filtered by level stay compact. The rest of the line is parsed on the first
+    access of any other field, and the parsed fields are then retained as a compact tuple.
+
+    Along with the common fields below, any other key ``ngrok`` logged is accessible as an attribute (for
+    instance, ``log.url``), and raises :py:class:`AttributeError` if it was not logged.
     """
 
+    __slots__ = ("line", "_lvl", "_fields")
+
     def __init__(self,
                  line: str) -> None:
         #: The raw, unparsed log line.
         self.line: str = line.strip()
 
-        #: The log's ISO 8601 timestamp.
-        self.t: Optional[str] = None
-        #: The log's level.
-        self.lvl: str = "NOTSET"
-        #: The log's message.
-        self.msg: Optional[str] = None
-        #: The log's error, if applicable.
-        self.err: Optional[str] = None
-        #: The log's type.
-        self.obj: Optional[str] = None
-        #: The URL, if ``obj`` is "web".
-        self.addr: Optional[str] = None
-
-        try:
-            split = shlex.split(self.line)
-        except ValueError:
-            split = []
-
-        for i in split:
-            if "=" not in i:
-                continue
-
-            key, value = i.split("=", 1)
-
-            if key == "lvl":
-                if not value:
+        self._lvl: Optional[str] = None
+        # Alternating keys and values, populated on first access
+        self._fields: Optional[Tuple[str, ...]] = None
+
+    def _parsed(self) -> Tuple[str, ...]:
+        if self._fields is None:
+            fields: List[str] = []
+            for key, value in _iter_logfmt(self.line):
+                if key == "lvl":
                     value = self.lvl
 
-                value = value.upper()
-                if value == "CRIT":
-                    value = "CRITICAL"
-                elif value in ["ERR", "EROR"]:
-                    value = "ERROR"
-                elif value == "WARN":
-                    value = "WARNING"
+                fields.append(sys.intern(key))
+                fields.append(value)
 
-                if not hasattr(logging, value):
-                    value = self.lvl
+            self._fields = tuple(fields)
+
+        return self._fields
+
+    def _get(self, key: str) -> Optional[str]:
+        fields = self._parsed()
+        for i in range(0, len(fields), 2):
+            if fields[i] == key:
+                return fields[i + 1]
+
+        return None
+
+    @property
+    def t(self) -> Optional[str]:
+        """
+        The log's ISO 8601 timestamp.
+        """
+        return self._get("t")
+
+    @property
+    def lvl(self) -> str:
+        """
+        The log's level.
+        """
+        if self._lvl is None:
+            self._lvl = "NOTSET"
+            for key, value in _iter_logfmt(self.line):
+                if key == "lvl":
+                    self._lvl = _normalize_level(value)
+                    break
+
+        return self._lvl
 
-            setattr(self, key, value)
+    @property
+    def msg(self) -> Optional[str]:
+        """
+        The log's message.
+        """
+        return self._get("msg")
+
+    @property
+    def err(self) -> Optional[str]:
+        """
+        The log's error, if applicable.
+        """
+        return self._get("err")
+
+    @property
+    def obj(self) -> Optional[str]:
+        """
+        The log's type.
+        """
+        return self._get("obj")
+
+    @property
+    def addr(self) -> Optional[str]:
+        """
+        The URL, if ``obj`` is "web".
+        """
+        return self._get("addr")
+
+    def __getattr__(self, name: str) -> str:
+        # Only reached when normal lookup fails, so never for the slots or common fields
+        if not name.startswith("_"):
+            fields = self._parsed()
+            for i in range(0, len(fields), 2):
+                if fields[i] == name:
+                    return fields[i + 1]
+
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
     def __repr__(self) -> str:
         return f"<NgrokLog: t={self.t} lvl={self.lvl} msg=\"{self.msg}\">"
 
     def __str__(self) -> str:  # pragma: no cover
-        attrs = [attr for attr in dir(self) if not attr.startswith("_") and getattr(self, attr) is not None]
-        attrs.remove("line")
+        fields = self._parsed()
+
+        return " ".join(f"{fields[i]}=\"{fields[i + 1]}\"" for i in range(0, len(fields), 2))
+
+
+def _parse_timestamp(t: Optional[str]) -> Optional[datetime]:
+    if not t:
+        return None
+
+    try:
+        return datetime.strptime(t, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        return None
+
+
+class NgrokLogBuffer:
+    """
+    A thread-safe, bounded buffer of the most recent logs from the ``ngrok`` process. Appending a log is
+    constant time, and once ``max_logs`` is reached, each new log evicts the oldest one.
+
+    The buffer supports ``len()``, indexing, and iteration like a :py:class:`list`. Iteration is over a snapshot, so
+    it is safe while the monitor thread continues to write logs.
+    """
+
+    def __init__(self,
+                 max_logs: int) -> None:
+        #: The max number of logs to retain.
+        self.max_logs: int = max_logs
+
+        self._logs: Deque[NgrokLog] = deque(maxlen=max_logs)
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<NgrokLogBuffer: {len(self)}/{self.max_logs} logs>"
+
+    def __len__(self) -> int:
+        return len(self._logs)
+
+    def __iter__(self) -> Iterator[NgrokLog]:
+        return iter(self.snapshot())
+
+    @overload
+    def __getitem__(self, index: int) -> NgrokLog:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[NgrokLog]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[NgrokLog, List[NgrokLog]]:
+        if isinstance(index, slice):
+            return self.snapshot()[index]
+
+        with self._lock:
+            return self._logs[index]
+
+    def append(self,
+               log: NgrokLog) -> None:
+        """
+        Add a log to the buffer, evicting the oldest log if the buffer is full.
+
+        :param log: The log to add.
+        """
+        with self._lock:
+            self._logs.append(log)
+
+    def clear(self) -> None:
+        """
+        Remove all logs from the buffer.
+        """
+        with self._lock:
+            self._logs.clear()
+
+    def snapshot(self) -> List[NgrokLog]:
+        """
+        Get a copy of the logs currently in the buffer.
+
+        :return: The logs, oldest first.
+        """
+        with self._lock:
+            return list(self._logs)
+
+    def filter(self,
+               lvl: Optional[str] = None,
+               since: Optional[datetime] = None,
+               until: Optional[datetime] = None) -> List[NgrokLog]:
+        """
+        Get the logs in the buffer that match the given criteria, without copying the whole buffer.
+
+        Logs are scanned newest first, and since ``ngrok`` logs in order, scanning stops at the first log
+        older than ``since``. When ``since`` or ``until`` is given, logs with no parsable timestamp are excluded.
+
+        :param lvl: The minimum level of logs to include, for instance ``"WARNING"``.
+        :param since: If given, only include logs at or after this (timezone-aware) time.
+        :param until: If given, only include logs at or before this (timezone-aware) time.
+        :return: The matching logs, oldest first.
+        """
+        min_level = logging.getLevelName(lvl.upper()) if lvl is not None else None
+        if min_level is not None and not isinstance(min_level, int):
+            raise ValueError(f"\"lvl\" must be a valid logging level: {lvl}")
+
+        matches = []
+        with self._lock:
+            for log in reversed(self._logs):
+                if since is not None or until is not None:
+                    timestamp = _parse_timestamp(log.t)
+                    if timestamp is None:
+                        continue
+                    if since is not None and timestamp < since:
+                        break
+                    if until is not None and timestamp > until:
+                        continue
+
+                if min_level is not None and getattr(logging, log.lvl) < min_level:
+                    continue
+
+                matches.append(log)
+
+        matches.reverse()
 
-        return " ".join(f"{attr}=\"{getattr(self, attr)}\"" for attr in attrs)
+        return matches
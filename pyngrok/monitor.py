@@ -0,0 +1,582 @@
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import logging
+import os
+import selectors
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple, Union
+
+from pyngrok.exception import PyngrokError
+from pyngrok.log import NgrokLog
+
+logger = logging.getLogger(__name__)
+
+#: The max number of bytes read from a pipe at once.
+DEFAULT_CHUNK_SIZE = 65536
+#: The max number of threads the shared reactor uses to invoke callbacks.
+DEFAULT_CALLBACK_WORKERS = 4
+#: The max number of logs queued for delivery to callbacks, when a size is not otherwise given.
+DEFAULT_LOG_QUEUE_SIZE = 1000
+#: The max number of logs delivered to a batch callback at once, when a size is not otherwise given.
+DEFAULT_LOG_BATCH_SIZE = 100
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_BLOCK = "block"
+#: The policies for handling a log when the delivery queue is full.
+OVERFLOW_POLICIES = [OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_BLOCK]
+
+# Windows does not support selecting on pipes, so reads there fall back to blocking on the stream
+_SELECTABLE_PIPES = os.name == "posix"
+
+
+def _decode(line: Union[bytes, str]) -> str:
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+
+    return line.rstrip("\r")
+
+
+class PipeLineReader:
+    """
+    Reads lines from a process's output pipe without blocking indefinitely. The pipe is read in large chunks,
+    which are split into lines here rather than reading one line at a time.
+
+    Waiting for output is done with :py:mod:`selectors`, alongside an internal wake-up pipe, so a blocked
+    :func:`readline` returns as soon as :func:`wake` is called from another thread. The pipe is read through a
+    duplicate of its file descriptor, and only once it is ready, so the stream itself is left as it was (in
+    blocking mode, and in text mode if it was opened that way), but it should not also be read from directly. On
+    platforms that do not support selecting on pipes (Windows), reads block on the stream, and :func:`wake` has
+    no effect.
+
+    :func:`readline` should only be called from one thread at a time.
+    """
+
+    def __init__(self,
+                 stream: IO[Any],
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        #: The max number of bytes read from the pipe at once.
+        self.chunk_size: int = chunk_size
+
+        self._stream = stream
+        self._lines: Deque[str] = deque()
+        self._partial = b""
+        self._eof = False
+        self._closed = False
+        self._lock = threading.Lock()
+
+        if _SELECTABLE_PIPES:
+            self._fd = os.dup(stream.fileno())
+
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            os.set_blocking(self._wake_w, False)
+
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self._fd, selectors.EVENT_READ)
+            self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+    def __repr__(self) -> str:
+        return f"<PipeLineReader: {self._stream}>"
+
+    def fileno(self) -> int:
+        """
+        Get the file descriptor of the pipe being read.
+
+        :return: The file descriptor.
+        """
+        if _SELECTABLE_PIPES:
+            return self._fd
+
+        return self._stream.fileno()
+
+    @property
+    def eof(self) -> bool:
+        """
+        ``True`` once the pipe has been closed and every line read from it has been returned.
+        """
+        return self._eof and not self._lines
+
+    def readline(self,
+                 timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Get the next line from the pipe, waiting for one if none is buffered.
+
+        :param timeout: The max time, in seconds, to wait for a line, or ``None`` to wait until one is available.
+        :return: The line, without its line ending, or ``None`` if no line was available before the timeout, the
+            reader was woken, or the pipe was closed.
+        """
+        if not self._lines and not self._eof:
+            self._fill(timeout)
+
+        if self._lines:
+            return self._lines.popleft()
+
+        return None
+
+    def read_lines(self) -> List[str]:
+        """
+        Read whatever is available from the pipe without waiting, and return every complete line buffered.
+
+        :return: The lines, without their line endings.
+        """
+        if _SELECTABLE_PIPES and not self._eof:
+            self._fill(0)
+
+        lines = list(self._lines)
+        self._lines.clear()
+
+        return lines
+
+    def wake(self) -> None:
+        """
+        Wake a thread blocked in :func:`readline`, which will then return ``None`` if no line is available.
+        """
+        if not _SELECTABLE_PIPES:
+            return
+
+        with self._lock:
+            if self._closed:
+                return
+
+            try:
+                os.write(self._wake_w, b"\0")
+            except BlockingIOError:
+                # The wake-up pipe is already full, so a wake-up is already pending
+                pass
+
+    def close(self) -> None:
+        """
+        Release the reader's resources. The process's stream itself is not closed.
+        """
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._eof = True
+
+            if _SELECTABLE_PIPES:
+                self._selector.close()
+                os.close(self._fd)
+                os.close(self._wake_r)
+                os.close(self._wake_w)
+
+    def _fill(self,
+              timeout: Optional[float]) -> None:
+        if not _SELECTABLE_PIPES:
+            data = self._stream.readline()
+            if not data:
+                self._eof = True
+            else:
+                self._lines.append(_decode(data.rstrip(b"\n" if isinstance(data, bytes) else "\n")))
+
+            return
+
+        if self._closed:
+            return
+
+        for key, _ in self._selector.select(timeout):
+            if key.fd == self._wake_r:
+                self._drain_wake()
+            else:
+                self._read_chunk()
+
+    def _drain_wake(self) -> None:
+        try:
+            while os.read(self._wake_r, self.chunk_size):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _read_chunk(self) -> None:
+        # Only called once the selector reports the pipe is ready, so this does not block
+        data = os.read(self._fd, self.chunk_size)
+
+        if not data:
+            self._eof = True
+
+            if self._partial:
+                self._lines.append(_decode(self._partial))
+                self._partial = b""
+
+            return
+
+        *complete, self._partial = (self._partial + data).split(b"\n")
+        self._lines.extend(_decode(line) for line in complete)
+
+
+class MonitorStats:
+    """
+    An object containing statistics about the monitoring of a ``ngrok`` process's logs.
+    """
+
+    def __init__(self) -> None:
+        #: The number of lines read from the process.
+        self.lines_read: int = 0
+        #: The number of times ``log_event_callback`` or ``log_batch_callback`` has been invoked.
+        self.callbacks_invoked: int = 0
+        #: The time, in seconds, between the most recent log being read and its callback being invoked.
+        self.last_callback_lag: float = 0.0
+        #: The max time, in seconds, between a log being read and its callback being invoked.
+        self.max_callback_lag: float = 0.0
+        #: The number of logs delivered to callbacks through the delivery queue.
+        self.logs_delivered: int = 0
+        #: The number of logs dropped because the delivery queue was full.
+        self.logs_dropped: int = 0
+
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<MonitorStats: lines_read={self.lines_read} callbacks_invoked={self.callbacks_invoked} " \
+               f"max_callback_lag={self.max_callback_lag:.3f} logs_dropped={self.logs_dropped}>"
+
+    def record_line(self) -> None:
+        with self._lock:
+            self.lines_read += 1
+
+    def record_callback(self,
+                        read_at: float) -> None:
+        lag = time.monotonic() - read_at
+
+        with self._lock:
+            self.callbacks_invoked += 1
+            self.last_callback_lag = lag
+            self.max_callback_lag = max(self.max_callback_lag, lag)
+
+    def record_delivered(self,
+                         count: int) -> None:
+        with self._lock:
+            self.logs_delivered += count
+
+    def record_dropped(self,
+                       count: int) -> None:
+        with self._lock:
+            self.logs_dropped += count
+
+
+class LogDispatcher:
+    """
+    Delivers logs to callbacks from a dedicated thread, so a slow callback does not hold up the thread reading a
+    process's output. Logs are passed through a bounded queue, and when it is full, the ``overflow`` policy
+    decides whether the oldest queued log is dropped, the new log is dropped, or the caller blocks until there is
+    room.
+
+    The delivery thread is started when the first log is queued.
+    """
+
+    def __init__(self,
+                 log_event_callback: Optional[Callable[[NgrokLog], None]] = None,
+                 log_batch_callback: Optional[Callable[[List[NgrokLog]], None]] = None,
+                 max_size: int = DEFAULT_LOG_QUEUE_SIZE,
+                 overflow: str = OVERFLOW_DROP_OLDEST,
+                 batch_size: int = DEFAULT_LOG_BATCH_SIZE,
+                 stats: Optional[MonitorStats] = None) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise PyngrokError(f"\"overflow\" must be one of: {OVERFLOW_POLICIES}")
+
+        #: A callback invoked with each log.
+        self.log_event_callback: Optional[Callable[[NgrokLog], None]] = log_event_callback
+        #: A callback invoked with each batch of logs.
+        self.log_batch_callback: Optional[Callable[[List[NgrokLog]], None]] = log_batch_callback
+        #: The max number of logs queued.
+        self.max_size: int = max(max_size, 1)
+        #: The policy for handling a log when the queue is full.
+        self.overflow: str = overflow
+        #: The max number of logs delivered in a batch.
+        self.batch_size: int = max(batch_size, 1)
+        #: Statistics updated as logs are delivered or dropped.
+        self.stats: MonitorStats = stats if stats is not None else MonitorStats()
+
+        self._queue: Deque[Tuple[NgrokLog, float]] = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __repr__(self) -> str:
+        return f"<LogDispatcher: {len(self._queue)}/{self.max_size} queued>"
+
+    def put(self,
+            log: NgrokLog,
+            read_at: Optional[float] = None) -> bool:
+        """
+        Queue a log for delivery.
+
+        :param log: The log to deliver.
+        :param read_at: The :func:`time.monotonic` at which the log was read, used to measure callback lag.
+        :return: ``True`` if the log was queued, ``False`` if it was dropped or the dispatcher is closed.
+        """
+        if read_at is None:
+            read_at = time.monotonic()
+
+        with self._condition:
+            if self._closed:
+                return False
+
+            if len(self._queue) >= self.max_size:
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    self.stats.record_dropped(1)
+
+                    return False
+                elif self.overflow == OVERFLOW_DROP_OLDEST:
+                    self._queue.popleft()
+                    self.stats.record_dropped(1)
+                else:
+                    while len(self._queue) >= self.max_size and not self._closed:
+                        self._condition.wait()
+
+                    if self._closed:
+                        return False
+
+            self._queue.append((log, read_at))
+            self._condition.notify_all()
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pyngrok-log-dispatcher", daemon=True)
+                self._thread.start()
+
+        return True
+
+    def close(self,
+              timeout: Optional[float] = 0) -> bool:
+        """
+        Stop accepting logs. Logs already queued are still delivered.
+
+        :param timeout: The max time, in seconds, to wait for queued logs to be delivered, or ``None`` to wait
+            indefinitely.
+        :return: ``True`` if every queued log has been delivered.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+            return not thread.is_alive()
+
+        return not self._queue
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+
+                if not self._queue:
+                    self._thread = None
+                    return
+
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                # Wake any callers blocked waiting for room in the queue
+                self._condition.notify_all()
+
+            self._deliver(batch)
+
+    def _deliver(self,
+                 batch: List[Tuple[NgrokLog, float]]) -> None:
+        if self.log_event_callback is not None:
+            for log, read_at in batch:
+                self.stats.record_callback(read_at)
+                try:
+                    self.log_event_callback(log)
+                except Exception:
+                    logger.exception("An error occurred in \"log_event_callback\"")
+
+        if self.log_batch_callback is not None:
+            self.stats.record_callback(batch[0][1])
+            try:
+                self.log_batch_callback([log for log, _ in batch])
+            except Exception:
+                logger.exception("An error occurred in \"log_batch_callback\"")
+
+        self.stats.record_delivered(len(batch))
+
+
+class LogReactor:
+    """
+    A single thread that multiplexes the output pipes of many processes with :py:mod:`selectors`, so each
+    process does not need a monitor thread of its own. Lines read from a pipe are passed to that pipe's handler on
+    the reactor thread, and handlers can :func:`dispatch` slower work (like user callbacks) to a bounded pool of
+    worker threads, where work for the same key is run in order.
+
+    The reactor thread is started when the first pipe is registered, and exits when the last is unregistered.
+    """
+
+    def __init__(self,
+                 max_workers: int = DEFAULT_CALLBACK_WORKERS) -> None:
+        #: The max number of threads used to run dispatched work.
+        self.max_workers: int = max_workers
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatch_lock = threading.Lock()
+        self._queues: Dict[Hashable, Deque[Callable[[], None]]] = {}
+        self._draining: Set[Hashable] = set()
+
+    def __repr__(self) -> str:
+        return f"<LogReactor: {len(self._selector.get_map()) - 1} pipes>"
+
+    def register(self,
+                 reader: PipeLineReader,
+                 on_lines: Callable[[List[str]], None],
+                 on_eof: Callable[[], None]) -> None:
+        """
+        Start monitoring the given reader's pipe.
+
+        :param reader: The reader for the pipe.
+        :param on_lines: Called on the reactor thread with each batch of lines read from the pipe.
+        :param on_eof: Called on the reactor thread once the pipe closes, after which it is unregistered.
+        """
+        with self._lock:
+            self._selector.register(reader.fileno(), selectors.EVENT_READ, (reader, on_lines, on_eof))
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="pyngrok-reactor", daemon=True)
+                self._thread.start()
+
+        self._wake()
+
+    def unregister(self,
+                   reader: PipeLineReader) -> None:
+        """
+        Stop monitoring the given reader's pipe, if it is registered.
+
+        :param reader: The reader for the pipe.
+        """
+        with self._lock:
+            try:
+                self._selector.unregister(reader.fileno())
+            except (KeyError, ValueError):
+                return
+
+        self._wake()
+
+    def dispatch(self,
+                 key: Hashable,
+                 work: Callable[[], None]) -> None:
+        """
+        Run the given work on the worker pool. Work dispatched with the same key is run in the order it was
+        dispatched, one at a time.
+
+        :param key: The key to order work by, for instance the process the work is for.
+        :param work: The work to run.
+        """
+        with self._dispatch_lock:
+            self._queues.setdefault(key, deque()).append(work)
+            if key in self._draining:
+                return
+            self._draining.add(key)
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="pyngrok-callback")
+            executor = self._executor
+
+        executor.submit(self._drain, key)
+
+    def _drain(self,
+               key: Hashable) -> None:
+        while True:
+            with self._dispatch_lock:
+                queue = self._queues[key]
+                if not queue:
+                    del self._queues[key]
+                    self._draining.discard(key)
+                    return
+                work = queue.popleft()
+
+            try:
+                work()
+            except Exception:
+                logger.exception("An error occurred in dispatched work")
+
+    def _wake(self) -> None:
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            # The wake-up pipe is already full, so a wake-up is already pending
+            pass
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                # Only the wake-up pipe is left, so there is nothing to monitor
+                if len(self._selector.get_map()) <= 1:
+                    self._thread = None
+                    return
+
+            for key, _ in self._selector.select():
+                if key.fd == self._wake_r:
+                    try:
+                        while os.read(self._wake_r, DEFAULT_CHUNK_SIZE):
+                            pass
+                    except BlockingIOError:
+                        pass
+
+                    continue
+
+                reader, on_lines, on_eof = key.data
+                self._handle(reader, on_lines, on_eof)
+
+    def _handle(self,
+                reader: PipeLineReader,
+                on_lines: Callable[[List[str]], None],
+                on_eof: Callable[[], None]) -> None:
+        try:
+            lines = reader.read_lines()
+            if lines:
+                on_lines(lines)
+
+            if not reader.eof:
+                return
+        except Exception:
+            # Stop monitoring the pipe rather than repeatedly failing on it
+            logger.exception("An error occurred handling output from a monitored process, it will be unregistered")
+
+        self.unregister(reader)
+        on_eof()
+
+
+_reactor: Optional[LogReactor] = None
+_reactor_lock = threading.Lock()
+
+
+def get_reactor() -> LogReactor:
+    """
+    Get the reactor shared by every process monitored with ``shared_monitor`` in
+    :class:`~pyngrok.conf.PyngrokConfig`, creating it if it does not already exist.
+
+    :return: The shared reactor.
+    """
+    global _reactor
+
+    with _reactor_lock:
+        if _reactor is None:
+            _reactor = LogReactor()
+
+        return _reactor
+
+
+def _reset_after_fork() -> None:
+    global _reactor, _reactor_lock
+
+    # The reactor's thread did not survive the fork, and its lock may have been held when it happened
+    _reactor = None
+    _reactor_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -8,14 +8,17 @@ import logging
 import os
 import socket
 import sys
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
-from typing import Any, Dict, List, Optional, Tuple, Union
+from http.client import HTTPException
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlsplit
 from urllib.request import Request, urlopen
 
-from pyngrok import __version__, conf, installer, process
+from pyngrok import __version__, conf, connection, installer, process
 from pyngrok.conf import PyngrokConfig
 from pyngrok.exception import PyngrokError, PyngrokNgrokHTTPError, PyngrokNgrokURLError, PyngrokSecurityError
 from pyngrok.installer import get_default_config
@@ -23,6 +26,8 @@ from pyngrok.process import NgrokProcess
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BATCH_MAX_WORKERS = 50
+
 
 class NgrokTunnel:
     """
@@ -41,31 +46,50 @@ class NgrokTunnel:
         self.api_url: Optional[str] = api_url
 
         #: The ID of the tunnel.
-        self.id: Optional[str] = data.get("ID", data.get("id"))
+        self.id: Optional[str] = None
         #: The name of the tunnel.
-        self.name: Optional[str] = data.get("name")
+        self.name: Optional[str] = None
         #: The protocol of the tunnel.
-        self.proto: Optional[str] = data.get("proto")
+        self.proto: Optional[str] = None
         #: The tunnel URI, a relative path that can be used to make requests to the ``ngrok`` web interface.
+        self.uri: Optional[str] = None
+        #: The public ``ngrok`` URL.
+        self.public_url: Optional[str] = None
+        #: The ``config`` block specific to v2 tunnels (e.g. ``{"addr": ..., "inspect": ...}``);
+        #: empty for v3 endpoints.
+        self.config: Dict[str, Any] = {}
+        #: The upstream definition (e.g. ``{"url": "http://localhost:8000", "protocol": "http1"}``).
+        self.upstream: Dict[str, Any] = {}
+        #: Metrics for `the tunnel <https://ngrok.com/docs/agent/api/#list-tunnels>`_.
+        self.metrics: Dict[str, Any] = {}
+
+        self._update(data, pyngrok_config, api_url)
+
+    def _update(self,
+                data: Dict[str, Any],
+                pyngrok_config: PyngrokConfig,
+                api_url: Optional[str]) -> None:
+        self.data = data
+        self.pyngrok_config = pyngrok_config
+        self.api_url = api_url
+
+        self.id = data.get("ID", data.get("id"))
+        self.name = data.get("name")
+        self.proto = data.get("proto")
         if data.get("uri"):
-            self.uri: Optional[str] = data["uri"]
+            self.uri = data["uri"]
         elif data.get("name"):
             api_segment = "endpoints" if pyngrok_config.config_version == "3" else "tunnels"
             self.uri = f"/api/{api_segment}/{data['name']}"
         else:
             self.uri = None
-        #: The public ``ngrok`` URL.
-        self.public_url: Optional[str] = data.get("public_url", data.get("url"))
-        #: The ``config`` block specific to v2 tunnels (e.g. ``{"addr": ..., "inspect": ...}``);
-        #: empty for v3 endpoints.
-        self.config: Dict[str, Any] = data.get("config", {})
-        #: The upstream definition (e.g. ``{"url": "http://localhost:8000", "protocol": "http1"}``).
+        self.public_url = data.get("public_url", data.get("url"))
+        self.config = data.get("config", {})
         upstream = data.get("upstream")
         if not upstream and self.config.get("addr"):
             upstream = {"url": self.config["addr"]}
-        self.upstream: Dict[str, Any] = upstream or {}
-        #: Metrics for `the tunnel <https://ngrok.com/docs/agent/api/#list-tunnels>`_.
-        self.metrics: Dict[str, Any] = data.get("metrics", {})
+        self.upstream = upstream or {}
+        self.metrics = data.get("metrics", {})
 
     def _upstream_repr(self) -> Optional[str]:
         return self.upstream.get("url") if self.upstream else self.config.get("addr")
@@ -96,6 +120,234 @@ class NgrokTunnel:
         self.metrics = self.data["metrics"]
 
 
+class TunnelDiff:
+    """
+    An object containing the changes to the active tunnels found by a refresh, each as a set of public URLs.
+    """
+
+    def __init__(self,
+                 added: Optional[Set[str]] = None,
+                 removed: Optional[Set[str]] = None,
+                 changed: Optional[Set[str]] = None) -> None:
+        #: The tunnels that were not previously known.
+        self.added: Set[str] = added if added is not None else set()
+        #: The tunnels that are no longer active.
+        self.removed: Set[str] = removed if removed is not None else set()
+        #: The tunnels whose definition changed, and were updated in place. Changes to ``metrics`` alone are
+        #: not included.
+        self.changed: Set[str] = changed if changed is not None else set()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return f"<TunnelDiff: added={sorted(self.added)} removed={sorted(self.removed)} " \
+               f"changed={sorted(self.changed)}>"
+
+
+class TunnelRegistry:
+    """
+    A thread-safe registry of the active tunnels, keyed by ``public_url``. Secondary indexes by ``name``, ``id``,
+    and upstream URL are kept consistent as tunnels are added, updated, and removed, so each lookup is constant
+    time rather than a scan of every tunnel.
+
+    Lookups and membership checks behave like a :py:class:`dict` keyed by ``public_url``, and iteration is over a
+    snapshot of the keys, so it is safe while other threads connect or disconnect tunnels.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._tunnels: Dict[str, NgrokTunnel] = {}
+        self._by_name: Dict[str, str] = {}
+        self._by_id: Dict[str, str] = {}
+        # Many tunnels may share an upstream, so each maps to public URLs in the order they were added
+        self._by_upstream: Dict[str, Dict[str, None]] = {}
+        # The secondary keys each tunnel is currently indexed under, to unindex it even after it has changed
+        self._indexed: Dict[str, Tuple[Optional[str], Optional[str], Optional[str]]] = {}
+
+    def __repr__(self) -> str:
+        return f"<TunnelRegistry: {len(self)} tunnels>"
+
+    def __len__(self) -> int:
+        return len(self._tunnels)
+
+    def __contains__(self, public_url: object) -> bool:
+        return public_url in self._tunnels
+
+    def __getitem__(self, public_url: str) -> NgrokTunnel:
+        return self._tunnels[public_url]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def keys(self) -> List[str]:
+        """
+        Get the public URLs of the tunnels in the registry.
+
+        :return: The public URLs, in the order the tunnels were added.
+        """
+        with self._lock:
+            return list(self._tunnels)
+
+    def values(self) -> List[NgrokTunnel]:
+        """
+        Get the tunnels in the registry.
+
+        :return: The tunnels, in the order they were added.
+        """
+        with self._lock:
+            return list(self._tunnels.values())
+
+    def get(self,
+            public_url: str,
+            default: Optional[NgrokTunnel] = None) -> Optional[NgrokTunnel]:
+        """
+        Get a tunnel by its ``public_url``.
+
+        :param public_url: The public URL of the tunnel.
+        :param default: The value to return if no tunnel has the given URL.
+        :return: The tunnel, or ``default``.
+        """
+        return self._tunnels.get(public_url, default)
+
+    def add(self,
+            tunnel: NgrokTunnel) -> None:
+        """
+        Add a tunnel to the registry, replacing any tunnel with the same ``public_url``. If the given tunnel is
+        already in the registry and was updated in place, it is reindexed.
+
+        :param tunnel: The tunnel to add.
+        :raises: :class:`~pyngrok.exception.PyngrokError`: When the tunnel does not have a ``public_url``.
+        """
+        if tunnel.public_url is None:
+            raise PyngrokError(
+                f"\"public_url\" was not populated for tunnel {tunnel}, but is required for pyngrok to function.")
+
+        with self._lock:
+            self._unindex(tunnel.public_url)
+            self._tunnels[tunnel.public_url] = tunnel
+            self._index(tunnel)
+
+    def pop(self,
+            public_url: Optional[str],
+            default: Optional[NgrokTunnel] = None) -> Optional[NgrokTunnel]:
+        """
+        Remove a tunnel from the registry.
+
+        :param public_url: The public URL of the tunnel.
+        :param default: The value to return if no tunnel has the given URL.
+        :return: The removed tunnel, or ``default``.
+        """
+        if public_url is None:
+            return default
+
+        with self._lock:
+            self._unindex(public_url)
+            return self._tunnels.pop(public_url, default)
+
+    def clear(self) -> None:
+        """
+        Remove all tunnels from the registry.
+        """
+        with self._lock:
+            self._tunnels.clear()
+            self._by_name.clear()
+            self._by_id.clear()
+            self._by_upstream.clear()
+            self._indexed.clear()
+
+    def find(self,
+             name: Optional[str] = None,
+             id: Optional[str] = None,
+             public_url: Optional[str] = None,
+             upstream: Optional[str] = None) -> Optional[NgrokTunnel]:
+        """
+        Find a tunnel using the indexes. When more than one criteria is given, the tunnel must match all of them.
+
+        :param name: The name of the tunnel.
+        :param id: The ID of the tunnel.
+        :param public_url: The public URL of the tunnel.
+        :param upstream: The upstream URL of the tunnel, as reported by ``ngrok`` (for instance,
+            ``"http://localhost:8000"``). If many tunnels share the upstream, the first one added is returned.
+        :return: The matching tunnel, or ``None``.
+        """
+        with self._lock:
+            candidates: Optional[Dict[str, None]] = None
+            for index, key in ((self._by_name, name), (self._by_id, id)):
+                if key is not None:
+                    url = index.get(key)
+                    if url is None or (candidates is not None and url not in candidates):
+                        return None
+                    candidates = {url: None}
+            if public_url is not None:
+                if public_url not in self._tunnels or (candidates is not None and public_url not in candidates):
+                    return None
+                candidates = {public_url: None}
+            if upstream is not None:
+                urls = self._by_upstream.get(upstream, {})
+                candidates = urls if candidates is None else {url: None for url in candidates if url in urls}
+
+            if not candidates:
+                return None
+
+            return self._tunnels[next(iter(candidates))]
+
+    def _index(self,
+               tunnel: NgrokTunnel) -> None:
+        public_url = str(tunnel.public_url)
+        upstream = tunnel._upstream_repr()
+        self._indexed[public_url] = (tunnel.name, tunnel.id, upstream)
+        if tunnel.name is not None:
+            self._by_name[tunnel.name] = public_url
+        if tunnel.id is not None:
+            self._by_id[tunnel.id] = public_url
+        if upstream is not None:
+            self._by_upstream.setdefault(upstream, {})[public_url] = None
+
+    def _unindex(self,
+                 public_url: str) -> None:
+        name, id, upstream = self._indexed.pop(public_url, (None, None, None))
+        if name is not None and self._by_name.get(name) == public_url:
+            del self._by_name[name]
+        if id is not None and self._by_id.get(id) == public_url:
+            del self._by_id[id]
+        if upstream is not None:
+            urls = self._by_upstream.get(upstream, {})
+            urls.pop(public_url, None)
+            if not urls:
+                self._by_upstream.pop(upstream, None)
+
+    def _apply(self,
+               listed: Dict[str, Dict[str, Any]],
+               pyngrok_config: PyngrokConfig,
+               api_url: Optional[str]) -> Tuple[List[NgrokTunnel], TunnelDiff]:
+        diff = TunnelDiff()
+        with self._lock:
+            for public_url, data in listed.items():
+                tunnel = self._tunnels.get(public_url)
+                if tunnel is None:
+                    self.add(NgrokTunnel(data, pyngrok_config, api_url))
+                    diff.added.add(public_url)
+                elif _without_metrics(tunnel.data) != _without_metrics(data) or tunnel.api_url != api_url:
+                    tunnel._update(data, pyngrok_config, api_url)
+                    self.add(tunnel)
+                    diff.changed.add(public_url)
+                else:
+                    # Only the metrics may have changed, which are updated without replacing the tunnel
+                    tunnel.data = data
+                    tunnel.metrics = data.get("metrics", {})
+
+            for public_url in [url for url in self._tunnels if url not in listed]:
+                self.pop(public_url)
+                diff.removed.add(public_url)
+
+            return [self._tunnels[public_url] for public_url in listed], diff
+
+
+def _without_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in data.items() if k != "metrics"}
+
+
 class NgrokApiResponse:
     """
     An object containing a response from the ``ngrok`` API.
@@ -125,7 +377,39 @@ class NgrokApiResponse:
             return NgrokApiResponse(body[:json_starts], json.loads(body[json_starts:]))
 
 
-_current_tunnels: Dict[str, NgrokTunnel] = {}
+# Each agent's tunnels, keyed by the "ngrok_path" of the process that owns them
+_current_tunnels: Dict[str, TunnelRegistry] = {}
+_current_tunnels_lock = threading.Lock()
+
+
+def _tunnel_registry(pyngrok_config: PyngrokConfig) -> TunnelRegistry:
+    with _current_tunnels_lock:
+        registry = _current_tunnels.get(pyngrok_config.ngrok_path)
+        if registry is None:
+            registry = _current_tunnels[pyngrok_config.ngrok_path] = TunnelRegistry()
+
+        return registry
+
+
+def _reset_after_fork() -> None:
+    global _current_tunnels_lock
+
+    # Locks may have been held by other threads when the fork happened, but the tunnels themselves remain valid
+    _current_tunnels_lock = threading.Lock()
+    for registry in _current_tunnels.values():
+        registry._lock = threading.RLock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _forget_tunnels(pyngrok_config: PyngrokConfig) -> None:
+    with _current_tunnels_lock:
+        registry = _current_tunnels.pop(pyngrok_config.ngrok_path, None)
+
+    if registry is not None:
+        registry.clear()
 
 
 def install_ngrok(pyngrok_config: Optional[PyngrokConfig] = None) -> None:
@@ -140,14 +424,17 @@ def install_ngrok(pyngrok_config: Optional[PyngrokConfig] = None) -> None:
         pyngrok_config = conf.get_default()
 
     if not os.path.exists(pyngrok_config.ngrok_path):
-        installer.install_ngrok(pyngrok_config.ngrok_path, ngrok_version=pyngrok_config.ngrok_version)
+        # Another process may install it first, in which case this waits for it rather than installing it again
+        installer.install_ngrok(pyngrok_config.ngrok_path, ngrok_version=pyngrok_config.ngrok_version,
+                                overwrite=False)
 
     config_path = conf.get_config_path(pyngrok_config)
 
-    # Install the config to the requested path
-    with installer.config_file_lock:
-        if not os.path.exists(config_path):
-            installer.install_default_config(config_path, ngrok_version=pyngrok_config.ngrok_version)
+    # Install the config to the requested path, checking again once locked, in case another process installed it
+    if not os.path.exists(config_path):
+        with installer._config_lock(config_path):
+            if not os.path.exists(config_path):
+                installer.install_default_config(config_path, ngrok_version=pyngrok_config.ngrok_version)
 
 
 def set_auth_token(token: str,
@@ -205,6 +492,9 @@ def get_ngrok_process(pyngrok_config: Optional[PyngrokConfig] = None) -> NgrokPr
     Use :func:`~pyngrok.process.is_process_running` to check if a process is running without also implicitly
     installing and starting it.
 
+    If a process is already running for the ``ngrok_path`` (including one attached to with
+    :func:`~pyngrok.process.attach`), it is returned without checking that ``ngrok`` is installed.
+
     :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
         overriding :func:`~pyngrok.conf.get_default()`.
     :return: The ``ngrok`` process.
@@ -212,67 +502,52 @@ def get_ngrok_process(pyngrok_config: Optional[PyngrokConfig] = None) -> NgrokPr
     if pyngrok_config is None:
         pyngrok_config = conf.get_default()
 
+    ngrok_process = process._started_process(pyngrok_config.ngrok_path)
+    if ngrok_process is not None:
+        return ngrok_process
+
     install_ngrok(pyngrok_config)
 
     return process.get_process(pyngrok_config)
 
 
+def _load_ngrok_config(pyngrok_config: PyngrokConfig) -> installer._ConfigEntry:
+    config_path = conf.get_config_path(pyngrok_config)
+
+    with installer.config_file_lock:
+        if os.path.exists(config_path):
+            return installer._load_config_entry(config_path, ngrok_version=pyngrok_config.ngrok_version)
+        else:
+            return installer._ConfigEntry(get_default_config(pyngrok_config.ngrok_version,
+                                                             pyngrok_config.config_version))
+
+
 def _interpolate_tunnel_definition(pyngrok_config: PyngrokConfig,
                                    options: Dict[str, Any],
                                    addr: Optional[str] = None,
                                    proto: Optional[Union[str, int]] = None,
-                                   name: Optional[str] = None) -> None:
+                                   name: Optional[str] = None,
+                                   config: Optional[installer._ConfigEntry] = None) -> None:
     addr_provided = addr is not None
     proto_provided = proto is not None
     user_upstream_provided = "upstream" in options
 
-    config_path = conf.get_config_path(pyngrok_config)
-
-    with installer.config_file_lock:
-        if os.path.exists(config_path):
-            config = installer.get_ngrok_config(config_path, ngrok_version=pyngrok_config.ngrok_version)
-        else:
-            config = get_default_config(pyngrok_config.ngrok_version, pyngrok_config.config_version)
-
-    matched: Optional[Dict[str, Any]] = None
+    if config is None:
+        config = _load_ngrok_config(pyngrok_config)
 
-    # v3 represents `endpoints` as a list of objects (each with a `name` field)
-    if pyngrok_config.config_version == "3":
-        endpoint_definitions = config.get("endpoints") or []
+    definition = config.definitions(pyngrok_config.config_version).get(name if name else "pyngrok-default")
+    if definition is not None:
         if not name:
-            for definition in endpoint_definitions:
-                if definition.get("name") == "pyngrok-default":
-                    logger.info("pyngrok-default found defined in config, using for tunnel definition")
-                    matched = definition
-                    name = "pyngrok-default"
-                    break
-        else:
-            for definition in endpoint_definitions:
-                if definition.get("name") == name:
-                    matched = definition
-                    break
-
-    # `tunnels` is the v2 block, but ngrok also allows it in v3 configs alongside `endpoints`
-    if not matched:
-        tunnel_definitions = config.get("tunnels", {}) or {}
-        if not name and "pyngrok-default" in tunnel_definitions:
             logger.info("pyngrok-default found defined in config, using for tunnel definition")
-            name = "pyngrok-default"
-        if name and name in tunnel_definitions:
-            matched = tunnel_definitions[name]
-
-    if matched:
-        if name is None:
-            raise PyngrokError("Tunnel definition matched but no name was resolved")
-
-        addr = matched.get("addr") if not addr else addr
-        proto = matched.get("proto") if not proto else proto
-        # Use the matched definition as the base, but override with any passed in options
-        merged = {k: v for k, v in matched.items() if k != "name"}
+
+        addr = definition.addr if not addr else addr
+        proto = definition.proto if not proto else proto
+        # Use the definition as the base, but override with any passed in options
+        merged = dict(definition.options)
         merged.update(options)
         options.clear()
         options.update(merged)
-        name += "-api"
+        name = definition.api_name
 
     addr = str(addr) if addr else "80"
     if not proto:
@@ -323,6 +598,95 @@ def _upgrade_legacy_params(pyngrok_config: PyngrokConfig,
             options.pop("auth")
 
 
+def _tunnels_api_path(pyngrok_config: PyngrokConfig) -> str:
+    return "/api/endpoints" if pyngrok_config.config_version == "3" else "/api/tunnels"
+
+
+def _prepare_tunnel_options(pyngrok_config: PyngrokConfig,
+                            options: Dict[str, Any],
+                            addr: Optional[str] = None,
+                            proto: Optional[Union[str, int]] = None,
+                            name: Optional[str] = None,
+                            config: Optional[installer._ConfigEntry] = None) -> str:
+    """
+    Validate and interpolate the given ``options`` in place, so they are ready to be sent to the ``ngrok`` API to
+    create a tunnel.
+
+    :param pyngrok_config: The ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary.
+    :param options: The tunnel options, which will be updated in place.
+    :param addr: The local port or address to which the tunnel will forward traffic.
+    :param proto: A valid tunnel protocol.
+    :param name: A friendly name for the tunnel, or the name of a definition in ``ngrok``'s config file.
+    :param config: The already loaded ``ngrok`` config, if the caller has one, so it is not read again.
+    :return: The API path to which the tunnel should be posted.
+    :raises: :class:`~pyngrok.exception.PyngrokError`: When the tunnel definition is invalid, or the requested
+        options are incompatible with the configured ``config_version``.
+    """
+    if pyngrok_config.config_version != "3":
+        v3_only = sorted(k for k in ("upstream", "bindings") if k in options)
+        if v3_only:
+            raise PyngrokError(
+                f"Options {v3_only} require config_version=\"3\". Set "
+                f"PyngrokConfig.config_version=\"3\" to use these.")
+
+    _interpolate_tunnel_definition(pyngrok_config, options, addr, proto, name, config)
+
+    _upgrade_legacy_params(pyngrok_config, options)
+
+    return _tunnels_api_path(pyngrok_config)
+
+
+def _register_tunnel(data: Dict[str, Any],
+                     pyngrok_config: PyngrokConfig,
+                     api_url: Optional[str]) -> NgrokTunnel:
+    tunnel = NgrokTunnel(data, pyngrok_config, api_url)
+
+    _tunnel_registry(pyngrok_config).add(tunnel)
+
+    return tunnel
+
+
+def _sync_tunnels(response: Dict[str, Any],
+                  pyngrok_config: PyngrokConfig,
+                  api_url: Optional[str]) -> Tuple[List[NgrokTunnel], TunnelDiff]:
+    """
+    Apply the tunnels listed in an API response to the known tunnels as a diff: new tunnels are added, changed
+    tunnels are updated in place, and tunnels no longer listed are removed. Unchanged tunnels keep their
+    identity.
+
+    :param response: The response from listing tunnels.
+    :param pyngrok_config: The ``pyngrok`` configuration used to list tunnels.
+    :param api_url: The API URL for the ``ngrok`` web interface.
+    :return: The active tunnels, in the order the API listed them, and the changes that were applied.
+    :raises: :class:`~pyngrok.exception.PyngrokError`: When a listed tunnel does not contain ``public_url``.
+    """
+    # v3 agents list under "endpoints", but fall back to "tunnels" if that is what the agent returned
+    list_keys = ("endpoints", "tunnels") if pyngrok_config.config_version == "3" else ("tunnels",)
+    items: List[Dict[str, Any]] = next((response[k] for k in list_keys if response.get(k) is not None), [])
+
+    listed: Dict[str, Dict[str, Any]] = {}
+    for data in items:
+        public_url = data.get("public_url", data.get("url"))
+        if public_url is None:
+            raise PyngrokError(
+                f"\"public_url\" was not populated for tunnel {NgrokTunnel(data, pyngrok_config, api_url)}, "
+                f"but is required for pyngrok to function.")
+        listed[public_url] = data
+
+    tunnels, diff = _tunnel_registry(pyngrok_config)._apply(listed, pyngrok_config, api_url)
+
+    if diff:
+        logger.debug(f"Applied changes to tunnels: {diff}")
+
+    return tunnels, diff
+
+
+def _register_tunnels(response: Dict[str, Any],
+                      pyngrok_config: PyngrokConfig,
+                      api_url: Optional[str]) -> List[NgrokTunnel]:
+    return _sync_tunnels(response, pyngrok_config, api_url)[0]
+
+
 def connect(addr: Optional[str] = None,
             proto: Optional[Union[str, int]] = None,
             name: Optional[str] = None,
@@ -369,38 +733,17 @@ def connect(addr: Optional[str] = None,
     if pyngrok_config is None:
         pyngrok_config = conf.get_default()
 
-    if pyngrok_config.config_version != "3":
-        v3_only = sorted(k for k in ("upstream", "bindings") if k in options)
-        if v3_only:
-            raise PyngrokError(
-                f"Options {v3_only} require config_version=\"3\". Set "
-                f"PyngrokConfig.config_version=\"3\" to use these.")
-
-    _interpolate_tunnel_definition(pyngrok_config, options, addr, proto, name)
-
-    name = options.get("name")
-
-    _upgrade_legacy_params(pyngrok_config, options)
-
-    api_path = "/api/endpoints" if pyngrok_config.config_version == "3" else "/api/tunnels"
+    api_path = _prepare_tunnel_options(pyngrok_config, options, addr, proto, name)
 
-    logger.info(f"Opening tunnel named: {name}")
+    logger.info(f"Opening tunnel named: {options.get('name')}")
 
     api_url = get_ngrok_process(pyngrok_config).api_url
 
     logger.debug(f"Creating tunnel with options: {options}")
 
-    tunnel = NgrokTunnel(api_request(f"{api_url}{api_path}", method="POST", data=options,
-                                     timeout=pyngrok_config.request_timeout),
-                         pyngrok_config, api_url)
-
-    if tunnel.public_url is None:
-        raise PyngrokError(
-            f"\"public_url\" was not populated for tunnel {tunnel}, but is required for pyngrok to function.")
-
-    _current_tunnels[tunnel.public_url] = tunnel
-
-    return tunnel
+    return _register_tunnel(api_request(f"{api_url}{api_path}", method="POST", data=options,
+                                        timeout=pyngrok_config.request_timeout),
+                            pyngrok_config, api_url)
 
 
 def disconnect(public_url: str,
@@ -425,22 +768,160 @@ def disconnect(public_url: str,
         return
 
     api_url = get_ngrok_process(pyngrok_config).api_url
+    registry = _tunnel_registry(pyngrok_config)
 
-    if public_url not in _current_tunnels:
-        get_tunnels(pyngrok_config)
+    # Looked up once, since another thread may remove the tunnel between a check and a read
+    tunnel = registry.get(public_url)
+    if tunnel is None:
+        refresh_tunnels(pyngrok_config)
 
         # One more check, if the given URL is still not in the list of tunnels, it is not active
-        if public_url not in _current_tunnels:
+        tunnel = registry.get(public_url)
+        if tunnel is None:
             return
 
-    tunnel = _current_tunnels[public_url]
-
     logger.info(f"Disconnecting tunnel: {tunnel.public_url}")
 
     api_request(f"{api_url}{tunnel.uri}", method="DELETE",
                 timeout=pyngrok_config.request_timeout)
 
-    _current_tunnels.pop(public_url, None)
+    registry.pop(public_url, None)
+
+
+def connect_many(specs: List[Dict[str, Any]],
+                 pyngrok_config: Optional[PyngrokConfig] = None,
+                 max_workers: int = DEFAULT_BATCH_MAX_WORKERS) -> List[Union[NgrokTunnel, Exception]]:
+    """
+    Establish many ``ngrok`` tunnels at once. The ``ngrok`` config is read once for the whole batch, and the
+    tunnels are then created in parallel, so bringing up many tunnels takes about as long as bringing up one.
+
+    Each spec is a :py:class:`dict` of the arguments that would otherwise be passed to :func:`connect`
+    (``addr``, ``proto``, ``name``, and any remaining ``options``).
+
+    .. code-block:: python
+
+        from pyngrok import ngrok
+
+        results = ngrok.connect_many([{"addr": "8000"},
+                                      {"addr": "22", "proto": "tcp"},
+                                      {"name": "my-config-file-tunnel"}])
+
+    A tunnel that fails to be created does not fail the batch, rather the error is returned in its place.
+
+    If ``ngrok`` is not installed at :class:`~pyngrok.conf.PyngrokConfig`'s ``ngrok_path``, calling this method
+    will first download and install ``ngrok``.
+
+    If ``ngrok`` is not running, calling this method will first start a process with
+    :class:`~pyngrok.conf.PyngrokConfig`.
+
+    :param specs: The tunnels to create.
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :param max_workers: The max number of tunnels to create concurrently.
+    :return: The created ``ngrok`` tunnels, or the error raised creating each, in the same order as ``specs``.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    if not specs:
+        return []
+
+    results: Dict[int, Union[NgrokTunnel, Exception]] = {}
+
+    api_url = get_ngrok_process(pyngrok_config).api_url
+    config = _load_ngrok_config(pyngrok_config)
+
+    pending: List[Tuple[int, str, Dict[str, Any]]] = []
+    for i, spec in enumerate(specs):
+        options = dict(spec)
+        addr = options.pop("addr", None)
+        proto = options.pop("proto", None)
+        name = options.pop("name", None)
+        try:
+            api_path = _prepare_tunnel_options(pyngrok_config, options, addr, proto, name, config)
+        except PyngrokError as e:
+            results[i] = e
+            continue
+
+        pending.append((i, api_path, options))
+
+    logger.info(f"Opening {len(pending)} tunnels")
+
+    def create(api_path: str, options: Dict[str, Any]) -> NgrokTunnel:
+        logger.debug(f"Creating tunnel with options: {options}")
+
+        return _register_tunnel(api_request(f"{api_url}{api_path}", method="POST", data=options,
+                                            timeout=pyngrok_config.request_timeout),
+                                pyngrok_config, api_url)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+            futures = [(i, executor.submit(create, api_path, options)) for i, api_path, options in pending]
+            for i, future in futures:
+                # Any error is reported for its tunnel, so the tunnels already created are still returned
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    results[i] = e
+
+    return [results[i] for i in range(len(specs))]
+
+
+def disconnect_many(public_urls: List[str],
+                    pyngrok_config: Optional[PyngrokConfig] = None,
+                    max_workers: int = DEFAULT_BATCH_MAX_WORKERS) -> List[Optional[Exception]]:
+    """
+    Disconnect many ``ngrok`` tunnels at once, if open. Tunnels are disconnected in parallel, and at most one
+    request is made to refresh the list of active tunnels for the whole batch.
+
+    A tunnel that fails to be disconnected does not fail the batch, rather the error is returned in its place.
+
+    :param public_urls: The public URLs of the tunnels to disconnect.
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :param max_workers: The max number of tunnels to disconnect concurrently.
+    :return: ``None`` for each tunnel that was disconnected (or was not active), or the error raised
+        disconnecting it, in the same order as ``public_urls``.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    results: List[Optional[Exception]] = [None] * len(public_urls)
+
+    # If ngrok is not running, there are no tunnels to disconnect
+    if not process.is_process_running(pyngrok_config.ngrok_path):
+        logger.debug(f"\"ngrok_path\" {pyngrok_config.ngrok_path} is not running a process")
+
+        return results
+
+    api_url = get_ngrok_process(pyngrok_config).api_url
+    registry = _tunnel_registry(pyngrok_config)
+
+    if any(public_url not in registry for public_url in public_urls):
+        refresh_tunnels(pyngrok_config)
+
+    # If a given URL is still not in the list of tunnels, it is not active
+    tunnels = [registry.get(public_url) for public_url in public_urls]
+    pending = [(i, tunnel) for i, tunnel in enumerate(tunnels) if tunnel is not None]
+
+    logger.info(f"Disconnecting {len(pending)} tunnels")
+
+    def delete(tunnel: NgrokTunnel) -> None:
+        api_request(f"{api_url}{tunnel.uri}", method="DELETE",
+                    timeout=pyngrok_config.request_timeout)
+
+        registry.pop(tunnel.public_url)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+            futures = [(i, executor.submit(delete, tunnel)) for i, tunnel in pending]
+            for i, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    results[i] = e
+
+    return results
 
 
 def get_tunnels(pyngrok_config: Optional[PyngrokConfig] = None) -> List[NgrokTunnel]:
@@ -464,30 +945,98 @@ def get_tunnels(pyngrok_config: Optional[PyngrokConfig] = None) -> List[NgrokTun
 
     api_url = get_ngrok_process(pyngrok_config).api_url
 
-    list_keys: Tuple[str, ...]
-    if pyngrok_config.config_version == "3":
-        api_path = "/api/endpoints"
-        list_keys = ("endpoints", "tunnels")
-    else:
-        api_path = "/api/tunnels"
-        list_keys = ("tunnels",)
+    response = api_request(f"{api_url}{_tunnels_api_path(pyngrok_config)}", method="GET",
+                           timeout=pyngrok_config.request_timeout)
+
+    return _register_tunnels(response, pyngrok_config, api_url)
+
+
+def refresh_tunnels(pyngrok_config: Optional[PyngrokConfig] = None) -> TunnelDiff:
+    """
+    Refresh the list of active ``ngrok`` tunnels, applying what changed since they were last listed. Tunnels that
+    did not change are left as-is (the same :class:`NgrokTunnel` objects returned previously), changed tunnels
+    are updated in place, and the changes are returned so callers can react to them without rescanning.
+
+    .. code-block:: python
+
+        from pyngrok import ngrok
+
+        diff = ngrok.refresh_tunnels()
+        for public_url in diff.removed:
+            print(f"Tunnel closed: {public_url}")
+
+    If ``ngrok`` is not installed at :class:`~pyngrok.conf.PyngrokConfig`'s ``ngrok_path``, calling this method
+    will first download and install ``ngrok``.
+
+    If ``ngrok`` is not running, calling this method will first start a process with
+    :class:`~pyngrok.conf.PyngrokConfig`.
+
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :return: The tunnels that were added, removed, and changed.
+    :raises: :class:`~pyngrok.exception.PyngrokError`: When the response was invalid or does not
+        contain ``public_url``.
+    """
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    api_url = get_ngrok_process(pyngrok_config).api_url
 
-    response = api_request(f"{api_url}{api_path}", method="GET",
+    response = api_request(f"{api_url}{_tunnels_api_path(pyngrok_config)}", method="GET",
                            timeout=pyngrok_config.request_timeout)
-    items: List[Dict[str, Any]] = next((response[k] for k in list_keys if response.get(k) is not None), [])
 
-    _current_tunnels.clear()
-    for tunnel in items:
-        ngrok_tunnel = NgrokTunnel(tunnel, pyngrok_config, api_url)
+    return _sync_tunnels(response, pyngrok_config, api_url)[1]
 
-        if ngrok_tunnel.public_url is None:
-            raise PyngrokError(
-                f"\"public_url\" was not populated for tunnel {ngrok_tunnel}, "
-                f"but is required for pyngrok to function.")
 
-        _current_tunnels[ngrok_tunnel.public_url] = ngrok_tunnel
+def get_tunnel(name: Optional[str] = None,
+               id: Optional[str] = None,
+               public_url: Optional[str] = None,
+               upstream: Optional[str] = None,
+               pyngrok_config: Optional[PyngrokConfig] = None) -> Optional[NgrokTunnel]:
+    """
+    Get an active ``ngrok`` tunnel by its name, ID, public URL, or upstream URL. When more than one is given, the
+    tunnel must match all of them.
+
+    Known tunnels are indexed, so the lookup is answered locally without a request to the ``ngrok`` API. Only if
+    no known tunnel matches are the tunnels refreshed (as with :func:`refresh_tunnels`) and the lookup retried.
+    Unlike :func:`get_tunnels`, if ``ngrok`` is not running, this method will not start it, and returns ``None``.
+
+    .. code-block:: python
+
+        from pyngrok import ngrok
+
+        tunnel = ngrok.get_tunnel(upstream="http://localhost:8000")
+
+    :param name: The name of the tunnel.
+    :param id: The ID of the tunnel.
+    :param public_url: The public URL of the tunnel.
+    :param upstream: The upstream URL of the tunnel, as reported by ``ngrok`` (for instance,
+        ``"http://localhost:8000"``).
+    :param pyngrok_config: A ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary,
+        overriding :func:`~pyngrok.conf.get_default()`.
+    :return: The matching tunnel, or ``None``.
+    :raises: :class:`~pyngrok.exception.PyngrokError`: When no criteria is given, or the response was invalid.
+    """
+    if name is None and id is None and public_url is None and upstream is None:
+        raise PyngrokError("At least one of \"name\", \"id\", \"public_url\", or \"upstream\" must be given.")
+
+    if pyngrok_config is None:
+        pyngrok_config = conf.get_default()
+
+    registry = _tunnel_registry(pyngrok_config)
+
+    tunnel = registry.find(name=name, id=id, public_url=public_url, upstream=upstream)
+    if tunnel is not None:
+        return tunnel
+
+    if not process.is_process_running(pyngrok_config.ngrok_path):
+        logger.debug(f"\"ngrok_path\" {pyngrok_config.ngrok_path} is not running a process")
+
+        return None
+
+    refresh_tunnels(pyngrok_config)
 
-    return list(_current_tunnels.values())
+    return registry.find(name=name, id=id, public_url=public_url, upstream=upstream)
 
 
 def kill(pyngrok_config: Optional[PyngrokConfig] = None) -> None:
@@ -503,7 +1052,7 @@ def kill(pyngrok_config: Optional[PyngrokConfig] = None) -> None:
 
     process.kill_process(pyngrok_config.ngrok_path)
 
-    _current_tunnels.clear()
+    _forget_tunnels(pyngrok_config)
 
 
 def api(*args: Any, pyngrok_config: Optional[PyngrokConfig] = None) -> NgrokApiResponse:
@@ -620,14 +1169,19 @@ def api_request(url: str,
     if params:
         url += f"?{urlencode([(x, params[x]) for x in params])}"
 
-    request = Request(url, method=method.upper())
-    request.add_header("Content-Type", "application/json")
+    headers = {"Content-Type": "application/json"}
     if auth:
-        request.add_header("Ngrok-Version", "2")
-        request.add_header("Authorization", f"Bearer {auth}")
+        headers["Ngrok-Version"] = "2"
+        headers["Authorization"] = f"Bearer {auth}"
 
     logger.debug(f"Making {method} request to {url} with data: {data}")
 
+    pool = connection.get_pool(url)
+    if pool is not None:
+        return _pooled_api_request(pool, url, method, encoded_data, headers, timeout)
+
+    request = Request(url, method=method.upper(), headers=headers)
+
     try:
         response = urlopen(request, encoded_data, timeout)
         response_data = response.read().decode("utf-8")
@@ -657,6 +1211,38 @@ def api_request(url: str,
         raise PyngrokNgrokURLError(f"ngrok client exception, URLError: {e.reason}", e.reason)
 
 
+def _pooled_api_request(pool: connection.ConnectionPool,
+                        url: str,
+                        method: str,
+                        encoded_data: Optional[bytes],
+                        headers: Dict[str, str],
+                        timeout: float) -> Dict[str, Any]:
+    parsed = urlsplit(url)
+    path = parsed.path or "/"
+    if parsed.query:
+        path += f"?{parsed.query}"
+
+    try:
+        response = pool.request(method.upper(), path, body=encoded_data, headers=headers, timeout=timeout)
+    except socket.timeout:
+        raise PyngrokNgrokURLError("ngrok client exception, URLError: timed out", "timed out")
+    except (OSError, HTTPException) as e:
+        raise PyngrokNgrokURLError(f"ngrok client exception, URLError: {e}", e)
+
+    response_data = response.body.decode("utf-8")
+
+    status_code = response.status
+    logger.debug(f"Response {status_code}: {response_data.strip()}")
+
+    if str(status_code)[0] != "2":
+        raise PyngrokNgrokHTTPError(f"ngrok client exception, API returned {status_code}: {response_data}", url,
+                                    status_code, response.reason, response.headers, response_data)
+    elif status_code == HTTPStatus.NO_CONTENT:
+        return {}
+
+    return json.loads(response_data)  # type: ignore
+
+
 def run(args: Optional[List[str]] = None,
         pyngrok_config: Optional[PyngrokConfig] = None) -> None:
     """
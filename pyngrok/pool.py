@@ -0,0 +1,463 @@
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import copy
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Deque, Dict, List, Optional, Type
+
+from pyngrok import conf, installer, ngrok, process
+from pyngrok.conf import PyngrokConfig
+from pyngrok.exception import PyngrokError
+from pyngrok.process import NgrokProcess
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_RESTART_BACKOFF = 1.0
+MAX_RESTART_BACKOFF = 30.0
+
+
+class PoolStats:
+    """
+    An object containing statistics about the agents handed out by an :class:`AgentPool`.
+    """
+
+    def __init__(self) -> None:
+        #: The number of agents acquired from the pool.
+        self.acquisitions: int = 0
+        #: The number of acquisitions for which a warm agent was immediately available.
+        self.hits: int = 0
+        #: The number of acquisitions that had to wait for an agent to start or be recycled.
+        self.misses: int = 0
+        #: The number of acquisitions that timed out before an agent was available.
+        self.timeouts: int = 0
+        #: The number of times an agent was restarted, rather than recycled, after being released.
+        self.restarts: int = 0
+        #: The number of times an agent failed to start.
+        self.start_failures: int = 0
+        #: The time, in seconds, the most recent acquisition took.
+        self.last_acquire_latency: float = 0.0
+        #: The max time, in seconds, an acquisition took.
+        self.max_acquire_latency: float = 0.0
+        #: The total time, in seconds, spent in acquisitions.
+        self.total_acquire_latency: float = 0.0
+
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<PoolStats: acquisitions={self.acquisitions} hit_rate={self.hit_rate:.2f} " \
+               f"mean_acquire_latency={self.mean_acquire_latency:.3f} restarts={self.restarts}>"
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The fraction of acquisitions for which a warm agent was immediately available.
+        """
+        return self.hits / self.acquisitions if self.acquisitions else 0.0
+
+    @property
+    def mean_acquire_latency(self) -> float:
+        """
+        The mean time, in seconds, an acquisition took.
+        """
+        return self.total_acquire_latency / self.acquisitions if self.acquisitions else 0.0
+
+    def record_acquire(self,
+                       hit: bool,
+                       latency: float) -> None:
+        with self._lock:
+            self.acquisitions += 1
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.last_acquire_latency = latency
+            self.max_acquire_latency = max(self.max_acquire_latency, latency)
+            self.total_acquire_latency += latency
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_restart(self) -> None:
+        with self._lock:
+            self.restarts += 1
+
+    def record_start_failure(self) -> None:
+        with self._lock:
+            self.start_failures += 1
+
+
+class _Slot:
+    def __init__(self,
+                 index: int,
+                 pyngrok_config: PyngrokConfig) -> None:
+        self.index = index
+        self.pyngrok_config = pyngrok_config
+        self.ngrok_process: Optional[NgrokProcess] = None
+        self.uses = 0
+
+
+class PooledAgent:
+    """
+    A ``ngrok`` agent acquired from an :class:`AgentPool`. Pass its ``pyngrok_config`` to the methods in
+    :mod:`~pyngrok.ngrok` to open tunnels on this agent, and return it to the pool when done, either with
+    :func:`AgentPool.release` or by using it as a context manager.
+    """
+
+    def __init__(self,
+                 pool: "AgentPool",
+                 slot: _Slot) -> None:
+        #: The ``pyngrok`` configuration for this agent, with its own ``ngrok_path`` and ``config_path``.
+        self.pyngrok_config: PyngrokConfig = slot.pyngrok_config
+        #: The running ``ngrok`` process.
+        self.ngrok_process: Optional[NgrokProcess] = slot.ngrok_process
+
+        self._pool = pool
+        self._slot = slot
+        self._released = False
+
+    def __repr__(self) -> str:
+        return f"<PooledAgent: {self._slot.index} \"{self.api_url}\">"
+
+    def __enter__(self) -> "PooledAgent":
+        return self
+
+    def __exit__(self,
+                 exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self._pool.release(self)
+
+    @property
+    def api_url(self) -> Optional[str]:
+        """
+        The API URL for this agent's ``ngrok`` web interface.
+        """
+        return self.ngrok_process.api_url if self.ngrok_process is not None else None
+
+
+class AgentPool:
+    """
+    A pool of pre-started, healthy ``ngrok`` agents, so a tunnel can be opened without first waiting for an agent
+    to start. Each agent runs from its own ``ngrok_path`` (a link to, or copy of, the configured binary) with its
+    own config and ``web_addr``, so they can all run side by side.
+
+    When an agent is released, it is recycled in the background (its tunnels are disconnected and it is returned
+    to the pool), or restarted if it has died, was released with ``restart=True``, or has reached ``max_uses``.
+    Each agent's binary and config are placed in ``pool_dir``, which defaults to a temporary directory that is
+    removed when the pool is closed.
+
+    .. code-block:: python
+
+        from pyngrok import ngrok
+        from pyngrok.pool import AgentPool
+
+        with AgentPool(size=3) as pool:
+            with pool.acquire() as agent:
+                tunnel = ngrok.connect("8000", pyngrok_config=agent.pyngrok_config)
+
+            print(pool.stats.hit_rate)
+    """
+
+    def __init__(self,
+                 pyngrok_config: Optional[PyngrokConfig] = None,
+                 size: int = DEFAULT_POOL_SIZE,
+                 pool_dir: Optional[str] = None,
+                 max_uses: Optional[int] = None) -> None:
+        if size < 1:
+            raise PyngrokError("\"size\" must be at least 1.")
+
+        #: The ``pyngrok`` configuration each agent's configuration is based on.
+        self.pyngrok_config: PyngrokConfig = pyngrok_config if pyngrok_config is not None else conf.get_default()
+        #: The number of agents to keep started.
+        self.size: int = size
+        #: If given, restart an agent rather than recycle it once it has been acquired this many times.
+        self.max_uses: Optional[int] = max_uses
+        #: Statistics about the agents handed out by the pool.
+        self.stats: PoolStats = PoolStats()
+
+        self._pool_dir = pool_dir
+        self._owns_pool_dir = pool_dir is None
+        self._slots: List[_Slot] = []
+        self._idle: Deque[_Slot] = deque()
+        self._condition = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+    def __repr__(self) -> str:
+        return f"<AgentPool: {self.available}/{self.size} available>"
+
+    def __enter__(self) -> "AgentPool":
+        return self.start()
+
+    def __exit__(self,
+                 exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
+
+    @property
+    def available(self) -> int:
+        """
+        The number of started agents waiting to be acquired.
+        """
+        return len(self._idle)
+
+    def start(self) -> "AgentPool":
+        """
+        Prepare each agent's binary and config, and start the agents in the background. If ``ngrok`` is not
+        installed at :class:`~pyngrok.conf.PyngrokConfig`'s ``ngrok_path``, calling this method will first download
+        and install ``ngrok``.
+
+        :return: The pool.
+        """
+        ngrok.install_ngrok(self.pyngrok_config)
+
+        with self._condition:
+            if self._closed:
+                raise PyngrokError("The pool is closed.")
+            if self._executor is not None:
+                return self
+
+            if self._pool_dir is None:
+                self._pool_dir = tempfile.mkdtemp(prefix="pyngrok-pool-")
+
+            self._slots = [self._create_slot(i) for i in range(self.size)]
+            self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="pyngrok-pool")
+
+            for slot in self._slots:
+                self._executor.submit(self._warm, slot)
+
+        return self
+
+    def acquire(self,
+                timeout: Optional[float] = None) -> PooledAgent:
+        """
+        Acquire a started agent from the pool, waiting for one to become available if none are.
+
+        :param timeout: The max time, in seconds, to wait for an agent. Waits indefinitely if ``None``.
+        :return: The agent.
+        :raises: :class:`~pyngrok.exception.PyngrokError`: When the pool is not started or is closed, or no agent
+            became available before the timeout.
+        """
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+
+        with self._condition:
+            if self._executor is None:
+                raise PyngrokError("The pool must be started before acquiring an agent.")
+
+            hit = True
+            while True:
+                if self._closed:
+                    raise PyngrokError("The pool is closed.")
+
+                if self._idle:
+                    slot = self._idle.popleft()
+                    if process.is_process_running(slot.pyngrok_config.ngrok_path):
+                        break
+
+                    logger.info(f"Pooled ngrok agent {slot.index} is no longer running, restarting it")
+
+                    self._submit(self._restart, slot)
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.stats.record_timeout()
+
+                        raise PyngrokError(f"No pooled ngrok agent became available within {timeout} seconds.")
+
+                    self._condition.wait(remaining)
+
+                hit = False
+
+            slot.uses += 1
+
+        self.stats.record_acquire(hit, time.monotonic() - start)
+
+        return PooledAgent(self, slot)
+
+    def release(self,
+                agent: PooledAgent,
+                restart: bool = False) -> None:
+        """
+        Return an agent to the pool. Its tunnels are disconnected and it is made available again in the
+        background, or it is restarted if it has died, ``restart`` is ``True``, or it has reached ``max_uses``.
+
+        :param agent: The agent to release.
+        :param restart: Whether the agent should be restarted, rather than recycled.
+        """
+        if agent._released:
+            return
+        agent._released = True
+
+        if not self._submit(self._recycle, agent._slot, restart):
+            ngrok.kill(agent.pyngrok_config)
+
+    def close(self) -> None:
+        """
+        Close the pool, stopping every agent and removing the pool's directory if it created it.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+        for slot in self._slots:
+            ngrok.kill(slot.pyngrok_config)
+        self._idle.clear()
+
+        if self._owns_pool_dir and self._pool_dir is not None:
+            shutil.rmtree(self._pool_dir, ignore_errors=True)
+
+    def _submit(self, fn: Any, *args: Any) -> bool:
+        with self._condition:
+            if self._closed or self._executor is None:
+                return False
+
+            self._executor.submit(fn, *args)
+
+            return True
+
+    def _create_slot(self,
+                     index: int) -> _Slot:
+        slot_dir = os.path.join(str(self._pool_dir), f"agent-{index}")
+        os.makedirs(slot_dir, exist_ok=True)
+
+        ngrok_path = os.path.join(slot_dir, os.path.basename(self.pyngrok_config.ngrok_path))
+        if not os.path.exists(ngrok_path):
+            try:
+                os.symlink(self.pyngrok_config.ngrok_path, ngrok_path)
+            except OSError:
+                # Creating symlinks may not be permitted (for instance, on Windows), so fall back to a copy
+                shutil.copy2(self.pyngrok_config.ngrok_path, ngrok_path)
+
+        slot_config = copy.copy(self.pyngrok_config)
+        slot_config.ngrok_path = ngrok_path
+        slot_config.config_path = os.path.join(slot_dir, "ngrok.yml")
+
+        slot = _Slot(index, slot_config)
+        self._assign_web_addr(slot)
+
+        return slot
+
+    def _assign_web_addr(self,
+                         slot: _Slot) -> None:
+        # A port that was free when the agent last started may since have been taken by another process, so a new
+        # one is picked each time the agent is (re)started
+        installer.install_default_config(str(slot.pyngrok_config.config_path),
+                                         self._agent_config(f"127.0.0.1:{_free_port()}"),
+                                         ngrok_version=self.pyngrok_config.ngrok_version,
+                                         config_version=self.pyngrok_config.config_version)
+
+    def _agent_config(self,
+                      web_addr: str) -> Dict[str, Any]:
+        base_config_path = conf.get_config_path(self.pyngrok_config)
+        if os.path.exists(base_config_path):
+            config = copy.deepcopy(installer.get_ngrok_config(base_config_path,
+                                                              ngrok_version=self.pyngrok_config.ngrok_version,
+                                                              config_version=self.pyngrok_config.config_version))
+        else:
+            config = {}
+
+        if str(config.get("version", self.pyngrok_config.config_version)) == "3":
+            config.setdefault("agent", {})["web_addr"] = web_addr
+        else:
+            config["web_addr"] = web_addr
+
+        return config
+
+    def _warm(self,
+              slot: _Slot,
+              assign_web_addr: bool = False) -> None:
+        backoff = DEFAULT_RESTART_BACKOFF
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+
+            # Any error (not only a PyngrokError) is retried, since an error that escaped would leave the slot
+            # out of the pool for good, and acquire() waiting on it
+            try:
+                if assign_web_addr:
+                    self._assign_web_addr(slot)
+
+                ngrok_process = process.get_process(slot.pyngrok_config)
+            except Exception as e:
+                self.stats.record_start_failure()
+
+                logger.warning(f"Pooled ngrok agent {slot.index} failed to start, retrying in {backoff} seconds: {e}",
+                               exc_info=not isinstance(e, PyngrokError))
+
+                with self._condition:
+                    self._condition.wait_for(lambda: self._closed, backoff)
+                backoff = min(backoff * 2, MAX_RESTART_BACKOFF)
+
+                assign_web_addr = True
+
+                continue
+
+            with self._condition:
+                slot.ngrok_process = ngrok_process
+                self._idle.append(slot)
+                self._condition.notify()
+
+            logger.debug(f"Pooled ngrok agent {slot.index} is ready: {ngrok_process.api_url}")
+
+            return
+
+    def _restart(self,
+                 slot: _Slot) -> None:
+        self.stats.record_restart()
+
+        try:
+            ngrok.kill(slot.pyngrok_config)
+        except Exception:
+            logger.exception(f"Pooled ngrok agent {slot.index} could not be killed, starting it again anyway")
+        slot.uses = 0
+
+        self._warm(slot, assign_web_addr=True)
+
+    def _recycle(self,
+                 slot: _Slot,
+                 restart: bool) -> None:
+        if not restart and (self.max_uses is None or slot.uses < self.max_uses) and \
+                process.is_process_running(slot.pyngrok_config.ngrok_path):
+            try:
+                public_urls = [str(tunnel.public_url) for tunnel in ngrok.get_tunnels(slot.pyngrok_config)]
+                errors = ngrok.disconnect_many(public_urls, pyngrok_config=slot.pyngrok_config)
+
+                if not any(errors):
+                    with self._condition:
+                        self._idle.append(slot)
+                        self._condition.notify()
+
+                    return
+
+                logger.warning(f"Pooled ngrok agent {slot.index} could not disconnect its tunnels, restarting it")
+            except Exception as e:
+                logger.warning(f"Pooled ngrok agent {slot.index} could not be recycled, restarting it: {e}",
+                               exc_info=not isinstance(e, PyngrokError))
+
+        self._restart(slot)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+
+        return int(s.getsockname()[1])
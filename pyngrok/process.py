@@ -2,27 +2,74 @@ __copyright__ = "Copyright (c) 2018-2025 Alex Laird"
 __license__ = "MIT"
 
 import atexit
+import json
 import logging
 import os
 import subprocess
+import sys
 import threading
 import time
 from http import HTTPStatus
-from typing import Any, Dict, List, Optional
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from http.client import HTTPException
+from typing import Any, Callable, Dict, List, Optional
 
-import yaml
-
-from pyngrok import conf, installer
+from pyngrok import conf, connection, installer, monitor
 from pyngrok.conf import PyngrokConfig
 from pyngrok.exception import PyngrokError, PyngrokNgrokError, PyngrokSecurityError
+from pyngrok.filelock import FileLock
 from pyngrok.installer import SUPPORTED_NGROK_VERSIONS
-from pyngrok.log import NgrokLog
+from pyngrok.log import NgrokLog, NgrokLogBuffer
 
 logger = logging.getLogger(__name__)
 ngrok_logger = logging.getLogger(f"{__name__}.ngrok")
 
+#: The max number of times the ``ngrok`` web interface will be probed once startup logs show it is ready.
+STARTUP_PROBE_MAX_ATTEMPTS = 8
+#: The delay, in seconds, before the first retry of a failed startup probe. The delay doubles on each retry.
+STARTUP_PROBE_INITIAL_BACKOFF = 0.05
+#: The max delay, in seconds, between startup probes.
+STARTUP_PROBE_MAX_BACKOFF = 1.0
+
+
+class _AttachedProcess:
+    """
+    Stands in for the :py:class:`subprocess.Popen` of a ``ngrok`` process that was not started by this Python
+    process, so it can be managed like one that was. It has no output to monitor. If its ``pid`` is not known (for
+    instance, an agent in another container), it is assumed to be running until killed. Since the process is not
+    this Python process's to terminate, killing it only detaches from it.
+    """
+
+    def __init__(self,
+                 pid: Optional[int]) -> None:
+        self.pid = pid
+        self.stdout = None
+        self.returncode: Optional[int] = None
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None and self.pid is not None and not _pid_running(self.pid):
+            # The real exit code is only available to the process's parent
+            self.returncode = 0
+
+        return self.returncode
+
+    def kill(self) -> None:
+        if self.returncode is None:
+            self.returncode = 0
+
+    def terminate(self) -> None:
+        self.kill()
+
+    def wait(self,
+             timeout: Optional[float] = None) -> int:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(f"pid {self.pid}", timeout or 0)
+
+            time.sleep(0.05)
+
+        return 0
+
 
 class NgrokProcess:
     """
@@ -39,15 +86,33 @@ class NgrokProcess:
 
         #: The API URL for the ``ngrok`` web interface.
         self.api_url: Optional[str] = None
-        #: A list of the most recent logs from ``ngrok``, limited in size to ``max_logs``.
-        self.logs: List[NgrokLog] = []
+        #: The most recent logs from ``ngrok``, limited in size to ``max_logs``.
+        self.logs: NgrokLogBuffer = NgrokLogBuffer(pyngrok_config.max_logs)
         #: If ``ngrok`` startup fails, this will be the log of the failure.
         self.startup_error: Optional[str] = None
-
+        #: The time, in seconds after the process was started, at which each phase of startup completed. Phases are
+        #: ``web_service``, ``client_session``, ``tunnel_session``, and ``api_ready``.
+        self.startup_timings: Dict[str, float] = {}
+        #: Statistics about the monitoring of ``ngrok``'s logs.
+        self.monitor_stats: monitor.MonitorStats = monitor.MonitorStats()
+
+        self._started_at = time.monotonic()
+        # Whether startup has completed, since the process is registered as soon as it is spawned
+        self._started = False
         self._tunnel_started = False
         self._client_connected = False
         self._monitor_thread: Optional[threading.Thread] = None
         self._monitor_thread_alive = False
+        self._reader: Optional[monitor.PipeLineReader] = None
+        self._reactor: Optional[monitor.LogReactor] = None
+        self._dispatcher: Optional[monitor.LogDispatcher] = None
+        if pyngrok_config.log_batch_callback is not None or pyngrok_config.log_queue_size > 0:
+            self._dispatcher = monitor.LogDispatcher(pyngrok_config.log_event_callback,
+                                                     pyngrok_config.log_batch_callback,
+                                                     pyngrok_config.log_queue_size or monitor.DEFAULT_LOG_QUEUE_SIZE,
+                                                     pyngrok_config.log_queue_overflow,
+                                                     pyngrok_config.log_batch_size,
+                                                     self.monitor_stats)
 
     def __repr__(self) -> str:
         return f"<NgrokProcess: \"{self.api_url}\">"
@@ -77,19 +142,67 @@ class NgrokProcess:
             # Log ngrok startup states as they come in
             if "starting web service" in log.msg and log.addr is not None:
                 self.api_url = f"http://{log.addr}"
+                self._record_startup_timing("web_service")
             elif "tunnel session started" in log.msg:
                 self._tunnel_started = True
+                self._record_startup_timing("tunnel_session")
             elif "client session established" in log.msg:
                 self._client_connected = True
+                self._record_startup_timing("client_session")
 
         return log
 
-    def _log_line(self, line: str) -> Optional[NgrokLog]:
+    def _record_startup_timing(self, phase: str) -> None:
+        if phase not in self.startup_timings:
+            self.startup_timings[phase] = time.monotonic() - self._started_at
+
+            logger.debug(f"ngrok startup phase \"{phase}\" completed after {self.startup_timings[phase]:.3f}s")
+
+    def _startup_logged(self) -> bool:
+        """
+        Check whether ``ngrok``'s logs show that it has finished starting up, which is when it is worth probing
+        the web interface.
+
+        :return: ``True`` if the web service, client session, and tunnel session have all started.
+        """
+        return self.api_url is not None and self._tunnel_started and self._client_connected
+
+    def _wait_for_api(self, deadline: float) -> bool:
+        """
+        Probe the ``ngrok`` web interface until it responds, backing off between failed attempts. This should
+        only be called once :func:`_startup_logged` is ``True``.
+
+        :param deadline: The :func:`time.time` after which to stop retrying.
+        :return: ``True`` if the ``ngrok`` process is started, running, and healthy.
+        """
+        backoff = STARTUP_PROBE_INITIAL_BACKOFF
+        for attempt in range(1, STARTUP_PROBE_MAX_ATTEMPTS + 1):
+            if self.healthy():
+                self._record_startup_timing("api_ready")
+
+                return True
+
+            remaining = deadline - time.time()
+            if attempt == STARTUP_PROBE_MAX_ATTEMPTS or remaining <= 0 or self.proc.poll() is not None:
+                break
+
+            logger.debug(f"ngrok web interface not yet ready, retrying in {min(backoff, remaining):.2f}s")
+
+            time.sleep(min(backoff, remaining))
+            backoff = min(backoff * 2, STARTUP_PROBE_MAX_BACKOFF)
+
+        return False
+
+    def _log_line(self,
+                  line: str,
+                  reactor: Optional[monitor.LogReactor] = None) -> Optional[NgrokLog]:
         """
         Parse, log, and emit (if ``log_event_callback`` in :class:`~pyngrok.conf.PyngrokConfig` is registered) the
         given log line.
 
         :param line: The line to be processed.
+        :param reactor: If given, the callback is dispatched to the reactor's worker pool rather than invoked
+            inline. Ignored when logs are delivered through a queue.
         :return: The parsed log.
         """
         log = NgrokLog(line)
@@ -97,18 +210,42 @@ class NgrokProcess:
         if log.line == "":
             return None
 
+        self.monitor_stats.record_line()
+
         lvl = log.lvl if log.lvl != "NOTSET" else "INFO"
 
         ngrok_logger.log(getattr(logging, lvl), log.line)
         self.logs.append(log)
-        if len(self.logs) > self.pyngrok_config.max_logs:
-            self.logs.pop(0)
 
-        if self.pyngrok_config.log_event_callback is not None:
-            self.pyngrok_config.log_event_callback(log)
+        callback = self.pyngrok_config.log_event_callback
+        if self._dispatcher is not None:
+            self._dispatcher.put(log)
+        elif callback is not None:
+            read_at = time.monotonic()
+            if reactor is not None:
+                reactor.dispatch(self, lambda: self._invoke_callback(callback, log, read_at))
+            else:
+                self._invoke_callback(callback, log, read_at)
 
         return log
 
+    def _invoke_callback(self,
+                         callback: Callable[[NgrokLog], None],
+                         log: NgrokLog,
+                         read_at: float) -> None:
+        self.monitor_stats.record_callback(read_at)
+
+        callback(log)
+
+    def _log_lines(self, lines: List[str]) -> None:
+        for line in lines:
+            self._log_line(line)
+
+    def _log_reactor_lines(self, lines: List[str]) -> None:
+        reactor = monitor.get_reactor()
+        for line in lines:
+            self._log_line(line, reactor)
+
     def healthy(self) -> bool:
         """
         Check whether the ``ngrok`` process has finished starting up and is in a running, healthy state.
@@ -116,9 +253,7 @@ class NgrokProcess:
         :return: ``True`` if the ``ngrok`` process is started, running, and healthy.
         :raises: :class:`~pyngrok.exception.PyngrokSecurityError`: When the ``url`` is not supported.
         """
-        if self.api_url is None or \
-                not self._tunnel_started or \
-                not self._client_connected:
+        if self.api_url is None or not self._startup_logged():
             return False
 
         if not self.api_url.lower().startswith("http"):
@@ -131,21 +266,52 @@ class NgrokProcess:
         return self.proc.poll() is None
 
     def _probe_api_path(self, path: str) -> bool:
+        if self.api_url is None:
+            return False
+
+        # The first probe creates the process's connection pool, which later API requests will then reuse
+        pool = connection.get_or_create_pool(self.api_url)
         try:
-            response = urlopen(Request(f"{self.api_url}{path}"))
-            return bool(response.getcode() == HTTPStatus.OK)
-        except (HTTPError, URLError, OSError):
+            response = pool.request("GET", path, timeout=self.pyngrok_config.request_timeout)
+            return bool(response.status == HTTPStatus.OK)
+        except (HTTPException, OSError):
             return False
 
-    def _monitor_process(self) -> None:
-        self._monitor_thread_alive = True
-        while self._monitor_thread_alive and self.proc.poll() is None:
-            if self.proc.stdout is None:
-                logger.debug("Output from process is empty, nothing to log")
+    def _stdout_reader(self) -> Optional[monitor.PipeLineReader]:
+        if self._reader is None and self.proc.stdout is not None:
+            self._reader = monitor.PipeLineReader(self.proc.stdout)
+
+        return self._reader
+
+    def _close_reader(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
 
-                continue
+    def _on_reactor_output_closed(self) -> None:
+        logger.debug("Output from process has closed, it will no longer be monitored")
 
-            self._log_line(self.proc.stdout.readline())
+        self._reactor = None
+        self._close_reader()
+
+    def _stop_reactor_monitor(self) -> None:
+        reactor, self._reactor = self._reactor, None
+        if reactor is not None and self._reader is not None:
+            reactor.unregister(self._reader)
+
+    def _monitor_process(self) -> None:
+        reader = self._stdout_reader()
+        if reader is None:
+            logger.debug("Output from process is empty, nothing to log")
+        else:
+            while self._monitor_thread_alive:
+                line = reader.readline()
+                if line is not None:
+                    self._log_line(line)
+                elif reader.eof:
+                    logger.debug("Output from process has closed, monitor thread will stop")
+
+                    reader.close()
+                    break
 
         self._monitor_thread = None
 
@@ -153,28 +319,74 @@ class NgrokProcess:
         """
         Start a thread that will monitor the ``ngrok`` process and its logs until it completes.
 
+        If ``shared_monitor`` is set in :class:`~pyngrok.conf.PyngrokConfig`, the process is instead registered
+        with the single reactor thread shared by every process.
+
         If a monitor thread is already running, nothing will be done.
         """
-        if self._monitor_thread is None:
+        if self._monitor_thread is not None or self._reactor is not None:
+            return
+
+        if self.pyngrok_config.shared_monitor and os.name == "posix":
+            reader = self._stdout_reader()
+            if reader is None:
+                logger.debug("Output from process is empty, nothing to log")
+
+                return
+
+            logger.debug("Process will be monitored by the shared reactor")
+
+            # Flush lines buffered during startup, since the reactor only wakes when more output arrives
+            self._log_lines(reader.read_lines())
+
+            self._reactor = monitor.get_reactor()
+            self._reactor.register(reader, self._log_reactor_lines, self._on_reactor_output_closed)
+        else:
+            if self.pyngrok_config.shared_monitor:
+                logger.warning("Ignoring shared_monitor=True, which requires POSIX")
+
             logger.debug("Monitor thread will be started")
 
+            self._monitor_thread_alive = True
             self._monitor_thread = threading.Thread(target=self._monitor_process,
                                                     daemon=True)
             self._monitor_thread.start()
 
     def stop_monitor_thread(self) -> None:
         """
-        Set the monitor thread to stop monitoring the ``ngrok`` process after the next log event. This will not
-        necessarily terminate the thread immediately, as the thread may currently be idle, rather it sets a flag
-        on the thread telling it to terminate the next time it wakes up.
+        Stop the monitor thread from monitoring the ``ngrok`` process. The thread is woken immediately, even if
+        it is idle waiting on logs, but this method does not wait for it to terminate. To wait, use
+        :func:`join_monitor_thread`.
 
         This has no impact on the ``ngrok`` process itself, only ``pyngrok``'s monitor of the process and
         its logs.
         """
-        if self._monitor_thread is not None:
+        if self._reactor is not None:
+            logger.debug("Process will no longer be monitored by the shared reactor")
+
+            self._stop_reactor_monitor()
+        elif self._monitor_thread is not None:
             logger.debug("Monitor thread will be stopped")
 
             self._monitor_thread_alive = False
+            if self._reader is not None:
+                self._reader.wake()
+
+    def join_monitor_thread(self,
+                            timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the monitor thread, if one is running, to terminate.
+
+        :param timeout: The max time, in seconds, to wait, or ``None`` to wait indefinitely.
+        :return: ``True`` if no monitor thread is running.
+        """
+        monitor_thread = self._monitor_thread
+        if monitor_thread is not None:
+            monitor_thread.join(timeout)
+
+            return not monitor_thread.is_alive()
+
+        return True
 
 
 def set_auth_token(pyngrok_config: PyngrokConfig,
@@ -201,7 +413,8 @@ def set_auth_token(pyngrok_config: PyngrokConfig,
         logger.info(
             f"Updating authtoken for default \"config_path\" of \"ngrok_path\": {pyngrok_config.ngrok_path}")
 
-    result = str(subprocess.check_output(start))
+    with installer._config_lock(conf.get_config_path(pyngrok_config)):
+        result = str(subprocess.check_output(start))
 
     if "Authtoken saved" not in result:
         raise PyngrokNgrokError(f"An error occurred when saving the auth token: {result}")
@@ -231,7 +444,8 @@ def set_api_key(pyngrok_config: PyngrokConfig,
         logger.info(
             f"Updating API key for default \"config_path\" of \"ngrok_path\": {pyngrok_config.ngrok_path}")
 
-    result = str(subprocess.check_output(start))
+    with installer._config_lock(conf.get_config_path(pyngrok_config)):
+        result = str(subprocess.check_output(start))
 
     if "API key saved" not in result:
         raise PyngrokNgrokError(f"An error occurred when saving the API key: {result}")
@@ -244,17 +458,7 @@ def is_process_running(ngrok_path: str) -> bool:
     :param ngrok_path: The path to the ``ngrok`` binary.
     :return: ``True`` if ``ngrok`` is running from the given path.
     """
-    if ngrok_path in _current_processes:
-        # Ensure the process is still running and hasn't been killed externally, otherwise cleanup
-        if _current_processes[ngrok_path].proc.poll() is None:
-            return True
-        else:
-            logger.debug(
-                f"Removing stale process for \"ngrok_path\" {ngrok_path}")
-
-            _current_processes.pop(ngrok_path, None)
-
-    return False
+    return _running_process(ngrok_path) is not None
 
 
 def get_process(pyngrok_config: PyngrokConfig) -> NgrokProcess:
@@ -262,40 +466,112 @@ def get_process(pyngrok_config: PyngrokConfig) -> NgrokProcess:
     Get the current ``ngrok`` process for the given config's ``ngrok_path``.
 
     If ``ngrok`` is not running, calling this method will first start a process with
-    :class:`~pyngrok.conf.PyngrokConfig`.
+    :class:`~pyngrok.conf.PyngrokConfig`. Concurrent callers for the same ``ngrok_path`` share a single startup,
+    rather than each trying to start a process. If ``multiprocess`` is set, this startup is also shared with other
+    Python processes, and if one of them has already started ``ngrok``, this process attaches to it instead.
+
+    The shared process is owned by the Python process that started it: it is terminated when that Python process
+    kills it or exits, and the others only detach from it when killing it. Once it is gone, the next Python process
+    to need ``ngrok`` starts a new one.
 
     :param pyngrok_config: The ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary.
     :return: The ``ngrok`` process.
     """
-    if is_process_running(pyngrok_config.ngrok_path):
-        return _current_processes[pyngrok_config.ngrok_path]
+    ngrok_process = _started_process(pyngrok_config.ngrok_path)
+    if ngrok_process is not None:
+        return ngrok_process
+
+    with _start_lock(pyngrok_config.ngrok_path):
+        # Another caller may have started the process while this one waited for the lock
+        ngrok_process = _running_process(pyngrok_config.ngrok_path)
+        if ngrok_process is not None:
+            return ngrok_process
+
+        if pyngrok_config.multiprocess:
+            return _get_shared_process(pyngrok_config)
+
+        return _start_process(pyngrok_config)
+
+
+def attach(api_url: str,
+           pyngrok_config: PyngrokConfig) -> NgrokProcess:
+    """
+    Attach to a ``ngrok`` agent that is already running, but was not started by ``pyngrok`` (for instance, a
+    sidecar container), and register it as the process for the given config's ``ngrok_path``. Methods in
+    :mod:`~pyngrok.ngrok` and :mod:`~pyngrok.agent` that are then passed this config manage tunnels on the agent,
+    without installing or starting ``ngrok``.
+
+    .. code-block:: python
+
+        from pyngrok import conf, ngrok, process
+
+        pyngrok_config = conf.get_default()
+        process.attach("http://ngrok-sidecar:4040", pyngrok_config)
 
-    return _start_process(pyngrok_config)
+        tunnel = ngrok.connect("8000", pyngrok_config=pyngrok_config)
+
+    The agent is validated with its ``/api/status`` endpoint. The attached process has no output to monitor, so
+    its ``logs`` stay empty, and since ``pyngrok`` did not start it, :func:`kill_process` only detaches from it.
+
+    :param api_url: The API URL for the agent's ``ngrok`` web interface.
+    :param pyngrok_config: The ``pyngrok`` configuration to use when interacting with the agent.
+    :return: The attached ``ngrok`` process.
+    :raises: :class:`~pyngrok.exception.PyngrokSecurityError`: When the ``api_url`` is not supported.
+    :raises: :class:`~pyngrok.exception.PyngrokNgrokError`: When a process is already running for the
+        ``ngrok_path``, or the agent is not running and healthy at the ``api_url``.
+    """
+    if not api_url.lower().startswith("http"):
+        raise PyngrokSecurityError(f"URL must start with \"http\": {api_url}")
+
+    api_url = api_url.rstrip("/")
+
+    with _start_lock(pyngrok_config.ngrok_path):
+        if _running_process(pyngrok_config.ngrok_path) is not None:
+            raise PyngrokNgrokError(f"ngrok is already running for the \"ngrok_path\": {pyngrok_config.ngrok_path}")
+
+        ngrok_process = _attached_process(pyngrok_config, api_url, None)
+        if not ngrok_process._probe_api_path("/api/status"):
+            connection.close_pool(api_url)
+
+            raise PyngrokNgrokError(f"A healthy ngrok agent is not running at {api_url}.")
+
+        ngrok_process._record_startup_timing("api_ready")
+        _add_process(pyngrok_config.ngrok_path, ngrok_process)
+
+    logger.info(f"Attached to ngrok agent: {api_url}")
+
+    return ngrok_process
 
 
 def kill_process(ngrok_path: str) -> None:
     """
     Terminate the ``ngrok`` processes, if running, for the given path. This method will not block, it will just
-    issue a kill request.
+    issue a kill request. If the process is still starting, the kill waits for startup to finish first. A process
+    that this Python process did not start (for instance, one attached to with :func:`attach`, shared by another
+    Python process, or inherited by a fork) is not terminated, only detached from.
 
     :param ngrok_path: The path to the ``ngrok`` binary.
     """
-    if is_process_running(ngrok_path):
-        ngrok_process = _current_processes[ngrok_path]
-
-        logger.info(f"Killing ngrok process: {ngrok_process.proc.pid}")
-
-        try:
-            ngrok_process.proc.kill()
-            ngrok_process.proc.wait()
-        except OSError as e:  # pragma: no cover
-            # If the process was already killed, nothing to do but cleanup state
-            if e.errno != 3:
-                raise e
-
-        _current_processes.pop(ngrok_path, None)
-    else:
-        logger.debug(f"\"ngrok_path\" {ngrok_path} is not running a process")
+    with _start_lock(ngrok_path):
+        ngrok_process = _running_process(ngrok_path)
+        if ngrok_process is not None:
+            logger.info(f"Killing ngrok process: {ngrok_process.proc.pid}")
+
+            try:
+                ngrok_process.proc.kill()
+                ngrok_process.proc.wait()
+            except OSError as e:  # pragma: no cover
+                # If the process was already killed, nothing to do but cleanup state
+                if e.errno != 3:
+                    raise e
+
+            _remove_process(ngrok_path, ngrok_process)
+
+            # Python processes attached to the shared process leave it recorded for the others
+            if ngrok_process.pyngrok_config.multiprocess and not isinstance(ngrok_process.proc, _AttachedProcess):
+                _clear_shared_state(ngrok_process)
+        else:
+            logger.debug(f"\"ngrok_path\" {ngrok_path} is not running a process")
 
 
 def run_process(ngrok_path: str, args: List[str]) -> None:
@@ -361,17 +637,77 @@ def _validate_path(ngrok_path: str) -> None:
         raise PyngrokNgrokError(f"ngrok is already running for the \"ngrok_path\": {ngrok_path}")
 
 
-def _validate_config(config_path: str) -> None:
-    with installer.config_file_lock:
-        with open(config_path, "r") as config_file:
-            config = yaml.safe_load(config_file)
+def _running_process(ngrok_path: str) -> Optional[NgrokProcess]:
+    ngrok_process = _current_processes.get(ngrok_path)
+    if ngrok_process is None:
+        return None
+
+    # Ensure the process is still running and hasn't been killed externally, otherwise cleanup
+    if ngrok_process.proc.poll() is None:
+        return ngrok_process
+
+    logger.debug(f"Removing stale process for \"ngrok_path\" {ngrok_path}")
+
+    _remove_process(ngrok_path, ngrok_process)
+
+    return None
+
+
+def _started_process(ngrok_path: str) -> Optional[NgrokProcess]:
+    # Checked without holding the start lock, so a process that is still starting is not yet returned
+    ngrok_process = _running_process(ngrok_path)
+
+    return ngrok_process if ngrok_process is not None and ngrok_process._started else None
+
 
-    if config is not None:
-        installer.validate_config(config)
+def _start_lock(ngrok_path: str) -> "threading.RLock":
+    with _current_processes_lock:
+        lock = _start_locks.get(ngrok_path)
+        if lock is None:
+            lock = _start_locks[ngrok_path] = threading.RLock()
 
+        return lock
 
-def _terminate_process(process: subprocess.Popen) -> None:  # type: ignore
-    if process is None:
+
+def _add_process(ngrok_path: str,
+                 ngrok_process: NgrokProcess) -> None:
+    with _current_processes_lock:
+        _current_processes[ngrok_path] = ngrok_process
+
+
+def _remove_process(ngrok_path: str,
+                    ngrok_process: Optional[NgrokProcess] = None) -> None:
+    with _current_processes_lock:
+        # Only remove the given process, in case another has since been started for the same path
+        if ngrok_process is not None and _current_processes.get(ngrok_path) is not ngrok_process:
+            return
+
+        ngrok_process = _current_processes.pop(ngrok_path, None)
+
+    if ngrok_process is None:
+        return
+
+    if ngrok_process.api_url is not None:
+        connection.close_pool(ngrok_process.api_url)
+
+    ngrok_process._stop_reactor_monitor()
+
+    if ngrok_process._dispatcher is not None:
+        ngrok_process._dispatcher.close()
+
+    # A running monitor thread closes the reader itself, once it reads the end of the process's output
+    if ngrok_process._monitor_thread is None:
+        ngrok_process._close_reader()
+
+
+def _validate_config(config_path: str) -> None:
+    installer.validate_config(installer.get_ngrok_config(config_path))
+
+
+def _terminate_process(process: subprocess.Popen,  # type: ignore
+                       owner_pid: Optional[int] = None) -> None:
+    # A forked child inherits its parent's exit handlers, but must not terminate the parent's ngrok process
+    if process is None or (owner_pid is not None and owner_pid != os.getpid()):
         return
 
     try:
@@ -380,13 +716,13 @@ def _terminate_process(process: subprocess.Popen) -> None:  # type: ignore
         logger.debug(f"ngrok process already terminated: {process.pid}")
 
 
-def _start_process(pyngrok_config: PyngrokConfig) -> NgrokProcess:
+def _build_start_command(pyngrok_config: PyngrokConfig) -> List[str]:
     """
-    Start a ``ngrok`` process with no tunnels. This will start the ``ngrok`` web interface, against
-    which HTTP requests can be made to create, interact with, and destroy tunnels.
+    Validate that ``ngrok`` is ready to be started with the given config, and build the command to start it.
 
     :param pyngrok_config: The ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary.
-    :return: The ``ngrok`` process.
+    :return: The command to start the ``ngrok`` process.
+    :raises: :class:`~pyngrok.exception.PyngrokError`: When the config is invalid.
     :raises: :class:`~pyngrok.exception.PyngrokNgrokError`: When ``ngrok`` could not start.
     """
     config_path = conf.get_config_path(pyngrok_config)
@@ -394,6 +730,9 @@ def _start_process(pyngrok_config: PyngrokConfig) -> NgrokProcess:
     _validate_path(pyngrok_config.ngrok_path)
     _validate_config(config_path)
 
+    if pyngrok_config.log_queue_overflow not in monitor.OVERFLOW_POLICIES:
+        raise PyngrokError(f"\"log_queue_overflow\" must be one of: {monitor.OVERFLOW_POLICIES}")
+
     start = [pyngrok_config.ngrok_path, "start", "--none", "--log", "stdout"]
     if pyngrok_config.config_path:
         logger.info(f"Starting ngrok with config file: {pyngrok_config.config_path}")
@@ -408,51 +747,247 @@ def _start_process(pyngrok_config: PyngrokConfig) -> NgrokProcess:
         start.append("--region")
         start.append(pyngrok_config.region)
 
-    popen_kwargs: Dict[str, Any] = {"stdout": subprocess.PIPE, "universal_newlines": True}
+    return start
+
+
+def _session_kwargs(pyngrok_config: PyngrokConfig) -> Dict[str, Any]:
     if os.name == "posix":
-        popen_kwargs.update(start_new_session=pyngrok_config.start_new_session)
+        return {"start_new_session": pyngrok_config.start_new_session}
     elif pyngrok_config.start_new_session:
         logger.warning("Ignoring start_new_session=True, which requires POSIX")
+
+    return {}
+
+
+def _start_process(pyngrok_config: PyngrokConfig) -> NgrokProcess:
+    """
+    Start a ``ngrok`` process with no tunnels. This will start the ``ngrok`` web interface, against
+    which HTTP requests can be made to create, interact with, and destroy tunnels.
+
+    :param pyngrok_config: The ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary.
+    :return: The ``ngrok`` process.
+    :raises: :class:`~pyngrok.exception.PyngrokNgrokError`: When ``ngrok`` could not start.
+    """
+    # Held for the whole startup, so validating the path and registering the process are atomic
+    with _start_lock(pyngrok_config.ngrok_path):
+        return _start_process_locked(pyngrok_config)
+
+
+def _spawn_process(pyngrok_config: PyngrokConfig) -> NgrokProcess:
+    start = _build_start_command(pyngrok_config)
+
+    popen_kwargs: Dict[str, Any] = {"stdout": subprocess.PIPE, "universal_newlines": True}
+    popen_kwargs.update(_session_kwargs(pyngrok_config))
     proc = subprocess.Popen(start, **popen_kwargs)
-    atexit.register(_terminate_process, proc)
+    atexit.register(_terminate_process, proc, os.getpid())
 
     logger.debug(f"ngrok process starting with PID: {proc.pid}")
 
     ngrok_process = NgrokProcess(proc, pyngrok_config)
-    _current_processes[pyngrok_config.ngrok_path] = ngrok_process
+    _add_process(pyngrok_config.ngrok_path, ngrok_process)
 
+    return ngrok_process
+
+
+def _start_process_locked(pyngrok_config: PyngrokConfig) -> NgrokProcess:
+    ngrok_process = _spawn_process(pyngrok_config)
+
+    reader = ngrok_process._stdout_reader()
+    healthy = False
     timeout = time.time() + pyngrok_config.startup_timeout
     while time.time() < timeout:
-        if proc.stdout is None:
+        if reader is None:
             logger.debug("Output from process is empty, breaking startup loop")
             break
 
-        line = proc.stdout.readline()
-        ngrok_process._log_startup_line(line)
+        line = reader.readline(max(timeout - time.time(), 0))
+        if line is None:
+            if reader.eof:
+                break
 
-        if ngrok_process.healthy():
-            logger.debug(f"ngrok process has started with API URL: {ngrok_process.api_url}")
+            continue
 
-            ngrok_process.startup_error = None
+        ngrok_process._log_startup_line(line)
 
-            if pyngrok_config.monitor_thread:
-                ngrok_process.start_monitor_thread()
+        # The web interface is only probed once the logs show startup is complete, not on every line
+        if ngrok_process._startup_logged():
+            healthy = ngrok_process._wait_for_api(timeout)
+            break
 
-        if ngrok_process.healthy() or ngrok_process.proc.poll() is not None:
+        if ngrok_process.proc.poll() is not None:
             break
 
-    if not ngrok_process.healthy():
+    if not healthy:
         # If the process did not come up in a healthy state, clean up the state
         kill_process(pyngrok_config.ngrok_path)
 
         if ngrok_process.startup_error is not None:
             raise PyngrokNgrokError(f"The ngrok process errored on start: {ngrok_process.startup_error}.",
-                                    ngrok_process.logs,
+                                    ngrok_process.logs.snapshot(),
                                     ngrok_process.startup_error)
         else:
-            raise PyngrokNgrokError("The ngrok process was unable to start.", ngrok_process.logs)
+            raise PyngrokNgrokError("The ngrok process was unable to start.", ngrok_process.logs.snapshot())
+
+    logger.debug(f"ngrok process has started with API URL: {ngrok_process.api_url}")
+
+    ngrok_process.startup_error = None
+    ngrok_process._started = True
+
+    if pyngrok_config.monitor_thread:
+        ngrok_process.start_monitor_thread()
 
     return ngrok_process
 
 
+def _shared_state_path(pyngrok_config: PyngrokConfig) -> str:
+    return f"{conf.get_config_path(pyngrok_config)}.pyngrok.json"
+
+
+def _shared_lock(pyngrok_config: PyngrokConfig) -> FileLock:
+    # Waiting on another Python process's startup may take as long as a startup of our own
+    return FileLock(f"{conf.get_config_path(pyngrok_config)}.pyngrok.lock",
+                    timeout=pyngrok_config.startup_timeout * 2)
+
+
+def _get_shared_process(pyngrok_config: PyngrokConfig) -> NgrokProcess:
+    """
+    Attach to the ``ngrok`` process recorded in the shared state file, if it is still running and healthy,
+    otherwise start a process and record it for other Python processes to attach to.
+
+    :param pyngrok_config: The ``pyngrok`` configuration to use when interacting with the ``ngrok`` binary.
+    :return: The ``ngrok`` process.
+    :raises: :class:`~pyngrok.exception.PyngrokNgrokError`: When ``ngrok`` could not start.
+    """
+    state_path = _shared_state_path(pyngrok_config)
+
+    with _shared_lock(pyngrok_config):
+        state = _read_shared_state(state_path)
+        if state is not None and state.get("ngrok_path") == pyngrok_config.ngrok_path and \
+                _pid_running(state["pid"]):
+            ngrok_process = _attach_process(pyngrok_config, state["api_url"], state["pid"])
+            if ngrok_process is not None:
+                logger.info(f"Attached to ngrok process started by another Python process: {state['pid']}")
+
+                return ngrok_process
+
+            logger.warning(f"ngrok process recorded in {state_path} is not healthy, starting a new one")
+
+        ngrok_process = _start_process(pyngrok_config)
+
+        _write_shared_state(state_path, {"pid": ngrok_process.proc.pid,
+                                         "api_url": ngrok_process.api_url,
+                                         "ngrok_path": pyngrok_config.ngrok_path})
+
+        return ngrok_process
+
+
+def _attached_process(pyngrok_config: PyngrokConfig,
+                      api_url: Optional[str],
+                      pid: Optional[int]) -> NgrokProcess:
+    ngrok_process = NgrokProcess(_AttachedProcess(pid), pyngrok_config)  # type: ignore
+    ngrok_process.api_url = api_url
+    # The process's startup already completed, so its web interface only needs to be probed
+    ngrok_process._started = True
+    ngrok_process._client_connected = True
+    ngrok_process._tunnel_started = True
+
+    return ngrok_process
+
+
+def _attach_process(pyngrok_config: PyngrokConfig,
+                    api_url: str,
+                    pid: int) -> Optional[NgrokProcess]:
+    ngrok_process = _attached_process(pyngrok_config, api_url, pid)
+
+    if not ngrok_process.healthy():
+        return None
+
+    _add_process(pyngrok_config.ngrok_path, ngrok_process)
+
+    return ngrok_process
+
+
+def _read_shared_state(state_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(state_path, "r") as state_file:
+            state: Dict[str, Any] = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+
+    return state if isinstance(state.get("pid"), int) and state.get("api_url") else None
+
+
+def _write_shared_state(state_path: str,
+                        state: Dict[str, Any]) -> None:
+    tmp_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as state_file:
+        json.dump(state, state_file)
+
+    # Replaced atomically, so other Python processes never read a partially written state
+    os.replace(tmp_path, state_path)
+
+
+def _clear_shared_state(ngrok_process: NgrokProcess) -> None:
+    state_path = _shared_state_path(ngrok_process.pyngrok_config)
+
+    with _shared_lock(ngrok_process.pyngrok_config):
+        state = _read_shared_state(state_path)
+        if state is not None and state["pid"] == ngrok_process.proc.pid:
+            os.remove(state_path)
+
+
+def _pid_running(pid: int) -> bool:
+    if sys.platform == "win32":
+        import ctypes
+
+        process_query_limited_information = 0x1000
+        still_active = 259
+
+        handle = ctypes.windll.kernel32.OpenProcess(process_query_limited_information, False, pid)
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            ctypes.windll.kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == still_active
+        finally:
+            ctypes.windll.kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists, but is owned by another user
+        return True
+
+    # A process that has exited is a zombie until its parent reaps it, which may not be this Python process
+    try:
+        with open(f"/proc/{pid}/stat", "r") as stat_file:
+            return stat_file.read().rpartition(")")[2].split()[0] != "Z"
+    except (OSError, IndexError):
+        return True
+
+
+def _reset_after_fork() -> None:
+    global _current_processes_lock, _start_locks
+
+    # A lock held by another thread at the time of the fork would never be released in the child
+    _current_processes_lock = threading.Lock()
+    _start_locks = {}
+
+    # The parent's processes are not the child's children, and their monitor threads did not survive the fork, so
+    # the child attaches to them rather than owning them
+    for ngrok_path, ngrok_process in list(_current_processes.items()):
+        _current_processes[ngrok_path] = _attached_process(ngrok_process.pyngrok_config, ngrok_process.api_url,
+                                                           ngrok_process.proc.pid)
+
+
 _current_processes: Dict[str, NgrokProcess] = {}
+# Guards changes to "_current_processes" and "_start_locks"
+_current_processes_lock = threading.Lock()
+# Held while a process for the "ngrok_path" is started or killed, so concurrent callers share one startup
+_start_locks: Dict[str, "threading.RLock"] = {}
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
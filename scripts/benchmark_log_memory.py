@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from pyngrok.log import NgrokLog, parse_logfmt  # noqa: E402
+from scripts.benchmark_log_parsing import DEFAULT_CORPUS, load_corpus  # noqa: E402
+
+
+class EagerNgrokLog:
+    """
+    The ``__dict__`` based, eagerly parsed log previously used by :class:`~pyngrok.log.NgrokLog`, kept as a
+    baseline.
+    """
+
+    def __init__(self, line):
+        self.line = line.strip()
+        self.t = None
+        self.lvl = "NOTSET"
+        self.msg = None
+        self.err = None
+        self.obj = None
+        self.addr = None
+
+        for key, value in parse_logfmt(self.line).items():
+            setattr(self, key, value)
+
+
+def measure(log_class, corpus, count, access):
+    """
+    Measure the memory retained by ``count`` logs of the given class.
+
+    :param log_class: The class used to represent each log.
+    :param corpus: The log lines to cycle through.
+    :param count: The number of logs to retain.
+    :param access: The fields to access on each log. :class:`~pyngrok.process.NgrokProcess` accesses ``lvl``
+        when a log is received.
+    :return: The retained memory, in bytes.
+    """
+    # Copy each line, as lines read from the process are distinct objects
+    lines = [(corpus[i % len(corpus)] + " ")[:-1] for i in range(count)]
+
+    gc.collect()
+    tracemalloc.start()
+    logs = []
+    for line in lines:
+        log = log_class(line)
+        for field in access:
+            getattr(log, field)
+        logs.append(log)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del logs
+
+    return retained
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the memory retained by ngrok agent logs.")
+    parser.add_argument("--corpus", help="A file of recorded ngrok agent output, one log per line")
+    parser.add_argument("--count", type=int, default=100000, help="The number of logs to retain")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else DEFAULT_CORPUS
+
+    for label, log_class, access in [("__dict__ (before)", EagerNgrokLog, []),
+                                     ("__slots__, lvl read (after)", NgrokLog, ["lvl"]),
+                                     ("__slots__, all read (after)", NgrokLog, ["lvl", "msg"])]:
+        retained = measure(log_class, corpus, args.count, access)
+        print(f"{label:<28} {retained / 1024 / 1024:>8.1f} MiB for {args.count:,} logs "
+              f"({retained / args.count:,.0f} bytes/log)")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import argparse
+import logging
+import os
+import shlex
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from pyngrok.log import parse_logfmt  # noqa: E402
+
+# Lines as emitted by the ngrok v3 agent with "log_level: debug", used when no recorded corpus is given
+DEFAULT_CORPUS = [
+    "t=2025-01-14T10:21:03-0600 lvl=info msg=\"no configuration paths supplied\"",
+    "t=2025-01-14T10:21:03-0600 lvl=info msg=\"using configuration at default config path\" "
+    "path=/home/user/.config/ngrok/ngrok.yml",
+    "t=2025-01-14T10:21:03-0600 lvl=info msg=\"open config file\" path=/home/user/.config/ngrok/ngrok.yml err=nil",
+    "t=2025-01-14T10:21:03-0600 lvl=info msg=\"starting web service\" obj=web addr=127.0.0.1:4040 allow_hosts=[]",
+    "t=2025-01-14T10:21:04-0600 lvl=info msg=\"client session established\" obj=tunnels.session",
+    "t=2025-01-14T10:21:04-0600 lvl=info msg=\"tunnel session started\" obj=tunnels.session",
+    "t=2025-01-14T10:21:05-0600 lvl=info msg=\"started tunnel\" obj=tunnels name=http-8000-a1b2c3 "
+    "addr=http://localhost:8000 url=https://a1b2-203-0-113-7.ngrok-free.app",
+    "t=2025-01-14T10:21:06-0600 lvl=dbug msg=\"start stream\" obj=tunnels.session clientid=9f8e7d6c5b4a "
+    "stream=1 sid=a1b2c3d4 clientid=9f8e7d6c5b4a",
+    "t=2025-01-14T10:21:06-0600 lvl=info msg=\"join connections\" obj=join id=0123456789ab "
+    "l=127.0.0.1:8000 r=203.0.113.7:51234",
+    "t=2025-01-14T10:21:06-0600 lvl=dbug msg=\"decoded request\" obj=tunnels.session "
+    "req=\"GET /api/v1/items?page=2&sort=\\\"desc\\\" HTTP/1.1\" remote_addr=203.0.113.7:51234",
+    "t=2025-01-14T10:21:07-0600 lvl=warn msg=\"failed to check for update\" obj=updater err=\"Post "
+    "\\\"https://update.equinox.io/check\\\": context deadline exceeded\"",
+    "t=2025-01-14T10:21:08-0600 lvl=eror msg=\"session closing\" obj=tunnels.session err=EOF",
+]
+
+
+def parse_with_shlex(line):
+    """
+    The ``shlex`` based parsing previously used by :class:`~pyngrok.log.NgrokLog`, kept as a baseline.
+    """
+    attrs = {}
+    try:
+        split = shlex.split(line.strip())
+    except ValueError:
+        split = []
+
+    for i in split:
+        if "=" not in i:
+            continue
+
+        key, value = i.split("=", 1)
+
+        if key == "lvl":
+            value = value.upper()
+            if value == "CRIT":
+                value = "CRITICAL"
+            elif value in ["ERR", "EROR"]:
+                value = "ERROR"
+            elif value == "WARN":
+                value = "WARNING"
+
+            if not hasattr(logging, value):
+                value = "NOTSET"
+
+        attrs[key] = value
+
+    return attrs
+
+
+def load_corpus(path):
+    if path is None:
+        return DEFAULT_CORPUS
+
+    with open(path, "r") as f:
+        return [line for line in f.read().splitlines() if line.strip()]
+
+
+def benchmark(corpus, repeat):
+    """
+    Print the lines per second parsed with the ``shlex`` baseline and with :func:`~pyngrok.log.parse_logfmt`.
+
+    :param corpus: The log lines to parse.
+    :param repeat: The number of times to parse the whole corpus.
+    """
+    total = len(corpus) * repeat
+
+    for label, parse in [("shlex (before)", parse_with_shlex),
+                         ("parse_logfmt (after)", parse_logfmt)]:
+        elapsed = min(timeit.repeat(lambda: [parse(line) for line in corpus], number=repeat, repeat=3))
+        print(f"{label:<20} {total / elapsed:>12,.0f} lines/second")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the parsing of ngrok agent logs.")
+    parser.add_argument("--corpus", help="A file of recorded ngrok agent output, one log per line")
+    parser.add_argument("--repeat", type=int, default=2000, help="The number of times to parse the corpus")
+    args = parser.parse_args()
+
+    benchmark(load_corpus(args.corpus), args.repeat)
@@ -0,0 +1,204 @@
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import asyncio
+import json
+import os
+import unittest
+from unittest import mock
+
+from pyngrok import aio, ngrok, process
+from pyngrok.exception import PyngrokNgrokHTTPError, PyngrokSecurityError
+from tests.testcase import FakeNgrokApi, NgrokTestCase
+
+
+class TestAio(NgrokTestCase):
+    def setUp(self):
+        super(TestAio, self).setUp()
+
+        self.fake_api = FakeNgrokApi().start()
+
+    def tearDown(self):
+        self.fake_api.stop()
+
+        super(TestAio, self).tearDown()
+
+    @unittest.skipIf(not os.environ.get("NGROK_AUTHTOKEN"), "NGROK_AUTHTOKEN environment variable not set")
+    def test_get_ngrok_process(self):
+        async def run():
+            # WHEN
+            ngrok_processes = await asyncio.gather(*[aio.get_ngrok_process(self.pyngrok_config) for _ in range(10)])
+            tunnel = await aio.connect(pyngrok_config=self.pyngrok_config)
+            tunnels = await aio.get_tunnels(self.pyngrok_config)
+            await aio.kill(self.pyngrok_config)
+
+            return ngrok_processes, tunnel, tunnels
+
+        ngrok_processes, tunnel, tunnels = asyncio.run(run())
+
+        # THEN
+        self.assertEqual(1, len(set(ngrok_processes)))
+        self.assertIsNotNone(ngrok_processes[0].api_url)
+        self.assertIsNotNone(tunnel.public_url)
+        self.assertEqual(1, len(tunnels))
+        self.assertFalse(process.is_process_running(self.pyngrok_config.ngrok_path))
+
+    ################################################################################
+    # Tests below this point don't need to start a long-lived ngrok process, they
+    # are asserting on pyngrok-specific code or edge cases.
+    ################################################################################
+
+    @unittest.skipIf(os.name != "posix", "The fake ngrok binary is a script")
+    def test_get_ngrok_process_outlives_loop(self):
+        # GIVEN
+        self.given_fake_ngrok_installed(self.pyngrok_config)
+
+        # WHEN
+        ngrok_process = asyncio.run(aio.get_ngrok_process(self.pyngrok_config))
+
+        # THEN
+        self.assertIsNone(ngrok_process.proc.poll())
+        self.assertTrue(ngrok_process.healthy())
+        self.assertIsNotNone(ngrok_process._monitor_thread)
+        self.assertTrue(process.is_process_running(self.pyngrok_config.ngrok_path))
+
+        # WHEN
+        ngrok.kill(self.pyngrok_config)
+
+        # THEN
+        self.assertIsNotNone(ngrok_process.proc.poll())
+        self.assertTrue(ngrok_process.join_monitor_thread(5))
+        self.assertFalse(process.is_process_running(self.pyngrok_config.ngrok_path))
+
+    @unittest.skipIf(os.name != "posix", "The fake ngrok binary is a script")
+    def test_get_ngrok_process_shares_startup_with_sync_callers(self):
+        # GIVEN
+        self.given_fake_ngrok_installed(self.pyngrok_config, startup_delay=0.5)
+
+        def get_started_process():
+            ngrok_process = ngrok.get_ngrok_process(self.pyngrok_config)
+            return ngrok_process, "api_ready" in ngrok_process.startup_timings
+
+        async def get_started_process_async():
+            ngrok_process = await aio.get_ngrok_process(self.pyngrok_config)
+            return ngrok_process, "api_ready" in ngrok_process.startup_timings
+
+        async def run():
+            loop = asyncio.get_running_loop()
+
+            # WHEN
+            results = await asyncio.gather(*[get_started_process_async() for _ in range(5)],
+                                           *[loop.run_in_executor(None, get_started_process) for _ in range(5)])
+            await aio.kill(self.pyngrok_config)
+
+            return results
+
+        results = asyncio.run(run())
+
+        # THEN
+        # Each caller was returned the same process, once it had started
+        self.assertEqual(1, len({ngrok_process for ngrok_process, _ in results}))
+        self.assertEqual([True] * 10, [started for _, started in results])
+        self.assertFalse(process.is_process_running(self.pyngrok_config.ngrok_path))
+
+    def test_api_request_reuses_connection(self):
+        # GIVEN
+        self.fake_api.server.captured_requests = [{"id": f"req-{i}", "tunnel_name": "my-tunnel"} for i in range(20)]
+
+        async def run():
+            status = [await aio.api_request(f"{self.fake_api.api_url}/api/status") for _ in range(5)]
+            requests = await aio.api_request(f"{self.fake_api.api_url}/api/requests/http",
+                                             params={"tunnel_name": "my-tunnel"})
+
+            return status, requests
+
+        # WHEN
+        status, requests = asyncio.run(run())
+
+        # THEN
+        self.assertEqual("online", status[-1]["status"])
+        self.assertEqual(20, len(requests["requests"]))
+        self.assertEqual(1, self.fake_api.connection_count)
+
+    def test_api_request_http_error(self):
+        # WHEN
+        with self.assertRaises(PyngrokNgrokHTTPError) as cm:
+            asyncio.run(aio.api_request(f"{self.fake_api.api_url}/api/tunnels/unknown", method="DELETE"))
+
+        # THEN
+        self.assertEqual(404, cm.exception.status_code)
+
+    def test_api_request_security_error(self):
+        # WHEN
+        with self.assertRaises(PyngrokSecurityError):
+            asyncio.run(aio.api_request(f"file:{__file__}"))
+
+    @mock.patch("pyngrok.process.is_process_running")
+    @mock.patch("pyngrok.aio.get_ngrok_process")
+    def test_connect_get_tunnels_disconnect(self, mock_get_ngrok_process, mock_is_process_running):
+        # GIVEN
+        mock_get_ngrok_process.return_value = mock.Mock(api_url=self.fake_api.api_url)
+        mock_is_process_running.return_value = True
+
+        async def run():
+            tunnel = await aio.connect("8000", name="my-tunnel", pyngrok_config=self.pyngrok_config)
+            tunnels = await aio.get_tunnels(self.pyngrok_config)
+            await aio.disconnect(tunnel.public_url, self.pyngrok_config)
+
+            return tunnel, tunnels
+
+        # WHEN
+        tunnel, tunnels = asyncio.run(run())
+
+        # THEN
+        self.assertEqual("my-tunnel", tunnel.name)
+        self.assertEqual("8000", tunnel.upstream["url"])
+        self.assertEqual([tunnel.public_url], [t.public_url for t in tunnels])
+        self.assertEqual(0, len(self.fake_api.tunnels))
+
+    def test_pool_does_not_retry_disconnected_post(self):
+        async def run():
+            pool = aio._AsyncConnectionPool(self.fake_api.api_url)
+            try:
+                await pool.request("GET", "/api/tunnels", None, {}, 4)
+                self.fake_api.drop()
+
+                # WHEN
+                with self.assertRaises(ConnectionResetError):
+                    await pool.request("POST", "/api/tunnels", json.dumps({"name": "my-tunnel"}).encode("utf-8"),
+                                       {"Content-Type": "application/json"}, 4)
+                dropped = list(self.fake_api.server.dropped)
+
+                await pool.request("GET", "/api/tunnels", None, {}, 4)
+                self.fake_api.drop()
+                status, _, _, _ = await pool.request("GET", "/api/tunnels", None, {}, 4)
+
+                return dropped, status
+            finally:
+                pool.close()
+
+        # GIVEN
+        dropped, status = asyncio.run(run())
+
+        # THEN
+        self.assertEqual(["POST /api/tunnels"], dropped)
+        self.assertEqual({}, self.fake_api.tunnels)
+        self.assertEqual(200, status)
+        self.assertEqual(["POST /api/tunnels", "GET /api/tunnels"], self.fake_api.server.dropped)
+        self.assertEqual(3, self.fake_api.connection_count)
+
+    @mock.patch("pyngrok.aio.get_ngrok_process")
+    def test_concurrent_requests_share_bounded_connections(self, mock_get_ngrok_process):
+        # GIVEN
+        mock_get_ngrok_process.return_value = mock.Mock(api_url=self.fake_api.api_url)
+
+        async def run():
+            return await asyncio.gather(*[aio.get_agent_status(self.pyngrok_config) for _ in range(1000)])
+
+        # WHEN
+        agents = asyncio.run(run())
+
+        # THEN
+        self.assertEqual(1000, len(agents))
+        self.assertTrue(all(agent.status == "online" for agent in agents))
+        self.assertLessEqual(self.fake_api.connection_count, aio.DEFAULT_MAX_CONNECTIONS)
@@ -2,8 +2,11 @@ __copyright__ = "Copyright (c) 2018-2025 Alex Laird"
 __license__ = "MIT"
 
 import os
+import subprocess
+import sys
 from unittest import mock
 
+from pyngrok import conf, installer
 from pyngrok.conf import PyngrokConfig
 from tests.testcase import NgrokTestCase
 
@@ -30,3 +33,28 @@ class TestConf(NgrokTestCase):
 
         # THEN
         self.assertEqual(ngrok_api_key, pyngrok_config.api_key)
+
+    def test_platform_defaults_computed_on_access(self):
+        # WHEN
+        default_ngrok_dir = conf.DEFAULT_NGROK_DIR
+
+        # THEN
+        self.assertEqual(installer.get_default_ngrok_dir(), default_ngrok_dir)
+        with self.assertRaises(AttributeError):
+            conf.DEFAULT_DOES_NOT_EXIST
+
+    def test_import_time(self):
+        # GIVEN
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = "import sys, pyngrok.process; print(\"DEFAULT_NGROK_DIR\" in vars(sys.modules[\"pyngrok.conf\"]))"
+
+        # WHEN
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                cwd=project_dir, capture_output=True, text=True, check=True)
+
+        # THEN
+        imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines() if "|" in line}
+        self.assertIn("pyngrok.process", imported)
+        for module in ["yaml", "tarfile", "zipfile"]:
+            self.assertNotIn(module, imported)
+        self.assertEqual("False", result.stdout.strip())
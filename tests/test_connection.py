@@ -0,0 +1,150 @@
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pyngrok import connection, ngrok
+from pyngrok.connection import ConnectionPool
+from pyngrok.exception import PyngrokNgrokHTTPError
+from tests.testcase import FakeNgrokApi, NgrokTestCase
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connection_count += 1
+
+    def do_GET(self):  # noqa: N802
+        if self.path.startswith("/api/missing"):
+            self._respond(404, {"error_code": 100, "msg": "not found"})
+        else:
+            self._respond(200, {"path": self.path})
+
+    def do_DELETE(self):  # noqa: N802
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _respond(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestConnection(NgrokTestCase):
+    def setUp(self):
+        super(TestConnection, self).setUp()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeApiHandler)
+        self.server.daemon_threads = True
+        self.server.connection_count = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.api_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        connection.close_pool(self.api_url)
+        self.server.shutdown()
+        self.server.server_close()
+
+        super(TestConnection, self).tearDown()
+
+    def test_api_request_reuses_pooled_connection(self):
+        # GIVEN
+        connection.get_or_create_pool(self.api_url)
+
+        # WHEN
+        responses = [ngrok.api_request(f"{self.api_url}/api/tunnels", params={"i": i}) for i in range(5)]
+        ngrok.api_request(f"{self.api_url}/api/tunnels/foo", method="DELETE")
+
+        # THEN
+        self.assertEqual(1, self.server.connection_count)
+        self.assertEqual("/api/tunnels?i=4", responses[-1]["path"])
+
+    def test_api_request_without_pool_opens_new_connections(self):
+        # WHEN
+        for _ in range(3):
+            ngrok.api_request(f"{self.api_url}/api/tunnels")
+
+        # THEN
+        self.assertIsNone(connection.get_pool(self.api_url))
+        self.assertEqual(3, self.server.connection_count)
+
+    def test_api_request_pooled_http_error(self):
+        # GIVEN
+        connection.get_or_create_pool(self.api_url)
+
+        # WHEN
+        with self.assertRaises(PyngrokNgrokHTTPError) as cm:
+            ngrok.api_request(f"{self.api_url}/api/missing")
+
+        # THEN
+        self.assertEqual(404, cm.exception.status_code)
+        self.assertIn("not found", cm.exception.body)
+
+    def test_pool_evicts_idle_and_closed_connections(self):
+        # GIVEN
+        pool = ConnectionPool(self.api_url, max_size=1, idle_timeout=0)
+
+        # WHEN
+        pool.request("GET", "/api/tunnels")
+        pool.request("GET", "/api/tunnels")
+
+        # THEN
+        self.assertEqual(2, self.server.connection_count)
+
+        # WHEN
+        pool.close()
+        pool.request("GET", "/api/tunnels")
+
+        # THEN
+        self.assertEqual(3, self.server.connection_count)
+        self.assertEqual(0, len(pool._idle))
+
+    def test_pool_does_not_retry_disconnected_post(self):
+        # GIVEN
+        fake_api = FakeNgrokApi().start()
+        self.addCleanup(fake_api.stop)
+        pool = ConnectionPool(fake_api.api_url)
+        self.addCleanup(pool.close)
+        pool.request("GET", "/api/tunnels")
+        fake_api.drop()
+
+        # WHEN
+        with self.assertRaises(ConnectionResetError):
+            pool.request("POST", "/api/tunnels", body=json.dumps({"name": "my-tunnel"}).encode("utf-8"),
+                         headers={"Content-Type": "application/json"})
+
+        # THEN
+        self.assertEqual(["POST /api/tunnels"], fake_api.server.dropped)
+        self.assertEqual(1, fake_api.connection_count)
+
+        # WHEN
+        pool.request("GET", "/api/tunnels")
+        fake_api.drop()
+        response = pool.request("GET", "/api/tunnels")
+
+        # THEN
+        self.assertEqual(200, response.status)
+        self.assertEqual(["POST /api/tunnels", "GET /api/tunnels"], fake_api.server.dropped)
+        self.assertEqual(3, fake_api.connection_count)
+
+    def test_close_pool(self):
+        # GIVEN
+        connection.get_or_create_pool(self.api_url)
+
+        # WHEN
+        connection.close_pool(self.api_url)
+
+        # THEN
+        self.assertIsNone(connection.get_pool(self.api_url))
@@ -0,0 +1,30 @@
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import os
+
+from pyngrok.exception import PyngrokError
+from pyngrok.filelock import FileLock
+from tests.testcase import NgrokTestCase
+
+
+class TestFileLock(NgrokTestCase):
+    def test_file_lock_excludes_other_holders(self):
+        # GIVEN
+        path = os.path.join(self.config_dir, "test.lock")
+        lock = FileLock(path)
+        other = FileLock(path, timeout=0.1)
+
+        # WHEN
+        with lock:
+            # THEN
+            self.assertTrue(lock.locked)
+            with self.assertRaises(PyngrokError):
+                other.acquire()
+            self.assertFalse(other.locked)
+
+        # WHEN
+        with other:
+            # THEN
+            self.assertFalse(lock.locked)
+            self.assertTrue(other.locked)
@@ -1,18 +1,28 @@
 __copyright__ = "Copyright (c) 2018-2025 Alex Laird"
 __license__ = "MIT"
 
+import hashlib
+import io
+import multiprocessing
 import os
 import socket
+import tarfile
+import threading
+import time
+import uuid
 import urllib
 import urllib.request
 from unittest import mock
 from urllib.error import HTTPError
 
+import yaml
+
 from pyngrok import installer, ngrok, conf
 from pyngrok.conf import PyngrokConfig
-from pyngrok.exception import PyngrokError, PyngrokNgrokInstallError, PyngrokSecurityError
+from pyngrok.exception import PyngrokError, PyngrokNgrokChecksumError, PyngrokNgrokInstallError, \
+    PyngrokSecurityError
 from pyngrok.installer import PLATFORMS
-from tests.testcase import NgrokTestCase
+from tests.testcase import FakeCdn, NgrokTestCase
 
 
 class TestInstaller(NgrokTestCase):
@@ -96,6 +106,65 @@ class TestInstaller(NgrokTestCase):
         self.assertEqual("3", ngrok_config["version"])
         self.assertTrue(os.path.exists(self.pyngrok_config.config_path))
 
+    def test_get_ngrok_config_revalidates_cache(self):
+        # GIVEN
+        installer.install_default_config(self.pyngrok_config.config_path,
+                                         {"endpoints": [{"name": "my-endpoint", "upstream": {"url": "8000"}}]},
+                                         self.pyngrok_config.ngrok_version,
+                                         "3")
+        ngrok_config = installer.get_ngrok_config(self.pyngrok_config.config_path)
+
+        # WHEN
+        with mock.patch("builtins.open", side_effect=AssertionError("The config should not be read again")):
+            cached_config = installer.get_ngrok_config(self.pyngrok_config.config_path)
+
+        # THEN
+        self.assertIs(ngrok_config, cached_config)
+        entry = installer._config_cache[self.pyngrok_config.config_path]
+        self.assertEqual({"upstream": {"url": "8000"}}, entry.endpoint_definitions["my-endpoint"].options)
+
+        # WHEN
+        with open(self.pyngrok_config.config_path, "w") as config_file:
+            config_file.write("version: \"3\"\ntunnels:\n  my-tunnel:\n    addr: 9000\n    proto: http\n")
+        ngrok_config = installer.get_ngrok_config(self.pyngrok_config.config_path)
+
+        # THEN
+        self.assertIsNot(cached_config, ngrok_config)
+        self.assertNotIn("endpoints", ngrok_config)
+        entry = installer._config_cache[self.pyngrok_config.config_path]
+        self.assertEqual({}, entry.endpoint_definitions)
+        self.assertEqual(9000, entry.tunnel_definitions["my-tunnel"].addr)
+
+    def test_config_lock_does_not_block_other_configs(self):
+        # GIVEN
+        other_config_path = os.path.join(self.config_dir, "other_config.yml")
+        installer.install_default_config(self.pyngrok_config.config_path, ngrok_version="3")
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_config_lock():
+            with installer._config_lock(self.pyngrok_config.config_path):
+                locked.set()
+                release.wait(10)
+
+        holder = threading.Thread(target=hold_config_lock)
+        holder.start()
+        self.assertTrue(locked.wait(10))
+
+        try:
+            # WHEN
+            start = time.time()
+            ngrok_config = installer.get_ngrok_config(self.pyngrok_config.config_path, use_cache=False)
+            installer.install_default_config(other_config_path, ngrok_version="3")
+
+            # THEN
+            self.assertLess(time.time() - start, 5)
+            self.assertIn("version", ngrok_config)
+            self.assertTrue(os.path.exists(other_config_path))
+        finally:
+            release.set()
+            holder.join(10)
+
     ################################################################################
     # Tests below this point don't need to start a long-lived ngrok process, they
     # are asserting on pyngrok-specific code or edge cases.
@@ -139,6 +208,311 @@ class TestInstaller(NgrokTestCase):
         with self.assertRaises(PyngrokSecurityError):
             installer._download_file(f"file:{__file__}", retries=10)
 
+    @mock.patch("pyngrok.installer.DEFAULT_DOWNLOAD_CHUNK_SIZE", 1024)
+    def test_download_file_ranged(self):
+        # GIVEN
+        archive = os.urandom(10 * 1024 + 5)
+        fake_cdn, url = self.given_fake_cdn(archive)
+
+        # WHEN
+        download_path = installer._download_file(url).download_path
+
+        # THEN
+        self.assertEqual(os.path.join(self.config_dir, "cache", "downloads"), os.path.dirname(download_path))
+        with open(download_path, "rb") as f:
+            self.assertEqual(archive, f.read())
+        self.assertEqual({f"bytes={i * 1024}-{i * 1024 + 1023}" for i in range(10)} | {"bytes=10240-10244"},
+                         set(fake_cdn.requests))
+        self.assertFalse(os.path.exists(f"{download_path}.part"))
+        self.assertFalse(os.path.exists(f"{download_path}.part.json"))
+
+    @mock.patch("pyngrok.installer.DEFAULT_RETRY_COUNT", 0)
+    @mock.patch("pyngrok.installer.DEFAULT_CHUNK_RETRY_BACKOFF", 0)
+    @mock.patch("pyngrok.installer.DEFAULT_CHUNK_RETRY_COUNT", 1)
+    @mock.patch("pyngrok.installer.DEFAULT_DOWNLOAD_CHUNK_SIZE", 1024)
+    def test_download_file_retries_and_resumes(self):
+        # GIVEN
+        archive = os.urandom(4 * 1024)
+        fake_cdn, url = self.given_fake_cdn(archive)
+        fake_cdn.fail("bytes=1024-2047")
+        fake_cdn.fail("bytes=2048-3071", count=2)
+
+        # WHEN
+        with self.assertRaises(HTTPError):
+            installer._download_file(url)
+
+        # THEN
+        self.assertEqual(2, fake_cdn.requests.count("bytes=1024-2047"))
+        self.assertEqual(2, fake_cdn.requests.count("bytes=2048-3071"))
+        download_path = installer._download_path(url)
+        self.assertTrue(os.path.exists(f"{download_path}.part"))
+
+        # WHEN
+        fake_cdn.requests.clear()
+        download_path = installer._download_file(url).download_path
+
+        # THEN
+        with open(download_path, "rb") as f:
+            self.assertEqual(archive, f.read())
+        # Only the first chunk (which is always requested, to check for Range support) and the failed chunk
+        self.assertEqual(["bytes=0-1023", "bytes=2048-3071"], fake_cdn.requests)
+
+    def test_download_file_without_ranges(self):
+        # GIVEN
+        archive = os.urandom(10 * 1024)
+        fake_cdn, url = self.given_fake_cdn(archive, ranges=False)
+
+        # WHEN
+        download_path = installer._download_file(url).download_path
+
+        # THEN
+        with open(download_path, "rb") as f:
+            self.assertEqual(archive, f.read())
+        self.assertEqual(1, len(fake_cdn.requests))
+
+    def test_install_ngrok_from_cache(self):
+        # GIVEN
+        binary = b"#!/bin/sh\necho ngrok\n"
+        fake_cdn, url = self.given_fake_cdn(self.given_ngrok_archive(binary))
+        ngrok_path_1 = os.path.join(self.config_dir, "agent-1", "ngrok")
+        ngrok_path_2 = os.path.join(self.config_dir, "agent-2", "ngrok")
+
+        # WHEN
+        with mock.patch("pyngrok.installer.get_ngrok_cdn_url", return_value=url):
+            installer.install_ngrok(ngrok_path_1)
+            installer.install_ngrok(ngrok_path_2, overwrite=False)
+
+        # THEN
+        self.assertEqual(1, len(fake_cdn.requests))
+        for ngrok_path in [ngrok_path_1, ngrok_path_2]:
+            with open(ngrok_path, "rb") as f:
+                self.assertEqual(binary, f.read())
+        self.assertFalse(os.path.exists(installer._download_path(url)))
+        cache_dir = installer.get_cache_dir()
+        self.assertEqual(os.path.join(self.config_dir, "cache"), cache_dir)
+        self.assertEqual({url}, set(installer._read_cache_index(cache_dir).keys()))
+
+    def test_install_ngrok_overwrite_skips_stale_cache(self):
+        # GIVEN
+        old_binary = b"#!/bin/sh\necho old ngrok\n"
+        new_binary = b"#!/bin/sh\necho new ngrok\n"
+        fake_cdn, url = self.given_fake_cdn(self.given_ngrok_archive(old_binary))
+        ngrok_path = os.path.join(self.config_dir, "agent", "ngrok")
+        with mock.patch("pyngrok.installer.get_ngrok_cdn_url", return_value=url):
+            installer.install_ngrok(ngrok_path)
+        # The archive at the URL is replaced by a new release
+        fake_cdn.server.files[f"/{url.split('/')[-1]}"] = self.given_ngrok_archive(new_binary)
+
+        # WHEN
+        with mock.patch("pyngrok.installer.get_ngrok_cdn_url", return_value=url):
+            installer.install_ngrok(ngrok_path)
+
+        # THEN
+        self.assertEqual(2, len(fake_cdn.requests))
+        with open(ngrok_path, "rb") as f:
+            self.assertEqual(new_binary, f.read())
+
+    def test_cache_evicts_least_recently_used(self):
+        # GIVEN
+        for i, url in enumerate(["https://cdn/ngrok-1.tgz", "https://cdn/ngrok-2.tgz"]):
+            ngrok_path = os.path.join(self.config_dir, f"agent-{i}", "ngrok")
+            os.makedirs(os.path.dirname(ngrok_path))
+            with open(ngrok_path, "wb") as f:
+                f.write(os.urandom(1024))
+
+            # WHEN
+            with mock.patch("pyngrok.installer.DEFAULT_CACHE_MAX_SIZE", 1536):
+                installer._add_to_cache(url, ngrok_path)
+
+        # THEN
+        cache_dir = installer.get_cache_dir()
+        self.assertEqual(["https://cdn/ngrok-2.tgz"], list(installer._read_cache_index(cache_dir).keys()))
+        self.assertEqual(1, len(os.listdir(os.path.join(cache_dir, "blobs"))))
+        self.assertFalse(installer._install_from_cache("https://cdn/ngrok-1.tgz",
+                                                       os.path.join(self.config_dir, "agent-3", "ngrok")))
+
+    def test_install_ngrok_streamed(self):
+        # GIVEN
+        binary = b"#!/bin/sh\necho ngrok\n"
+        fake_cdn, url = self.given_fake_cdn(self.given_ngrok_archive(binary, {"LICENSE": b"MIT"}), ranges=False)
+        ngrok_path = os.path.join(self.config_dir, "agent", "ngrok")
+        os.makedirs(os.path.dirname(ngrok_path))
+        with open(ngrok_path, "wb") as f:
+            f.write(b"old ngrok")
+
+        # WHEN
+        with mock.patch("pyngrok.installer.get_ngrok_cdn_url", return_value=url):
+            installer.install_ngrok(ngrok_path)
+
+        # THEN
+        with open(ngrok_path, "rb") as f:
+            self.assertEqual(binary, f.read())
+        self.assertTrue(os.access(ngrok_path, os.X_OK))
+        self.assertEqual(["ngrok", "ngrok.lock"], sorted(os.listdir(os.path.dirname(ngrok_path))))
+        download_path = installer._download_path(url)
+        self.assertFalse(os.path.exists(download_path))
+        self.assertFalse(os.path.exists(f"{download_path}.part"))
+
+    def test_install_ngrok_concurrent_processes(self):
+        # GIVEN
+        binary = b"#!/bin/sh\necho ngrok\n"
+        fake_cdn, url = self.given_fake_cdn(self.given_ngrok_archive(binary), delay=0.2)
+        shared_ngrok_path = os.path.join(self.config_dir, "shared", "ngrok")
+        ngrok_paths = [shared_ngrok_path] * 8
+        ngrok_paths += [os.path.join(self.config_dir, f"agent-{i}", "ngrok") for i in range(8)]
+        config_path = os.path.join(self.config_dir, "concurrent", "ngrok.yml")
+
+        # WHEN
+        with multiprocessing.get_context("spawn").Pool(len(ngrok_paths)) as pool:
+            pool.starmap(install_ngrok_in_process,
+                         [(url, ngrok_path, config_path, installer.get_cache_dir()) for ngrok_path in ngrok_paths])
+
+        # THEN
+        self.assertEqual(1, len(fake_cdn.requests))
+        for ngrok_path in set(ngrok_paths):
+            with open(ngrok_path, "rb") as f:
+                self.assertEqual(binary, f.read())
+        with open(config_path, "r") as f:
+            self.assertEqual("2", yaml.safe_load(f)["version"])
+
+    def test_install_ngrok_archive_without_binary(self):
+        # GIVEN
+        archive_path = os.path.join(self.config_dir, "ngrok.tgz")
+        with open(archive_path, "wb") as f:
+            f.write(self.given_ngrok_archive(None, {"LICENSE": b"MIT"}))
+        ngrok_path = os.path.join(self.config_dir, "agent", "ngrok")
+        os.makedirs(os.path.dirname(ngrok_path))
+
+        # WHEN
+        with self.assertRaises(PyngrokNgrokInstallError):
+            installer._install_ngrok_archive(ngrok_path, archive_path)
+
+        # THEN
+        self.assertEqual([], os.listdir(os.path.dirname(ngrok_path)))
+
+    @mock.patch("pyngrok.installer.DEFAULT_DOWNLOAD_CHUNK_SIZE", 1024)
+    def test_download_file_verifies_checksum(self):
+        # GIVEN
+        archive = os.urandom(10 * 1024 + 5)
+        sha256 = hashlib.sha256(archive).hexdigest()
+        fake_cdn, url = self.given_fake_cdn(archive)
+
+        # WHEN
+        download = installer._download_file(url, sha256=sha256.upper())
+
+        # THEN
+        self.assertEqual(sha256, download.sha256)
+        self.assertTrue(download.verified)
+        with open(download.download_path, "rb") as f:
+            self.assertEqual(archive, f.read())
+
+    def test_download_verify_without_length_or_checksum(self):
+        # GIVEN
+        url = "https://bin.ngrok.com/ngrok.tgz"
+        archive = os.urandom(1024)
+        unverifiable = installer._Download(url, installer._download_path(url), {})
+        unverifiable._update_hash(archive)
+        verifiable = installer._Download(url, installer._download_path(url), {},
+                                         expected_sha256=hashlib.sha256(archive).hexdigest())
+        verifiable._update_hash(archive)
+
+        # WHEN
+        with self.assertLogs(installer.logger, "WARNING") as cm:
+            unverifiable.verify()
+        verifiable.verify()
+
+        # THEN
+        self.assertIn("could not be verified", cm.output[0])
+        self.assertFalse(unverifiable.verified)
+        self.assertTrue(verifiable.verified)
+
+    @mock.patch("pyngrok.installer.DEFAULT_DOWNLOAD_CHUNK_SIZE", 1024)
+    def test_download_file_checksum_mismatch(self):
+        # GIVEN
+        archive = os.urandom(4 * 1024)
+        fake_cdn, url = self.given_fake_cdn(archive)
+
+        # WHEN
+        with self.assertRaises(PyngrokNgrokChecksumError):
+            installer._download_file(url, sha256=hashlib.sha256(b"some other archive").hexdigest())
+
+        # THEN
+        self.assertEqual(2 * 4, len(fake_cdn.requests))
+        download_path = installer._download_path(url)
+        self.assertFalse(os.path.exists(download_path))
+        self.assertFalse(os.path.exists(f"{download_path}.part"))
+        self.assertFalse(os.path.exists(f"{download_path}.part.json"))
+
+    def test_install_ngrok_streamed_checksum_mismatch(self):
+        # GIVEN
+        fake_cdn, url = self.given_fake_cdn(self.given_ngrok_archive(b"#!/bin/sh\necho ngrok\n"), ranges=False)
+        ngrok_path = os.path.join(self.config_dir, "agent", "ngrok")
+        os.makedirs(os.path.dirname(ngrok_path))
+        with open(ngrok_path, "wb") as f:
+            f.write(b"old ngrok")
+
+        # WHEN
+        with mock.patch("pyngrok.installer.get_ngrok_cdn_url", return_value=url):
+            with mock.patch.dict(installer.PLATFORM_CHECKSUMS, {url: "0" * 64}):
+                with self.assertRaises(PyngrokNgrokChecksumError):
+                    installer.install_ngrok(ngrok_path)
+
+        # THEN
+        self.assertEqual(2, len(fake_cdn.requests))
+        with open(ngrok_path, "rb") as f:
+            self.assertEqual(b"old ngrok", f.read())
+        self.assertEqual(["ngrok", "ngrok.lock"], sorted(os.listdir(os.path.dirname(ngrok_path))))
+
+    def test_install_ngrok_from_cache_verified_checksum(self):
+        # GIVEN
+        binary = b"#!/bin/sh\necho ngrok\n"
+        archive = self.given_ngrok_archive(binary)
+        sha256 = hashlib.sha256(archive).hexdigest()
+        fake_cdn, url = self.given_fake_cdn(archive)
+        ngrok_path_1 = os.path.join(self.config_dir, "agent-1", "ngrok")
+        ngrok_path_2 = os.path.join(self.config_dir, "agent-2", "ngrok")
+        ngrok_path_3 = os.path.join(self.config_dir, "agent-3", "ngrok")
+
+        # WHEN
+        with mock.patch("pyngrok.installer.get_ngrok_cdn_url", return_value=url):
+            installer.install_ngrok(ngrok_path_1, sha256=sha256)
+            installer.install_ngrok(ngrok_path_2, overwrite=False, sha256=sha256)
+
+        # THEN
+        self.assertEqual(1, len(fake_cdn.requests))
+        entry = installer._read_cache_index(installer.get_cache_dir())[url]
+        self.assertEqual(sha256, entry["archive_sha256"])
+
+        # WHEN
+        with mock.patch("pyngrok.installer.get_ngrok_cdn_url", return_value=url):
+            with self.assertRaises(PyngrokNgrokChecksumError):
+                installer.install_ngrok(ngrok_path_3, sha256="0" * 64)
+
+        # THEN
+        self.assertFalse(os.path.exists(ngrok_path_3))
+
+    @staticmethod
+    def given_ngrok_archive(binary, other_files=None):
+        files = dict(other_files or {})
+        if binary is not None:
+            files["ngrok"] = binary
+
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w:gz") as tar:
+            for name, data in files.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+        return archive.getvalue()
+
+    def given_fake_cdn(self, archive, ranges=True, delay=0):
+        filename = f"ngrok-{uuid.uuid4()}.tgz"
+        fake_cdn = FakeCdn({f"/{filename}": archive}, ranges=ranges, delay=delay).start()
+        self.addCleanup(fake_cdn.stop)
+
+        return fake_cdn, f"{fake_cdn.url}/{filename}"
+
     def test_web_addr_false_not_allowed(self):
         # WHEN
         with self.assertRaises(PyngrokError):
@@ -342,3 +716,10 @@ class TestInstaller(NgrokTestCase):
                     self.fail("Installer URL returned 404: %s" % value)
                 else:
                     raise e
+
+
+def install_ngrok_in_process(url, ngrok_path, config_path, cache_dir):
+    os.environ["PYNGROK_CACHE_DIR"] = cache_dir
+
+    with mock.patch("pyngrok.installer.get_ngrok_cdn_url", return_value=url):
+        ngrok.install_ngrok(PyngrokConfig(ngrok_path=ngrok_path, config_path=config_path))
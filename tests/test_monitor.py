@@ -0,0 +1,216 @@
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from pyngrok import monitor, process
+from pyngrok.exception import PyngrokError
+from pyngrok.log import NgrokLog
+from pyngrok.monitor import PipeLineReader
+from tests.testcase import NgrokTestCase
+
+
+class TestMonitor(NgrokTestCase):
+    def test_readline_splits_chunks(self):
+        # GIVEN
+        read_fd, write_fd = os.pipe()
+        reader = PipeLineReader(os.fdopen(read_fd, "rb"), chunk_size=8)
+        self.addCleanup(reader.close)
+
+        # WHEN
+        os.write(write_fd, "lvl=info msg=one\nlvl=info msg=two\r\nlvl=info msg=café".encode("utf-8"))
+        os.close(write_fd)
+        lines = []
+        while not reader.eof:
+            line = reader.readline(timeout=1)
+            if line is not None:
+                lines.append(line)
+
+        # THEN
+        self.assertEqual(["lvl=info msg=one", "lvl=info msg=two", "lvl=info msg=café"], lines)
+        self.assertIsNone(reader.readline(timeout=0))
+
+    @unittest.skipIf(os.name != "posix", "Waking the reader requires POSIX")
+    def test_readline_timeout_and_wake(self):
+        # GIVEN
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, write_fd)
+        reader = PipeLineReader(os.fdopen(read_fd, "rb"))
+        self.addCleanup(reader.close)
+
+        # WHEN
+        line = reader.readline(timeout=0.05)
+
+        # THEN
+        self.assertIsNone(line)
+        self.assertFalse(reader.eof)
+
+        # WHEN
+        threading.Timer(0.1, reader.wake).start()
+        start = time.monotonic()
+        line = reader.readline()
+
+        # THEN
+        self.assertIsNone(line)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertFalse(reader.eof)
+
+    @unittest.skipIf(os.name != "posix", "Reading a duplicate of the pipe requires POSIX")
+    def test_reader_leaves_stream_unchanged(self):
+        # GIVEN
+        read_fd, write_fd = os.pipe()
+        stream = os.fdopen(read_fd, "r")
+        self.addCleanup(stream.close)
+        reader = PipeLineReader(stream)
+        self.addCleanup(reader.close)
+
+        # WHEN
+        os.write(write_fd, b"lvl=info msg=one\nlvl=info msg=two\n")
+        os.close(write_fd)
+        lines = [reader.readline(timeout=1), reader.readline(timeout=1)]
+        reader.close()
+
+        # THEN
+        self.assertEqual(["lvl=info msg=one", "lvl=info msg=two"], lines)
+        self.assertNotEqual(read_fd, reader.fileno())
+        self.assertTrue(os.get_blocking(stream.fileno()))
+        self.assertEqual("", stream.read())
+
+    @unittest.skipIf(os.name != "posix", "The shared reactor requires POSIX")
+    def test_shared_reactor_monitors_many_processes(self):
+        # GIVEN
+        callback_logs = {}
+        callback_threads = set()
+
+        def log_event_callback(log):
+            callback_threads.add(threading.current_thread().name)
+            callback_logs.setdefault(log.obj, []).append(int(log.msg))
+
+        pyngrok_config = self.copy_with_updates(self.pyngrok_config, shared_monitor=True,
+                                                log_event_callback=log_event_callback)
+        ngrok_processes = []
+        write_fds = []
+        for i in range(5):
+            stdout, write_fd = self.given_process_output([], close=False)
+            ngrok_process = process.NgrokProcess(mock.Mock(stdout=stdout), pyngrok_config)
+            self.addCleanup(ngrok_process.stop_monitor_thread)
+            ngrok_processes.append(ngrok_process)
+            write_fds.append(write_fd)
+        threads_before = threading.active_count()
+
+        # WHEN
+        for ngrok_process in ngrok_processes:
+            ngrok_process.start_monitor_thread()
+        for j in range(100):
+            for i, write_fd in enumerate(write_fds):
+                os.write(write_fd, f"lvl=info obj=process-{i} msg={j}\n".encode("utf-8"))
+        self.wait_for(lambda: sum(len(logs) for logs in callback_logs.values()) == 500)
+
+        # THEN
+        self.assertEqual(1, len([t for t in threading.enumerate() if t.name == "pyngrok-reactor"]))
+        self.assertLessEqual(threading.active_count() - threads_before, 1 + monitor.DEFAULT_CALLBACK_WORKERS)
+        self.assertTrue(all(name.startswith("pyngrok-callback") for name in callback_threads))
+        for i, ngrok_process in enumerate(ngrok_processes):
+            self.assertIsNone(ngrok_process._monitor_thread)
+            self.assertEqual(list(range(100)), callback_logs[f"process-{i}"])
+            self.assertEqual(100, ngrok_process.monitor_stats.lines_read)
+            self.assertEqual(100, ngrok_process.monitor_stats.callbacks_invoked)
+            self.assertGreaterEqual(ngrok_process.monitor_stats.max_callback_lag, 0)
+
+        # WHEN
+        for ngrok_process in ngrok_processes:
+            ngrok_process.stop_monitor_thread()
+        self.wait_for(lambda: not any(t.name == "pyngrok-reactor" for t in threading.enumerate()))
+
+        # THEN
+        self.assertIsNone(monitor.get_reactor()._thread)
+
+    def test_log_dispatcher_batches_off_thread(self):
+        # GIVEN
+        batches = []
+        callback_threads = set()
+        release = threading.Event()
+
+        def log_batch_callback(logs):
+            callback_threads.add(threading.current_thread().name)
+            release.wait(5)
+            batches.append([log.msg for log in logs])
+
+        pyngrok_config = self.copy_with_updates(self.pyngrok_config, log_batch_callback=log_batch_callback,
+                                                log_queue_size=10, log_batch_size=4)
+        ngrok_process = process.NgrokProcess(mock.Mock(), pyngrok_config)
+
+        # WHEN
+        for i in range(30):
+            ngrok_process._log_line(f"lvl=info msg={i}")
+        release.set()
+        delivered = ngrok_process._dispatcher.close(timeout=5)
+
+        # THEN
+        self.assertTrue(delivered)
+        self.assertEqual({"pyngrok-log-dispatcher"}, callback_threads)
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        msgs = [msg for batch in batches for msg in batch]
+        self.assertEqual([str(i) for i in range(20, 30)], msgs[-10:])
+        self.assertEqual(30, ngrok_process.monitor_stats.lines_read)
+        self.assertEqual(len(msgs), ngrok_process.monitor_stats.logs_delivered)
+        self.assertEqual(30, ngrok_process.monitor_stats.logs_delivered + ngrok_process.monitor_stats.logs_dropped)
+        self.assertGreater(ngrok_process.monitor_stats.logs_dropped, 0)
+
+    def test_log_dispatcher_overflow_policies(self):
+        # GIVEN
+        delivered = []
+        release = threading.Event()
+
+        def log_event_callback(log):
+            release.wait(5)
+            delivered.append(log.msg)
+
+        dispatcher = monitor.LogDispatcher(log_event_callback=log_event_callback, max_size=2,
+                                           overflow=monitor.OVERFLOW_DROP_NEWEST)
+        self.addCleanup(release.set)
+        # Hold the delivery thread in the callback, so the queue fills
+        dispatcher.put(NgrokLog("msg=0"))
+        self.wait_for(lambda: not dispatcher._queue)
+
+        # WHEN
+        results = [dispatcher.put(NgrokLog(f"msg={i}")) for i in range(1, 4)]
+
+        # THEN
+        self.assertEqual([True, True, False], results)
+        self.assertEqual(1, dispatcher.stats.logs_dropped)
+
+        # WHEN
+        dispatcher.overflow = monitor.OVERFLOW_BLOCK
+        blocked = threading.Thread(target=dispatcher.put, args=(NgrokLog("msg=4"),), daemon=True)
+        blocked.start()
+        blocked.join(0.1)
+
+        # THEN
+        self.assertTrue(blocked.is_alive())
+
+        # WHEN
+        release.set()
+        blocked.join(5)
+        closed = dispatcher.close(timeout=5)
+
+        # THEN
+        self.assertTrue(closed)
+        self.assertFalse(blocked.is_alive())
+        self.assertEqual(["0", "1", "2", "4"], delivered)
+        self.assertEqual(4, dispatcher.stats.logs_delivered)
+        self.assertFalse(dispatcher.put(NgrokLog("msg=5")))
+
+        # WHEN
+        with self.assertRaises(PyngrokError):
+            monitor.LogDispatcher(overflow="unknown")
+
+    @staticmethod
+    def wait_for(condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
@@ -6,6 +6,7 @@ import time
 import traceback
 import unittest
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 from unittest import mock
 from urllib.parse import urlparse
@@ -18,7 +19,7 @@ from pyngrok.conf import PyngrokConfig
 from pyngrok.exception import PyngrokError, PyngrokNgrokError, PyngrokNgrokHTTPError, PyngrokNgrokURLError, \
     PyngrokSecurityError
 from scripts.create_test_resources import create_test_resources, generate_name_for_subdomain
-from tests.testcase import NgrokTestCase
+from tests.testcase import FakeNgrokApi, NgrokTestCase
 
 
 class TestNgrok(NgrokTestCase):
@@ -77,14 +78,14 @@ class TestNgrok(NgrokTestCase):
     def test_connect(self):
         # GIVEN
         self.assertEqual(len(process._current_processes.keys()), 0)
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 0)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 0)
 
         # WHEN
         ngrok_tunnel = ngrok.connect("5000", pyngrok_config=self.pyngrok_config)
         current_process = ngrok.get_ngrok_process(self.pyngrok_config)
 
         # THEN
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 1)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 1)
         self.assertIsNotNone(current_process)
         self.assertIsNone(current_process.proc.poll())
         self.assertTrue(current_process._monitor_thread.is_alive())
@@ -109,7 +110,7 @@ class TestNgrok(NgrokTestCase):
     def test_connect_tls(self):
         # GIVEN
         self.assertEqual(len(process._current_processes.keys()), 0)
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 0)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 0)
 
         # WHEN
         ngrok_tunnel = ngrok.connect("443", proto="tls", domain=self.reserved_domain,
@@ -118,7 +119,7 @@ class TestNgrok(NgrokTestCase):
         current_process = ngrok.get_ngrok_process(self.pyngrok_config)
 
         # THEN
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 1)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 1)
         self.assertIsNotNone(current_process)
         self.assertIsNone(current_process.proc.poll())
         self.assertTrue(current_process._monitor_thread.is_alive())
@@ -153,13 +154,13 @@ class TestNgrok(NgrokTestCase):
         # GIVEN
         url = ngrok.connect(pyngrok_config=self.pyngrok_config).public_url
         time.sleep(1)
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 1)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 1)
 
         # WHEN
         tunnels = ngrok.get_tunnels(self.pyngrok_config)
 
         # THEN
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 1)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 1)
         self.assertEqual(len(tunnels), 1)
         self.assertEqual(tunnels[0].proto, "https")
         self.assertEqual(tunnels[0].public_url, url)
@@ -219,17 +220,17 @@ class TestNgrok(NgrokTestCase):
         url = ngrok.connect(pyngrok_config=self.pyngrok_config).public_url
         time.sleep(1)
         tunnels = ngrok.get_tunnels(self.pyngrok_config)
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 1)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 1)
         self.assertEqual(len(tunnels), 1)
 
         # WHEN
         ngrok.disconnect(url, self.pyngrok_config)
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 0)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 0)
         time.sleep(1)
         tunnels = ngrok.get_tunnels(self.pyngrok_config)
 
         # THEN
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 0)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 0)
         self.assertEqual(len(tunnels), 0)
 
     @unittest.skipIf(not os.environ.get("NGROK_AUTHTOKEN"), "NGROK_AUTHTOKEN environment variable not set")
@@ -239,14 +240,14 @@ class TestNgrok(NgrokTestCase):
         time.sleep(1)
         ngrok_process = process.get_process(self.pyngrok_config)
         monitor_thread = ngrok_process._monitor_thread
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 1)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 1)
 
         # WHEN
         ngrok.kill(self.pyngrok_config)
         time.sleep(1)
 
         # THEN
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 0)
+        self.assertEqual(len(ngrok._tunnel_registry(self.pyngrok_config).keys()), 0)
         self.assertIsNotNone(ngrok_process.proc.poll())
         self.assertFalse(monitor_thread.is_alive())
         self.assertEqual(len(process._current_processes.keys()), 0)
@@ -785,14 +786,14 @@ class TestNgrok(NgrokTestCase):
         # GIVEN
         pyngrok_config = self.copy_with_updates(self.pyngrok_config, config_version="3")
         self.assertEqual(len(process._current_processes.keys()), 0)
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 0)
+        self.assertEqual(len(ngrok._tunnel_registry(pyngrok_config).keys()), 0)
 
         # WHEN
         ngrok_tunnel = ngrok.connect("5000", pyngrok_config=pyngrok_config)
         current_process = ngrok.get_ngrok_process(pyngrok_config)
 
         # THEN
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 1)
+        self.assertEqual(len(ngrok._tunnel_registry(pyngrok_config).keys()), 1)
         self.assertIsNotNone(current_process)
         self.assertIsNone(current_process.proc.poll())
         self.assertIsNotNone(ngrok_tunnel.public_url)
@@ -819,7 +820,7 @@ class TestNgrok(NgrokTestCase):
         pyngrok_config = self.copy_with_updates(self.pyngrok_config, config_version="3")
         url = ngrok.connect(pyngrok_config=pyngrok_config).public_url
         time.sleep(1)
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 1)
+        self.assertEqual(len(ngrok._tunnel_registry(pyngrok_config).keys()), 1)
 
         # WHEN
         tunnels = ngrok.get_tunnels(pyngrok_config)
@@ -836,7 +837,7 @@ class TestNgrok(NgrokTestCase):
         url = ngrok.connect(pyngrok_config=pyngrok_config).public_url
         time.sleep(1)
         tunnels = ngrok.get_tunnels(pyngrok_config)
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 1)
+        self.assertEqual(len(ngrok._tunnel_registry(pyngrok_config).keys()), 1)
         self.assertEqual(len(tunnels), 1)
 
         # WHEN
@@ -845,7 +846,7 @@ class TestNgrok(NgrokTestCase):
         tunnels = ngrok.get_tunnels(pyngrok_config)
 
         # THEN
-        self.assertEqual(len(ngrok._current_tunnels.keys()), 0)
+        self.assertEqual(len(ngrok._tunnel_registry(pyngrok_config).keys()), 0)
         self.assertEqual(len(tunnels), 0)
 
     @unittest.skipIf(not os.environ.get("NGROK_AUTHTOKEN"), "NGROK_AUTHTOKEN environment variable not set")
@@ -918,6 +919,52 @@ class TestNgrok(NgrokTestCase):
     # are asserting on pyngrok-specific code or edge cases.
     ################################################################################
 
+    def test_interpolate_v3_definitions_from_index(self):
+        # GIVEN
+        config = {
+            "endpoints": [{"name": f"endpoint-{i}", "upstream": {"url": f"http://localhost:{i}"}}
+                          for i in range(5000)],
+            "tunnels": {
+                "endpoint-1": {"addr": "9000", "proto": "http"},
+                "my-tunnel": {"addr": "9001", "proto": "tcp"}
+            }
+        }
+        config_path = os.path.join(self.config_dir, "config_v3.yml")
+        installer.install_default_config(config_path, config, ngrok_version="3", config_version="3")
+        pyngrok_config = self.copy_with_updates(self.pyngrok_config,
+                                                config_path=config_path,
+                                                config_version="3")
+        endpoint_options = {}
+        tunnel_options = {}
+
+        # WHEN
+        with mock.patch("builtins.open", side_effect=AssertionError("The config should not be read again")):
+            ngrok._interpolate_tunnel_definition(pyngrok_config, endpoint_options, name="endpoint-1")
+            ngrok._interpolate_tunnel_definition(pyngrok_config, tunnel_options, name="my-tunnel")
+
+        # THEN
+        self.assertEqual({"name": "endpoint-1-api", "upstream": {"url": "http://localhost:1"}}, endpoint_options)
+        self.assertEqual({"name": "my-tunnel-api", "upstream": {"url": "tcp://localhost:9001"}}, tunnel_options)
+        self.assertNotIn("name", installer._config_cache[config_path].endpoint_definitions["endpoint-1"].options)
+
+    def test_interpolate_skips_empty_definitions(self):
+        # GIVEN
+        config_path = os.path.join(self.config_dir, "config_empty_definitions.yml")
+        with open(config_path, "w") as config_file:
+            config_file.write("version: 2\ntunnels:\n  none-tunnel:\n  empty-tunnel: {}\n")
+        pyngrok_config = self.copy_with_updates(self.pyngrok_config, config_path=config_path)
+        none_options = {}
+        empty_options = {}
+
+        # WHEN
+        ngrok._interpolate_tunnel_definition(pyngrok_config, none_options, name="none-tunnel")
+        ngrok._interpolate_tunnel_definition(pyngrok_config, empty_options, name="empty-tunnel")
+
+        # THEN
+        self.assertEqual("none-tunnel", none_options["name"])
+        self.assertEqual("empty-tunnel", empty_options["name"])
+        self.assertEqual({}, installer._config_cache[config_path].tunnel_definitions)
+
     def test_web_addr_false_not_allowed(self):
         # GIVEN
         with open(self.pyngrok_config.config_path, "w") as config_file:
@@ -1240,3 +1287,239 @@ class TestNgrok(NgrokTestCase):
 
         # THEN
         self.assertEqual(tunnel.uri, "/api/endpoints/my-tunnel")
+
+    @mock.patch("pyngrok.process.is_process_running")
+    @mock.patch("pyngrok.ngrok.get_ngrok_process")
+    def test_connect_many_disconnect_many(self, mock_get_ngrok_process, mock_is_process_running):
+        # GIVEN
+        fake_api = FakeNgrokApi().start()
+        self.addCleanup(fake_api.stop)
+        mock_get_ngrok_process.return_value = mock.Mock(api_url=fake_api.api_url)
+        mock_is_process_running.return_value = True
+        fake_api.tunnels["existing-tunnel"] = {"name": "existing-tunnel", "public_url": "https://existing.ngrok.dev"}
+        specs = [{"addr": str(8000 + i), "name": f"tunnel-{i}"} for i in range(50)]
+        specs.append({"addr": "9000", "name": "existing-tunnel"})
+
+        # WHEN
+        with mock.patch("pyngrok.ngrok._load_ngrok_config", wraps=ngrok._load_ngrok_config) as mock_load_config:
+            results = ngrok.connect_many(specs, pyngrok_config=self.pyngrok_config, max_workers=10)
+
+        # THEN
+        self.assertEqual(1, mock_load_config.call_count)
+        self.assertEqual(51, len(results))
+        self.assertEqual([f"tunnel-{i}" for i in range(50)], [t.name for t in results[:50]])
+        self.assertIsInstance(results[50], PyngrokNgrokHTTPError)
+        self.assertEqual(51, len(fake_api.tunnels))
+
+        # WHEN
+        errors = ngrok.disconnect_many([t.public_url for t in results[:50]] + ["https://unknown.ngrok.dev"],
+                                       pyngrok_config=self.pyngrok_config)
+
+        # THEN
+        self.assertEqual([None] * 51, errors)
+        self.assertEqual(["existing-tunnel"], list(fake_api.tunnels.keys()))
+        self.assertEqual(["https://existing.ngrok.dev"], list(ngrok._tunnel_registry(self.pyngrok_config).keys()))
+
+    @mock.patch("pyngrok.ngrok.get_ngrok_process")
+    def test_connect_many_reports_unexpected_errors(self, mock_get_ngrok_process):
+        # GIVEN
+        fake_api = FakeNgrokApi().start()
+        self.addCleanup(fake_api.stop)
+        mock_get_ngrok_process.return_value = mock.Mock(api_url=fake_api.api_url)
+        specs = [{"addr": "8000", "name": "tunnel-0"}, {"addr": "8001", "name": "tunnel-1"}]
+        api_request = ngrok.api_request
+
+        def flaky_api_request(url, *args, **kwargs):
+            if kwargs.get("data", {}).get("name") == "tunnel-1":
+                raise ValueError("Invalid JSON in response")
+            return api_request(url, *args, **kwargs)
+
+        # WHEN
+        with mock.patch("pyngrok.ngrok.api_request", side_effect=flaky_api_request):
+            results = ngrok.connect_many(specs, pyngrok_config=self.pyngrok_config)
+
+        # THEN
+        self.assertEqual("tunnel-0", results[0].name)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(["tunnel-0"], list(fake_api.tunnels.keys()))
+
+    @mock.patch("pyngrok.process.is_process_running")
+    def test_disconnect_many_no_process(self, mock_is_process_running):
+        # GIVEN
+        mock_is_process_running.return_value = False
+
+        # WHEN
+        errors = ngrok.disconnect_many(["https://a.ngrok.dev"], pyngrok_config=self.pyngrok_config)
+
+        # THEN
+        self.assertEqual([None], errors)
+
+    @mock.patch('pyngrok.ngrok.api_request')
+    @mock.patch('pyngrok.ngrok.get_ngrok_process')
+    def test_refresh_tunnels_applies_diff(self, mock_get_ngrok_process, mock_api_request):
+        # GIVEN
+        mock_get_ngrok_process.return_value = mock.Mock(api_url="http://127.0.0.1:4040")
+
+        def tunnel(name, addr="http://localhost:8000", requests=0):
+            return {"name": name, "uri": f"/api/tunnels/{name}", "public_url": f"https://{name}.ngrok.dev",
+                    "proto": "https", "config": {"addr": addr}, "metrics": {"http": {"count": requests}}}
+
+        mock_api_request.return_value = {"tunnels": [tunnel("a"), tunnel("b"), tunnel("c")]}
+        tunnels = ngrok.get_tunnels(self.pyngrok_config)
+        mock_api_request.return_value = {"tunnels": [tunnel("a", requests=5),
+                                                     tunnel("b", addr="http://localhost:9000"),
+                                                     tunnel("d")]}
+
+        # WHEN
+        diff = ngrok.refresh_tunnels(self.pyngrok_config)
+
+        # THEN
+        self.assertEqual({"https://d.ngrok.dev"}, diff.added)
+        self.assertEqual({"https://c.ngrok.dev"}, diff.removed)
+        self.assertEqual({"https://b.ngrok.dev"}, diff.changed)
+        self.assertIs(tunnels[0], ngrok._tunnel_registry(self.pyngrok_config)["https://a.ngrok.dev"])
+        self.assertEqual({"http": {"count": 5}}, tunnels[0].metrics)
+        self.assertIs(tunnels[1], ngrok._tunnel_registry(self.pyngrok_config)["https://b.ngrok.dev"])
+        self.assertEqual("http://localhost:9000", tunnels[1].config["addr"])
+        self.assertEqual(["https://a.ngrok.dev", "https://b.ngrok.dev", "https://d.ngrok.dev"],
+                         [t.public_url for t in ngrok.get_tunnels(self.pyngrok_config)])
+
+        # WHEN
+        diff = ngrok.refresh_tunnels(self.pyngrok_config)
+
+        # THEN
+        self.assertFalse(diff)
+
+    def test_tunnel_registry_indexes(self):
+        # GIVEN
+        registry = ngrok.TunnelRegistry()
+        a = ngrok.NgrokTunnel({"ID": "id-a", "name": "a", "public_url": "https://a.ngrok.dev",
+                               "config": {"addr": "http://localhost:8000"}}, self.pyngrok_config, None)
+        b = ngrok.NgrokTunnel({"ID": "id-b", "name": "b", "public_url": "https://b.ngrok.dev",
+                               "upstream": {"url": "http://localhost:8000"}}, self.pyngrok_config, None)
+
+        # WHEN
+        registry.add(a)
+        registry.add(b)
+
+        # THEN
+        self.assertEqual(2, len(registry))
+        self.assertIs(a, registry.find(name="a"))
+        self.assertIs(b, registry.find(id="id-b"))
+        self.assertIs(a, registry.find(upstream="http://localhost:8000"))
+        self.assertIs(b, registry.find(upstream="http://localhost:8000", name="b"))
+        self.assertIsNone(registry.find(name="a", id="id-b"))
+        self.assertIsNone(registry.find(public_url="https://a.ngrok.dev", upstream="http://localhost:9000"))
+
+        # WHEN
+        a._update({"ID": "id-a", "name": "renamed", "public_url": "https://a.ngrok.dev",
+                   "config": {"addr": "http://localhost:9000"}}, self.pyngrok_config, None)
+        registry.add(a)
+        registry.pop("https://b.ngrok.dev")
+
+        # THEN
+        self.assertIsNone(registry.find(name="a"))
+        self.assertIs(a, registry.find(name="renamed", upstream="http://localhost:9000"))
+        self.assertIsNone(registry.find(upstream="http://localhost:8000"))
+        self.assertIsNone(registry.find(id="id-b"))
+        self.assertEqual(["https://a.ngrok.dev"], list(registry))
+
+    @mock.patch("pyngrok.process.is_process_running")
+    @mock.patch('pyngrok.ngrok.api_request')
+    @mock.patch('pyngrok.ngrok.get_ngrok_process')
+    def test_get_tunnel(self, mock_get_ngrok_process, mock_api_request, mock_is_process_running):
+        # GIVEN
+        mock_get_ngrok_process.return_value = mock.Mock(api_url="http://127.0.0.1:4040")
+        mock_is_process_running.return_value = True
+        mock_api_request.return_value = {"tunnels": [{"ID": "id-a", "name": "a", "public_url": "https://a.ngrok.dev",
+                                                      "config": {"addr": "http://localhost:8000"}}]}
+
+        # WHEN
+        tunnel = ngrok.get_tunnel(name="a", pyngrok_config=self.pyngrok_config)
+
+        # THEN
+        self.assertEqual("https://a.ngrok.dev", tunnel.public_url)
+        self.assertEqual(1, mock_api_request.call_count)
+
+        # WHEN
+        by_id = ngrok.get_tunnel(id="id-a", pyngrok_config=self.pyngrok_config)
+        by_upstream = ngrok.get_tunnel(upstream="http://localhost:8000", pyngrok_config=self.pyngrok_config)
+
+        # THEN
+        self.assertIs(tunnel, by_id)
+        self.assertIs(tunnel, by_upstream)
+        self.assertEqual(1, mock_api_request.call_count)
+
+        # WHEN
+        missing = ngrok.get_tunnel(name="b", pyngrok_config=self.pyngrok_config)
+
+        # THEN
+        self.assertIsNone(missing)
+        self.assertEqual(2, mock_api_request.call_count)
+
+        # WHEN
+        with self.assertRaises(PyngrokError):
+            ngrok.get_tunnel(pyngrok_config=self.pyngrok_config)
+
+    @mock.patch("pyngrok.process.kill_process")
+    @mock.patch('pyngrok.ngrok.api_request')
+    @mock.patch('pyngrok.ngrok.get_ngrok_process')
+    def test_tunnel_registries_per_agent(self, mock_get_ngrok_process, mock_api_request, mock_kill_process):
+        # GIVEN
+        pyngrok_config_a = self.copy_with_updates(self.pyngrok_config, ngrok_path="/agents/a/ngrok")
+        pyngrok_config_b = self.copy_with_updates(self.pyngrok_config, ngrok_path="/agents/b/ngrok")
+        mock_get_ngrok_process.side_effect = lambda pyngrok_config: mock.Mock(
+            api_url="http://127.0.0.1:4040" if pyngrok_config is pyngrok_config_a else "http://127.0.0.1:4041")
+
+        def list_tunnels(url, **kwargs):
+            agent = "a" if url.startswith("http://127.0.0.1:4040") else "b"
+            return {"tunnels": [{"name": agent, "public_url": f"https://{agent}.ngrok.dev"}]}
+
+        mock_api_request.side_effect = list_tunnels
+
+        # WHEN
+        tunnel_b = ngrok.get_tunnels(pyngrok_config_b)[0]
+        ngrok.get_tunnels(pyngrok_config_a)
+
+        # THEN
+        self.assertEqual(["https://a.ngrok.dev"], ngrok._tunnel_registry(pyngrok_config_a).keys())
+        self.assertEqual(["https://b.ngrok.dev"], ngrok._tunnel_registry(pyngrok_config_b).keys())
+
+        # WHEN
+        ngrok.kill(pyngrok_config_a)
+
+        # THEN
+        mock_kill_process.assert_called_once_with("/agents/a/ngrok")
+        self.assertEqual(0, len(ngrok._tunnel_registry(pyngrok_config_a)))
+        self.assertIs(tunnel_b, ngrok._tunnel_registry(pyngrok_config_b)["https://b.ngrok.dev"])
+
+    @unittest.skipIf(os.name != "posix", "The fake ngrok binary is a script")
+    def test_concurrent_connect_disconnect_stress(self):
+        # GIVEN
+        self.given_fake_ngrok_installed(self.pyngrok_config)
+        thread_count = 64
+        iterations = 5
+
+        def hammer(worker):
+            public_urls = []
+            for i in range(iterations):
+                tunnel = ngrok.connect(str(8000 + i), name=f"tunnel-{worker}-{i}", pyngrok_config=self.pyngrok_config)
+                public_urls.append(tunnel.public_url)
+                ngrok.get_tunnels(self.pyngrok_config)
+                self.assertEqual(tunnel.public_url,
+                                 ngrok.get_tunnel(name=f"tunnel-{worker}-{i}",
+                                                  pyngrok_config=self.pyngrok_config).public_url)
+                ngrok.disconnect(tunnel.public_url, pyngrok_config=self.pyngrok_config)
+            return public_urls
+
+        # WHEN
+        with ThreadPoolExecutor(max_workers=thread_count) as executor:
+            public_urls = [url for urls in executor.map(hammer, range(thread_count)) for url in urls]
+        tunnels = ngrok.get_tunnels(self.pyngrok_config)
+
+        # THEN
+        # Every thread raced to start ngrok, but shared a single process
+        self.assertEqual(1, len(process._current_processes))
+        self.assertEqual(thread_count * iterations, len(set(public_urls)))
+        self.assertEqual([], tunnels)
+        self.assertEqual(0, len(ngrok._tunnel_registry(self.pyngrok_config)))
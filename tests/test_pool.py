@@ -0,0 +1,162 @@
+__copyright__ = "Copyright (c) 2018-2025 Alex Laird"
+__license__ = "MIT"
+
+import os
+import time
+import unittest
+from unittest import mock
+
+import yaml
+
+from pyngrok import installer, ngrok, process
+from pyngrok.exception import PyngrokError
+from pyngrok.pool import AgentPool
+from tests.testcase import NgrokTestCase
+
+
+class TestPool(NgrokTestCase):
+    def setUp(self):
+        super().setUp()
+
+        # A stand-in binary, as the agents' processes are mocked
+        self.pyngrok_config = self.copy_with_updates(self.pyngrok_config,
+                                                     ngrok_path=os.path.join(self.config_dir, "fake-ngrok"))
+        with open(self.pyngrok_config.ngrok_path, "w") as f:
+            f.write("")
+
+    @mock.patch("pyngrok.ngrok.disconnect_many")
+    @mock.patch("pyngrok.ngrok.get_tunnels")
+    @mock.patch("pyngrok.process.is_process_running")
+    @mock.patch("pyngrok.process.get_process")
+    def test_pool_hands_out_and_recycles_agents(self, mock_get_process, mock_is_process_running,
+                                                mock_get_tunnels, mock_disconnect_many):
+        # GIVEN
+        mock_get_process.return_value = mock.Mock(api_url="http://127.0.0.1:4040")
+        mock_is_process_running.return_value = True
+        mock_get_tunnels.return_value = [mock.Mock(public_url="https://a.ngrok.dev")]
+        mock_disconnect_many.return_value = [None]
+        pool = AgentPool(self.pyngrok_config, size=2).start()
+        self.addCleanup(pool.close)
+        self.wait_for(lambda: pool.available == 2)
+
+        # WHEN
+        agent_1 = pool.acquire(timeout=1)
+        agent_2 = pool.acquire(timeout=1)
+
+        # THEN
+        self.assertNotEqual(agent_1.pyngrok_config.ngrok_path, agent_2.pyngrok_config.ngrok_path)
+        self.assertEqual(os.path.realpath(self.pyngrok_config.ngrok_path),
+                         os.path.realpath(agent_1.pyngrok_config.ngrok_path))
+        web_addrs = set()
+        for agent in [agent_1, agent_2]:
+            with open(agent.pyngrok_config.config_path, "r") as f:
+                web_addrs.add(yaml.safe_load(f)["web_addr"])
+        self.assertEqual(2, len(web_addrs))
+        with self.assertRaises(PyngrokError):
+            pool.acquire(timeout=0.1)
+
+        # WHEN
+        pool.release(agent_1)
+        with pool.acquire(timeout=1) as agent_3:
+            pass
+
+        # THEN
+        self.assertEqual(agent_1.pyngrok_config.ngrok_path, agent_3.pyngrok_config.ngrok_path)
+        mock_disconnect_many.assert_called_with(["https://a.ngrok.dev"], pyngrok_config=agent_1.pyngrok_config)
+        self.assertEqual(2, mock_get_process.call_count)
+        self.assertEqual(3, pool.stats.acquisitions)
+        self.assertEqual(1, pool.stats.timeouts)
+        self.assertGreater(pool.stats.hit_rate, 0)
+        self.assertGreaterEqual(pool.stats.max_acquire_latency, pool.stats.mean_acquire_latency)
+
+        # WHEN
+        pool.release(agent_2, restart=True)
+        self.wait_for(lambda: pool.available == 2)
+        pool.close()
+
+        # THEN
+        self.assertEqual(3, mock_get_process.call_count)
+        self.assertEqual(1, pool.stats.restarts)
+        self.assertFalse(os.path.exists(os.path.dirname(agent_1.pyngrok_config.ngrok_path)))
+        with self.assertRaises(PyngrokError):
+            pool.acquire()
+
+    @mock.patch("pyngrok.pool.DEFAULT_RESTART_BACKOFF", 0.01)
+    @mock.patch("pyngrok.process.get_process")
+    def test_pool_retries_failed_start(self, mock_get_process):
+        # GIVEN
+        web_addrs = []
+
+        def get_process(pyngrok_config):
+            with open(pyngrok_config.config_path, "r") as f:
+                web_addrs.append(yaml.safe_load(f)["web_addr"])
+            if len(web_addrs) == 1:
+                raise PyngrokError("The ngrok process was unable to start.")
+            return mock.Mock(api_url="http://127.0.0.1:4040")
+
+        mock_get_process.side_effect = get_process
+
+        # WHEN
+        with AgentPool(self.pyngrok_config, size=1) as pool:
+            with mock.patch("pyngrok.process.is_process_running", return_value=True):
+                agent = pool.acquire(timeout=5)
+
+        # THEN
+        self.assertEqual("http://127.0.0.1:4040", agent.api_url)
+        # The port may have been taken, so the retry is on a new one
+        self.assertEqual(2, len(web_addrs))
+        self.assertNotEqual(web_addrs[0], web_addrs[1])
+        self.assertEqual(1, pool.stats.start_failures)
+        self.assertEqual(1, pool.stats.acquisitions)
+
+    @mock.patch("pyngrok.pool.DEFAULT_RESTART_BACKOFF", 0.01)
+    @mock.patch("pyngrok.process.get_process")
+    def test_pool_retries_unexpected_errors(self, mock_get_process):
+        # GIVEN
+        mock_get_process.side_effect = [OSError("Too many open files"), mock.Mock(api_url="http://127.0.0.1:4040")]
+        assign_web_addr = AgentPool._assign_web_addr
+        assign_calls = []
+
+        def fail_first_reassign(pool, slot):
+            assign_calls.append(slot.index)
+            # The first call is when the slot is created, the second when it is retried
+            if len(assign_calls) == 2:
+                raise OSError("No space left on device")
+            assign_web_addr(pool, slot)
+
+        # WHEN
+        with mock.patch.object(AgentPool, "_assign_web_addr", autospec=True, side_effect=fail_first_reassign):
+            with AgentPool(self.pyngrok_config, size=1) as pool:
+                with mock.patch("pyngrok.process.is_process_running", return_value=True):
+                    agent = pool.acquire(timeout=5)
+
+        # THEN
+        self.assertEqual("http://127.0.0.1:4040", agent.api_url)
+        self.assertEqual(3, len(assign_calls))
+        self.assertEqual(2, mock_get_process.call_count)
+        self.assertEqual(2, pool.stats.start_failures)
+        self.assertEqual(1, pool.stats.acquisitions)
+
+    @unittest.skipIf(not os.environ.get("NGROK_AUTHTOKEN"), "NGROK_AUTHTOKEN environment variable not set")
+    def test_pool_connect(self):
+        # GIVEN
+        ngrok_path = os.path.join(self.config_dir, "3", installer.get_ngrok_bin())
+        pyngrok_config = self.copy_with_updates(self.pyngrok_config, ngrok_path=ngrok_path)
+        self.given_ngrok_installed(pyngrok_config)
+
+        # WHEN
+        with AgentPool(pyngrok_config, size=2) as pool:
+            with pool.acquire(timeout=pyngrok_config.startup_timeout) as agent:
+                tunnel = ngrok.connect("5000", pyngrok_config=agent.pyngrok_config)
+
+                # THEN
+                self.assertIsNotNone(tunnel.public_url)
+                self.assertTrue(process.is_process_running(agent.pyngrok_config.ngrok_path))
+
+        self.assertFalse(process.is_process_running(agent.pyngrok_config.ngrok_path))
+
+    @staticmethod
+    def wait_for(condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
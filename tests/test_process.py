@@ -3,16 +3,20 @@ __license__ = "MIT"
 
 import os
 import platform
+import subprocess
+import sys
 import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from unittest import mock
 from urllib.parse import urlparse
 from urllib.request import urlopen
 
 from pyngrok import installer, ngrok, process
-from pyngrok.exception import PyngrokNgrokError
+from pyngrok.exception import PyngrokNgrokError, PyngrokSecurityError
 from pyngrok.process import NgrokLog
-from tests.testcase import NgrokTestCase
+from tests.testcase import FakeNgrokApi, NgrokTestCase
 
 
 class TestProcess(NgrokTestCase):
@@ -252,7 +256,7 @@ class TestProcess(NgrokTestCase):
     def test_retry_session_connection_failure(self, mock_proc_readline):
         # GIVEN
         log_line = "lvl=eror msg=\"some error\" err=EOF"
-        mock_proc_readline.return_value.stdout.readline.side_effect = [log_line, log_line, log_line]
+        mock_proc_readline.return_value.stdout = self.given_process_output([log_line, log_line, log_line])
         pyngrok_config = self.copy_with_updates(self.pyngrok_config)
         self.given_ngrok_installed(pyngrok_config)
 
@@ -285,6 +289,191 @@ class TestProcess(NgrokTestCase):
         self.assertIn("ngrok binary was not found", str(cm.exception))
         self.assertEqual(len(process._current_processes.keys()), 0)
 
+    @mock.patch("pyngrok.process.NgrokProcess._probe_api_path")
+    @mock.patch("subprocess.Popen")
+    @mock.patch("pyngrok.process._build_start_command")
+    def test_start_process_probes_api_once_startup_logged(self, mock_build_start_command, mock_popen,
+                                                          mock_probe_api_path):
+        # GIVEN
+        mock_build_start_command.return_value = [self.pyngrok_config.ngrok_path, "start", "--none"]
+        mock_popen.return_value.poll.return_value = None
+        mock_popen.return_value.stdout = self.given_process_output(
+            ["lvl=info msg=\"no configuration paths supplied\""] * 20 +
+            ["lvl=info msg=\"starting web service\" obj=web addr=127.0.0.1:4040",
+             "lvl=info msg=\"client session established\" obj=tunnels.session",
+             "lvl=info msg=\"tunnel session started\" obj=tunnels.session"])
+        mock_probe_api_path.side_effect = [False, False, True]
+        pyngrok_config = self.copy_with_updates(self.pyngrok_config, monitor_thread=False)
+
+        # WHEN
+        ngrok_process = process._start_process(pyngrok_config)
+
+        # THEN
+        self.assertEqual("http://127.0.0.1:4040", ngrok_process.api_url)
+        self.assertEqual(3, mock_probe_api_path.call_count)
+        self.assertEqual(["web_service", "client_session", "tunnel_session", "api_ready"],
+                         list(ngrok_process.startup_timings.keys()))
+        self.assertLessEqual(ngrok_process.startup_timings["tunnel_session"],
+                             ngrok_process.startup_timings["api_ready"])
+
+    @mock.patch("pyngrok.process._start_process_locked")
+    def test_get_process_concurrent_callers_share_startup(self, mock_start_process_locked):
+        # GIVEN
+        def start_process(pyngrok_config):
+            time.sleep(0.2)
+            ngrok_process = process.NgrokProcess(mock.Mock(**{"poll.return_value": None}), pyngrok_config)
+            process._add_process(pyngrok_config.ngrok_path, ngrok_process)
+            return ngrok_process
+
+        mock_start_process_locked.side_effect = start_process
+
+        # WHEN
+        with ThreadPoolExecutor(max_workers=64) as executor:
+            ngrok_processes = list(executor.map(lambda _: process.get_process(self.pyngrok_config), range(64)))
+
+        # THEN
+        self.assertEqual(1, mock_start_process_locked.call_count)
+        self.assertEqual(1, len({id(ngrok_process) for ngrok_process in ngrok_processes}))
+        self.assertIs(ngrok_processes[0], process._current_processes[self.pyngrok_config.ngrok_path])
+
+    @mock.patch("pyngrok.ngrok.install_ngrok")
+    def test_attach(self, mock_install_ngrok):
+        # GIVEN
+        fake_api = FakeNgrokApi().start()
+        self.addCleanup(fake_api.stop)
+        # The agent is external, so there is no local binary
+        pyngrok_config = self.copy_with_updates(self.pyngrok_config,
+                                                ngrok_path=os.path.join(self.config_dir, "sidecar", "ngrok"))
+
+        # WHEN
+        ngrok_process = process.attach(f"{fake_api.api_url}/", pyngrok_config)
+        tunnel = ngrok.connect("8000", pyngrok_config=pyngrok_config)
+
+        # THEN
+        mock_install_ngrok.assert_not_called()
+        self.assertEqual(fake_api.api_url, ngrok_process.api_url)
+        self.assertIs(ngrok_process, ngrok.get_ngrok_process(pyngrok_config))
+        self.assertTrue(process.is_process_running(pyngrok_config.ngrok_path))
+        self.assertEqual([tunnel.public_url], [t.public_url for t in ngrok.get_tunnels(pyngrok_config)])
+        with self.assertRaises(PyngrokNgrokError):
+            process.attach(fake_api.api_url, pyngrok_config)
+
+        # WHEN
+        ngrok.kill(pyngrok_config)
+
+        # THEN
+        self.assertFalse(process.is_process_running(pyngrok_config.ngrok_path))
+        self.assertEqual(1, len(fake_api.tunnels))
+
+    def test_attach_not_running(self):
+        # GIVEN
+        fake_api = FakeNgrokApi().start()
+        api_url = fake_api.api_url
+        fake_api.stop()
+
+        # WHEN
+        with self.assertRaises(PyngrokSecurityError):
+            process.attach("file:///ngrok", self.pyngrok_config)
+        with self.assertRaises(PyngrokNgrokError):
+            process.attach(api_url, self.pyngrok_config)
+
+        # THEN
+        self.assertFalse(process.is_process_running(self.pyngrok_config.ngrok_path))
+
+    @mock.patch("pyngrok.process._start_process")
+    def test_multiprocess_attaches_to_shared_process(self, mock_start_process):
+        # GIVEN
+        fake_api = FakeNgrokApi().start()
+        self.addCleanup(fake_api.stop)
+        pyngrok_config = self.copy_with_updates(self.pyngrok_config, multiprocess=True)
+        state_path = process._shared_state_path(pyngrok_config)
+        # Stands in for a ngrok process started by another Python process
+        process._write_shared_state(state_path, {"pid": os.getpid(),
+                                                 "api_url": fake_api.api_url,
+                                                 "ngrok_path": pyngrok_config.ngrok_path})
+
+        # WHEN
+        ngrok_process = process.get_process(pyngrok_config)
+
+        # THEN
+        mock_start_process.assert_not_called()
+        self.assertIsInstance(ngrok_process.proc, process._AttachedProcess)
+        self.assertEqual(fake_api.api_url, ngrok_process.api_url)
+        self.assertIs(ngrok_process, process.get_process(pyngrok_config))
+
+        # WHEN
+        process._reset_after_fork()
+
+        # THEN
+        attached = process._current_processes[pyngrok_config.ngrok_path]
+        self.assertIsNot(ngrok_process, attached)
+        self.assertEqual(os.getpid(), attached.proc.pid)
+        self.assertEqual(fake_api.api_url, attached.api_url)
+
+        # WHEN
+        with mock.patch("os.kill") as mock_kill:
+            process.kill_process(pyngrok_config.ngrok_path)
+
+        # THEN
+        # Only probed to check it is running, never signalled to terminate
+        self.assertEqual([], [c for c in mock_kill.call_args_list if c.args[1] != 0])
+        self.assertFalse(process.is_process_running(pyngrok_config.ngrok_path))
+        self.assertIsNotNone(process._read_shared_state(state_path))
+
+    @unittest.skipIf(not sys.platform.startswith("linux"), "Zombie processes are detected with procfs")
+    def test_pid_running_zombie(self):
+        # GIVEN
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        self.addCleanup(proc.wait)
+
+        # WHEN
+        deadline = time.monotonic() + 10
+        while process._pid_running(proc.pid) and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        # THEN
+        self.assertFalse(process._pid_running(proc.pid))
+        self.assertTrue(process._pid_running(os.getpid()))
+
+    @mock.patch("pyngrok.process._start_process")
+    def test_multiprocess_records_started_process(self, mock_start_process):
+        # GIVEN
+        pyngrok_config = self.copy_with_updates(self.pyngrok_config, multiprocess=True)
+        state_path = process._shared_state_path(pyngrok_config)
+        # A recorded process that is no longer running is ignored
+        process._write_shared_state(state_path, {"pid": 2 ** 22 + 1,
+                                                 "api_url": "http://127.0.0.1:4040",
+                                                 "ngrok_path": pyngrok_config.ngrok_path})
+        mock_start_process.return_value = mock.Mock(api_url="http://127.0.0.1:4041", proc=mock.Mock(pid=1234))
+
+        # WHEN
+        ngrok_process = process.get_process(pyngrok_config)
+
+        # THEN
+        self.assertEqual(mock_start_process.return_value, ngrok_process)
+        self.assertEqual({"pid": 1234, "api_url": "http://127.0.0.1:4041", "ngrok_path": pyngrok_config.ngrok_path},
+                         process._read_shared_state(state_path))
+
+    @unittest.skipIf(os.name != "posix", "Waking the monitor thread requires POSIX")
+    def test_stop_monitor_thread_wakes_idle_thread(self):
+        # GIVEN
+        stdout, write_fd = self.given_process_output(["lvl=info msg=one", "lvl=info msg=two"], close=False)
+        ngrok_process = process.NgrokProcess(mock.Mock(stdout=stdout), self.pyngrok_config)
+        ngrok_process.start_monitor_thread()
+        monitor_thread = ngrok_process._monitor_thread
+        self.addCleanup(ngrok_process._close_reader)
+
+        # WHEN
+        time.sleep(0.2)
+        ngrok_process.stop_monitor_thread()
+        stopped = ngrok_process.join_monitor_thread(timeout=1)
+
+        # THEN
+        self.assertTrue(stopped)
+        self.assertFalse(monitor_thread.is_alive())
+        self.assertIsNone(ngrok_process._monitor_thread)
+        self.assertEqual(["one", "two"], [log.msg for log in ngrok_process.logs])
+
     def test_log_parsing(self):
         # GIVEN
         log_line = ("t=2024-03-08T08:45:07-0600 lvl=info msg=\"starting web service\" "
@@ -329,6 +518,20 @@ class TestProcess(NgrokTestCase):
         self.assertEqual(ngrok_log.lvl, "ERROR")
         self.assertIsNone(ngrok_log.msg)
 
+        # WHEN
+        ngrok_log = NgrokLog("lvl=crit msg=\"Test with \\\"escaped\\\" quotes\" err=\"\"")
+        # THEN
+        self.assertEqual(ngrok_log.lvl, "CRITICAL")
+        self.assertEqual(ngrok_log.msg, "Test with \"escaped\" quotes")
+        self.assertEqual(ngrok_log.err, "")
+
+        # WHEN
+        ngrok_log = NgrokLog("lvl=eror msg=\"Test=Test\" obj=web addr=127.0.0.1:4040")
+        # THEN
+        self.assertEqual(ngrok_log.lvl, "ERROR")
+        self.assertEqual(ngrok_log.msg, "Test=Test")
+        self.assertEqual(ngrok_log.addr, "127.0.0.1:4040")
+
         # WHEN
         ngrok_log = NgrokLog("lvl=CRIT")
         # THEN
@@ -354,3 +557,53 @@ class TestProcess(NgrokTestCase):
         ngrok_log = NgrokLog("t=123456789")
         # THEN
         self.assertEqual(ngrok_log.t, "123456789")
+
+    def test_log_lazy_fields(self):
+        # GIVEN
+        ngrok_log = NgrokLog("t=2024-03-08T08:45:07-0600 lvl=info msg=\"started tunnel\" obj=tunnels "
+                             "name=my-tunnel url=https://my-tunnel.ngrok.dev")
+
+        # WHEN
+        lvl = ngrok_log.lvl
+
+        # THEN
+        self.assertEqual("INFO", lvl)
+        self.assertIsNone(ngrok_log._fields)
+        self.assertFalse(hasattr(ngrok_log, "__dict__"))
+
+        # WHEN
+        msg = ngrok_log.msg
+
+        # THEN
+        self.assertEqual("started tunnel", msg)
+        self.assertIsNotNone(ngrok_log._fields)
+        self.assertEqual("https://my-tunnel.ngrok.dev", ngrok_log.url)
+        self.assertEqual("my-tunnel", ngrok_log.name)
+        self.assertIsNone(ngrok_log.err)
+        with self.assertRaises(AttributeError):
+            ngrok_log.unknown
+
+    def test_log_buffer(self):
+        # GIVEN
+        ngrok_process = process.NgrokProcess(mock.Mock(), self.copy_with_updates(self.pyngrok_config, max_logs=3))
+
+        # WHEN
+        for line in ["t=2024-03-08T08:45:05-0600 lvl=info msg=one",
+                     "t=2024-03-08T08:45:06-0600 lvl=warn msg=two",
+                     "t=2024-03-08T08:45:07-0600 lvl=info msg=three",
+                     "t=2024-03-08T08:45:08-0600 lvl=eror msg=four",
+                     "lvl=info msg=five"]:
+            ngrok_process._log_line(line)
+
+        # THEN
+        self.assertEqual(3, len(ngrok_process.logs))
+        self.assertEqual(["three", "four", "five"], [log.msg for log in ngrok_process.logs])
+        self.assertEqual("five", ngrok_process.logs[-1].msg)
+        self.assertEqual(["four", "five"], [log.msg for log in ngrok_process.logs[1:]])
+        self.assertEqual(["four"], [log.msg for log in ngrok_process.logs.filter(lvl="warning")])
+        self.assertEqual(["three", "four"], [log.msg for log in ngrok_process.logs.filter(
+            since=datetime(2024, 3, 8, 14, 45, 7, tzinfo=timezone.utc))])
+        self.assertEqual(["three"], [log.msg for log in ngrok_process.logs.filter(
+            lvl="INFO", until=datetime(2024, 3, 8, 14, 45, 7, tzinfo=timezone.utc))])
+        with self.assertRaises(ValueError):
+            ngrok_process.logs.filter(lvl="unknown")
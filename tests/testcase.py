@@ -1,11 +1,17 @@
 __copyright__ = "Copyright (c) 2018-2024 Alex Laird"
 __license__ = "MIT"
 
+import json
 import logging
 import os
 import shutil
+import sys
+import threading
+import time
 import unittest
 from copy import copy
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import psutil
 from psutil import AccessDenied, NoSuchProcess
@@ -37,6 +43,11 @@ class NgrokTestCase(unittest.TestCase):
         # ngrok's CDN can be flaky, so make sure its flakiness isn't reflect in our CI/CD test runs
         installer.DEFAULT_RETRY_COUNT = 3
 
+        # Isolate the binary cache, so tests that download ngrok are not installed from a cache populated elsewhere
+        environ_patcher = mock.patch.dict(os.environ, {"PYNGROK_CACHE_DIR": os.path.join(self.config_dir, "cache")})
+        environ_patcher.start()
+        self.addCleanup(environ_patcher.stop)
+
     def tearDown(self):
         for p in list(process._current_processes.values()):
             try:
@@ -54,11 +65,56 @@ class NgrokTestCase(unittest.TestCase):
     def given_ngrok_installed(pyngrok_config):
         ngrok.install_ngrok(pyngrok_config)
 
+    @staticmethod
+    def given_fake_ngrok_installed(pyngrok_config, startup_delay=0):
+        # A stand-in for the ngrok binary, which serves a FakeNgrokApi and logs its startup like ngrok does
+        project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        os.makedirs(os.path.dirname(pyngrok_config.ngrok_path), exist_ok=True)
+        with open(pyngrok_config.ngrok_path, "w") as f:
+            f.write(f"""#!{sys.executable}
+import sys
+import time
+
+sys.path.insert(0, {project_dir!r})
+
+from tests.testcase import FakeNgrokApi
+
+if "--version" in sys.argv:
+    print("ngrok version 3.99.0")
+    sys.exit(0)
+
+api = FakeNgrokApi().start()
+print(f"lvl=info msg=\\"starting web service\\" obj=web addr={{api.api_url.removeprefix('http://')}}", flush=True)
+time.sleep({startup_delay})
+print("lvl=info msg=\\"client session established\\" obj=tunnels.session", flush=True)
+print("lvl=info msg=\\"tunnel session started\\" obj=tunnels.session", flush=True)
+while True:
+    time.sleep(1)
+""")
+        os.chmod(pyngrok_config.ngrok_path, int("700", 8))
+        installer.install_default_config(conf.get_config_path(pyngrok_config),
+                                         ngrok_version=pyngrok_config.ngrok_version)
+
     @staticmethod
     def given_file_doesnt_exist(path):
         if os.path.exists(path):
             os.remove(path)
 
+    def given_process_output(self, lines, close=True):
+        read_fd, write_fd = os.pipe()
+        stdout = os.fdopen(read_fd, "rb")
+        self.addCleanup(stdout.close)
+
+        os.write(write_fd, "".join(f"{line}\n" for line in lines).encode("utf-8"))
+        if close:
+            os.close(write_fd)
+
+            return stdout
+        else:
+            self.addCleanup(os.close, write_fd)
+
+            return stdout, write_fd
+
     @staticmethod
     def copy_with_updates(to_copy, **kwargs):
         copied = copy(to_copy)
@@ -75,3 +131,228 @@ class NgrokTestCase(unittest.TestCase):
         except (AccessDenied, NoSuchProcess):
             # Some OSes are flaky on this assertion, but that isn't an indication anything is wrong, so pass
             pass
+
+
+class FakeNgrokApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connection_count += 1
+
+    def do_GET(self):  # noqa: N802
+        if self._dropped():
+            return
+
+        path = self.path.split("?")[0]
+        if path in ["/api/tunnels", "/api/endpoints"]:
+            with self.server.lock:
+                tunnels = list(self.server.tunnels.values())
+            self._respond(200, {path.split("/")[-1]: tunnels})
+        elif path == "/api/status":
+            self._respond(200, {"status": "online", "agent_version": "3.0.0", "uri": "/api/status"})
+        elif path == "/api/requests/http":
+            # Sent chunked, which is how the agent streams larger responses
+            self._respond_chunked(200, {"requests": self.server.captured_requests})
+        else:
+            self._respond(404, {"error_code": 100, "status_code": 404, "msg": "Not Found"})
+
+    def do_POST(self):  # noqa: N802
+        path = self.path.split("?")[0]
+        data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self._dropped():
+            return
+
+        if path in ["/api/tunnels", "/api/endpoints"]:
+            name = data["name"]
+            with self.server.lock:
+                if name in self.server.tunnels:
+                    self._respond(400, {"error_code": 102, "status_code": 400, "msg": "tunnel already exists"})
+                    return
+                self.server.tunnel_count += 1
+                tunnel = {"ID": f"id-{self.server.tunnel_count}",
+                          "name": name,
+                          "uri": f"{path}/{name}",
+                          "public_url": f"https://{self.server.tunnel_count}.ngrok.dev",
+                          "proto": data.get("proto", "https"),
+                          "config": {"addr": data.get("addr")} if "addr" in data else {},
+                          "metrics": {}}
+                if "upstream" in data:
+                    tunnel["upstream"] = data["upstream"]
+                self.server.tunnels[name] = tunnel
+            self._respond(201, tunnel)
+        elif path == "/api/requests/http":
+            self._respond(204, None)
+        else:
+            self._respond(404, {"error_code": 100, "status_code": 404, "msg": "Not Found"})
+
+    def do_DELETE(self):  # noqa: N802
+        name = self.path.split("?")[0].split("/")[-1]
+        with self.server.lock:
+            tunnel = self.server.tunnels.pop(name, None)
+        if tunnel is None:
+            self._respond(404, {"error_code": 100, "status_code": 404, "msg": "Not Found"})
+        else:
+            self._respond(204, None)
+
+    def _dropped(self):
+        with self.server.lock:
+            drop = self.server.drops > 0
+            if drop:
+                self.server.drops -= 1
+                self.server.dropped.append(f"{self.command} {self.path}")
+
+        if drop:
+            # Closed without a response, as if the connection was closed while the request was in flight
+            self.close_connection = True
+
+        return drop
+
+    def _respond(self, status, data):
+        body = json.dumps(data).encode("utf-8") if data is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _respond_chunked(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(0, len(body), 16):
+            chunk = body[i:i + 16]
+            self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeNgrokApiServer(ThreadingHTTPServer):
+    # Like the real agent, accept bursts of concurrent connections without overflowing the listen backlog
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class FakeNgrokApi:
+    """
+    A local stand-in for the ``ngrok`` agent API, enough of it to exercise ``pyngrok``'s API interactions
+    without starting ``ngrok``.
+    """
+
+    def __init__(self):
+        self.server = FakeNgrokApiServer(("127.0.0.1", 0), FakeNgrokApiHandler)
+        self.server.lock = threading.Lock()
+        self.server.connection_count = 0
+        self.server.tunnel_count = 0
+        self.server.tunnels = {}
+        self.server.captured_requests = []
+        self.server.drops = 0
+        self.server.dropped = []
+
+        self.api_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def connection_count(self):
+        return self.server.connection_count
+
+    @property
+    def tunnels(self):
+        return self.server.tunnels
+
+    def drop(self, count=1):
+        """
+        Close the connection, without a response, for the next ``count`` requests that are received.
+        """
+        with self.server.lock:
+            self.server.drops += count
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeCdnHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        body = self.server.files.get(self.path)
+        if body is None:
+            self._respond(404, {}, b"")
+            return
+
+        range_header = self.headers.get("Range")
+        # Slow enough for concurrent downloads to overlap
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.requests.append(range_header)
+            fail = self.server.failures.get(range_header, 0) > 0
+            if fail:
+                self.server.failures[range_header] -= 1
+
+        if fail:
+            self._respond(500, {}, b"")
+        elif range_header and self.server.ranges:
+            start, end = range_header.removeprefix("bytes=").split("-")
+            start, end = int(start), min(int(end), len(body) - 1)
+            self._respond(206,
+                          {"Content-Range": f"bytes {start}-{end}/{len(body)}", "ETag": self.server.etag},
+                          body[start:end + 1])
+        else:
+            self._respond(200, {"ETag": self.server.etag}, body)
+
+    def _respond(self, status, headers, body):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeCdn:
+    """
+    A local stand-in for ``ngrok``'s CDN, which serves the given files, and supports ``Range`` requests (unless
+    ``ranges`` is ``False``), each after a ``delay``.
+    """
+
+    def __init__(self, files, ranges=True, delay=0):
+        self.server = FakeNgrokApiServer(("127.0.0.1", 0), FakeCdnHandler)
+        self.server.lock = threading.Lock()
+        self.server.files = files
+        self.server.ranges = ranges
+        self.server.delay = delay
+        self.server.failures = {}
+        self.server.requests = []
+        self.server.etag = "\"fake-etag\""
+
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def fail(self, range_header, count=1):
+        with self.server.lock:
+            self.server.failures[range_header] = count
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()